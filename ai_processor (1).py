@@ -1,20 +1,31 @@
-import google.generativeai as genai
 import os
 import json
+import threading
+from concurrent.futures import Future
+
+from metrics import timed, AI_SECONDS
 
 # Pre-flight check for API key
 API_KEY = os.getenv("GOOGLE_AI_KEY")
 if not API_KEY:
     raise ValueError("❌ Error: Missing GOOGLE_AI_KEY for AI processing")
-genai.configure(api_key=API_KEY)
 
-def shorten_and_emoji(team_name):
-    try:
-        model = genai.GenerativeModel("gemini-1.5-pro")
+MODEL_NAME = "gemini-1.5-pro"
+# Teams per prompt; keeps responses well inside the output token limit
+BATCH_SIZE = 25
+MAX_SHORT_NAME_LEN = 24
+MAX_EMOJI_LEN = 16
 
-        prompt = f"""
+_model = None
+_model_lock = threading.Lock()
+
+# team_name -> Future, so concurrent callers asking for the same team share one request
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+PROMPT_HEADER = """
 You are a football assistant bot.
-Given a full football club name, you must:
+For each full football club or national team name below, you must:
 - Return a short name (maximum 2 words).
 - Suggest 1 emoji related to the team (colors, theme, nickname).
 
@@ -23,24 +34,105 @@ Example:
 - Borussia Dortmund -> 🟡 B-Dortmund
 - Real Madrid -> ⚪ Real Madrid
 - Brazil -> 🇧🇷 Brazil
-- Argentina -> 🇦🇷 Argentina 
-- England -> 🏴󠁧󠁢󠁥󠁮󠁧󠁿 England 
+- Argentina -> 🇦🇷 Argentina
+- England -> 🏴󠁧󠁢󠁥󠁮󠁧󠁿 England
+
+Respond with one JSON object keyed by the exact club name as given, like:
+{"Manchester United": {"short_name": "Man United", "emoji": "🔴"}}
 
-Club: {team_name}
-Respond in JSON format like:
-{{"short_name": "Short Version", "emoji": "Emoji Here"}}
+Clubs:
 """
 
-        response = model.generate_content(prompt)
-        result = response.text.strip()
 
-        # Attempt to parse JSON; fall back if malformed
-        try:
-            return json.loads(result)
-        except json.JSONDecodeError:
-            print("❌ JSON Parsing Error in AI response")
-            return {"short_name": team_name, "emoji": "◽"}
+def _get_model():
+    """Import and configure the Gemini SDK on first use; it is slow to import."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                import google.generativeai as genai
+                genai.configure(api_key=API_KEY)
+                _model = genai.GenerativeModel(MODEL_NAME)
+    return _model
+
+
+def warm_up():
+    _get_model()
+
+
+def _fallback(team_name):
+    return {"short_name": team_name, "emoji": "◽"}
+
+
+def _validate(team_name, item):
+    """Return a clean mapping for one team, or the fallback if the item is unusable."""
+    if not isinstance(item, dict):
+        return _fallback(team_name)
+    short_name = item.get("short_name")
+    emoji = item.get("emoji")
+    if not isinstance(short_name, str) or not short_name.strip() or len(short_name) > MAX_SHORT_NAME_LEN:
+        short_name = team_name
+    if not isinstance(emoji, str) or not emoji.strip() or len(emoji) > MAX_EMOJI_LEN:
+        emoji = "◽"
+    return {"short_name": short_name.strip(), "emoji": emoji.strip()}
 
+
+def _parse_response(text):
+    text = text.strip()
+    # Models sometimes wrap JSON in a ```json fence
+    if text.startswith("```"):
+        text = text.strip("`")
+        if text.lower().startswith("json"):
+            text = text[4:]
+    return json.loads(text)
+
+
+def _request_chunk(team_names):
+    prompt = PROMPT_HEADER + "\n".join(f"- {name}" for name in team_names)
+    try:
+        response = _get_model().generate_content(prompt)
+        data = _parse_response(response.text)
+        if not isinstance(data, dict):
+            raise ValueError("response is not a JSON object")
+    except json.JSONDecodeError:
+        print("❌ JSON Parsing Error in AI response")
+        data = {}
     except Exception as e:
         print(f"❌ AI Processing Error: {e}")
-        return {"short_name": team_name, "emoji": "◽"}
+        data = {}
+    return {name: _validate(name, data.get(name)) for name in team_names}
+
+
+@timed(AI_SECONDS)
+def shorten_and_emoji_batch(team_names):
+    """
+    Resolve short names and emojis for many teams in as few prompts as possible.
+    Returns {team_name: {"short_name": ..., "emoji": ...}} for every requested name.
+    """
+    owned, waiting = [], {}
+    with _inflight_lock:
+        for name in dict.fromkeys(n for n in team_names if n):
+            future = _inflight.get(name)
+            if future is None:
+                future = Future()
+                _inflight[name] = future
+                owned.append(name)
+            waiting[name] = future
+
+    try:
+        for i in range(0, len(owned), BATCH_SIZE):
+            chunk = owned[i:i + BATCH_SIZE]
+            for name, result in _request_chunk(chunk).items():
+                waiting[name].set_result(result)
+    finally:
+        with _inflight_lock:
+            for name in owned:
+                _inflight.pop(name, None)
+                if not waiting[name].done():
+                    waiting[name].set_result(_fallback(name))
+
+    return {name: future.result() for name, future in waiting.items()}
+
+
+def shorten_and_emoji(team_name):
+    return shorten_and_emoji_batch([team_name]).get(team_name) or _fallback(team_name)
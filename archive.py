@@ -0,0 +1,352 @@
+# archive.py
+#
+# Local, append-only archive of every final result the bot posts, kept as one flat
+# binary column per field (array-backed, memory-mapped for reads) plus a table of
+# interned team and league strings. Row indexes per league and per team are built
+# once per process, so stats queries never touch ESPN or the storage backend.
+
+import mmap
+import os
+import threading
+import time
+from array import array
+from datetime import datetime, timezone
+
+from config import ARCHIVE_DIR
+from fixture import as_fixture
+
+# column -> array typecode; string columns hold indexes into strings.txt
+COLUMNS = {
+    "match_id":   "q",
+    "kickoff":    "q",   # epoch seconds, UTC
+    "league":     "I",
+    "home":       "I",
+    "away":       "I",
+    "home_score": "B",
+    "away_score": "B",
+}
+STRINGS_FILE = "strings.txt"
+
+WIN, DRAW, LOSS = "W", "D", "L"
+
+
+def _epoch(value) -> int:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    return int(datetime.fromisoformat(value).timestamp())
+
+
+class ResultsArchive:
+    """Columnar results store under `path`; safe to share between threads."""
+
+    def __init__(self, path: str = ARCHIVE_DIR):
+        self.path = path
+        self._lock = threading.RLock()
+        self._strings = None      # index -> string
+        self._ids = {}            # string -> index
+        self._rows = 0
+        self._seen = set()        # archived match ids
+        self._maps = {}           # column -> (mmap, memoryview)
+        self._by_league = {}      # league index -> array of rows
+        self._by_team = {}        # team index -> array of rows
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    # OPEN
+
+    def _open(self):
+        if self._strings is not None:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        t0 = time.perf_counter()
+        try:
+            with open(self._file(STRINGS_FILE), "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            raw = b""
+        if raw and not raw.endswith(b"\n"):
+            # Torn last string; no column refers to it yet
+            raw = raw[:raw.rfind(b"\n") + 1]
+            with open(self._file(STRINGS_FILE), "r+b") as f:
+                f.truncate(len(raw))
+        strings = raw.decode("utf-8").split("\n")[:-1]
+        self._strings = strings
+        self._ids = {s: i for i, s in enumerate(strings)}
+
+        # A crash mid-append can leave columns of different lengths; cut back to whole rows
+        sizes = {}
+        for col in COLUMNS:
+            try:
+                sizes[col] = os.path.getsize(self._file(col + ".bin"))
+            except FileNotFoundError:
+                sizes[col] = 0
+        self._rows = min(sizes[col] // array(code).itemsize for col, code in COLUMNS.items())
+        for col, code in COLUMNS.items():
+            if sizes[col] != self._rows * array(code).itemsize:
+                with open(self._file(col + ".bin"), "r+b") as f:
+                    f.truncate(self._rows * array(code).itemsize)
+                print(f"⚠️ Archive column {col} truncated to {self._rows} rows.")
+
+        self._seen = set(self._column("match_id"))
+        league, home, away = self._column("league"), self._column("home"), self._column("away")
+        for row in range(self._rows):
+            self._index(row, league[row], home[row], away[row])
+        if self._rows:
+            print(f"📚 Opened results archive: {self._rows} matches in {time.perf_counter() - t0:.3f}s.")
+
+    def _index(self, row, league, home, away):
+        for table, key in ((self._by_league, league), (self._by_team, home), (self._by_team, away)):
+            rows = table.get(key)
+            if rows is None:
+                rows = table[key] = array("I")
+            rows.append(row)
+
+    def _column(self, col: str):
+        """Read-only memoryview over a column file (an empty tuple while it is empty)."""
+        mapped = self._maps.get(col)
+        if mapped is None:
+            if not self._rows:
+                return ()
+            with open(self._file(col + ".bin"), "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            mapped = self._maps[col] = (mm, memoryview(mm).cast(COLUMNS[col]))
+        return mapped[1]
+
+    def _unmap(self):
+        for mm, view in self._maps.values():
+            view.release()
+            mm.close()
+        self._maps.clear()
+
+    # APPEND
+
+    def _intern(self, value: str, new: list) -> int:
+        index = self._ids.get(value)
+        if index is None:
+            index = self._ids[value] = len(self._strings)
+            self._strings.append(value)
+            new.append(value)
+        return index
+
+    def _forget(self, match_ids, new_strings):
+        self._seen.difference_update(match_ids)
+        for value in new_strings:
+            del self._ids[value]
+        del self._strings[len(self._strings) - len(new_strings):]
+
+    def _rollback(self, strings_size, match_ids, new_strings):
+        """Undo a failed append: cut every file back to the last whole row and forget its values."""
+        self._forget(match_ids, new_strings)
+        try:
+            if os.path.exists(self._file(STRINGS_FILE)):
+                with open(self._file(STRINGS_FILE), "r+b") as f:
+                    f.truncate(strings_size)
+            for col, code in COLUMNS.items():
+                if os.path.exists(self._file(col + ".bin")):
+                    with open(self._file(col + ".bin"), "r+b") as f:
+                        f.truncate(self._rows * array(code).itemsize)
+        except OSError as e:
+            # Let the next call reopen from disk, which trims columns to whole rows
+            print(f"⚠️ Archive rollback failed, reopening: {e}")
+            self.close()
+
+    def append(self, events) -> int:
+        """Archive final results not already stored; returns how many rows were added."""
+        with self._lock:
+            self._open()
+            cols = {col: array(code) for col, code in COLUMNS.items()}
+            new_strings = []
+            for evt in events:
+                try:
+                    fx = as_fixture(evt)
+                    match_id = int(fx.match_id)
+                    if match_id in self._seen:
+                        continue
+                    row = (
+                        match_id,
+                        fx.kickoff,
+                        self._intern(fx.league_code, new_strings),
+                        self._intern(fx.home, new_strings),
+                        self._intern(fx.away, new_strings),
+                        min(fx.home_score, 255),
+                        min(fx.away_score, 255),
+                    )
+                except (KeyError, TypeError, ValueError) as e:
+                    print(f"⚠️ Not archiving result {evt.get('match_id')}: {e}")
+                    continue
+                self._seen.add(match_id)
+                for col, value in zip(COLUMNS, row):
+                    cols[col].append(value)
+            added = len(cols["match_id"])
+            if not added:
+                # Strings interned for rows that then failed were never written
+                self._forget((), new_strings)
+                return 0
+
+            # Strings first, so every index written below already resolves after a crash
+            self._unmap()
+            try:
+                strings_size = os.path.getsize(self._file(STRINGS_FILE))
+            except FileNotFoundError:
+                strings_size = 0
+            try:
+                if new_strings:
+                    with open(self._file(STRINGS_FILE), "a", encoding="utf-8") as f:
+                        f.write("".join(s.replace("\n", " ") + "\n" for s in new_strings))
+                        f.flush()
+                        os.fsync(f.fileno())
+                for col, values in cols.items():
+                    with open(self._file(col + ".bin"), "ab") as f:
+                        values.tofile(f)
+                        f.flush()
+                        os.fsync(f.fileno())
+            except OSError:
+                self._rollback(strings_size, cols["match_id"], new_strings)
+                raise
+            first = self._rows
+            self._rows += added
+            for i in range(added):
+                self._index(first + i, cols["league"][i], cols["home"][i], cols["away"][i])
+            return added
+
+    # QUERIES
+
+    def _rows_for(self, table, name, since=None, until=None):
+        index = self._ids.get(name)
+        rows = table.get(index, ()) if index is not None else ()
+        if since is None and until is None:
+            return rows
+        kickoff = self._column("kickoff")
+        lo = _epoch(since) if since is not None else None
+        hi = _epoch(until) if until is not None else None
+        return [r for r in rows if (lo is None or kickoff[r] >= lo) and (hi is None or kickoff[r] < hi)]
+
+    def __len__(self):
+        with self._lock:
+            self._open()
+            return self._rows
+
+    def league_table(self, league: str, since=None, until=None) -> list:
+        """
+        Standings from archived results of one league (optionally since/until a
+        kickoff), sorted by points, goal difference and goals scored.
+        """
+        with self._lock:
+            self._open()
+            rows = self._rows_for(self._by_league, league, since, until)
+            home, away = self._column("home"), self._column("away")
+            hs, aws = self._column("home_score"), self._column("away_score")
+            table = {}
+            for r in rows:
+                for team, gf, ga in ((home[r], hs[r], aws[r]), (away[r], aws[r], hs[r])):
+                    t = table.get(team)
+                    if t is None:
+                        t = table[team] = [0, 0, 0, 0, 0, 0]   # played, won, drawn, lost, gf, ga
+                    t[0] += 1
+                    t[1 if gf > ga else 2 if gf == ga else 3] += 1
+                    t[4] += gf
+                    t[5] += ga
+            standings = [
+                {
+                    "team": self._strings[team], "played": p, "won": w, "drawn": d, "lost": l,
+                    "goals_for": gf, "goals_against": ga, "goal_diff": gf - ga, "points": 3 * w + d,
+                }
+                for team, (p, w, d, l, gf, ga) in table.items()
+            ]
+        standings.sort(key=lambda s: (-s["points"], -s["goal_diff"], -s["goals_for"], s["team"]))
+        return standings
+
+    def _match(self, r) -> dict:
+        return {
+            "match_id":   str(self._column("match_id")[r]),
+            "kickoff":    datetime.fromtimestamp(self._column("kickoff")[r], timezone.utc),
+            "league_code": self._strings[self._column("league")[r]],
+            "home":       self._strings[self._column("home")[r]],
+            "away":       self._strings[self._column("away")[r]],
+            "home_score": self._column("home_score")[r],
+            "away_score": self._column("away_score")[r],
+        }
+
+    def head_to_head(self, team_a: str, team_b: str, limit: int = 10) -> dict:
+        """Wins, draws and goals between two teams, with the most recent meetings first."""
+        with self._lock:
+            self._open()
+            a, b = self._ids.get(team_a), self._ids.get(team_b)
+            summary = {"played": 0, "wins": {team_a: 0, team_b: 0}, "draws": 0,
+                       "goals": {team_a: 0, team_b: 0}, "matches": []}
+            if a is None or b is None:
+                return summary
+            home, away = self._column("home"), self._column("away")
+            hs, aws, kickoff = self._column("home_score"), self._column("away_score"), self._column("kickoff")
+            other = set(self._by_team.get(b, ()))
+            rows = sorted((r for r in self._by_team.get(a, ()) if r in other), key=lambda r: -kickoff[r])
+            for r in rows:
+                a_goals, b_goals = (hs[r], aws[r]) if home[r] == a else (aws[r], hs[r])
+                summary["played"] += 1
+                summary["goals"][team_a] += a_goals
+                summary["goals"][team_b] += b_goals
+                if a_goals == b_goals:
+                    summary["draws"] += 1
+                else:
+                    summary["wins"][team_a if a_goals > b_goals else team_b] += 1
+            summary["matches"] = [self._match(r) for r in rows[:limit]]
+            return summary
+
+    def form(self, team: str, n: int = 5, league: str = None) -> list:
+        """The team's last n results, most recent first, each with a "result" of W/D/L."""
+        with self._lock:
+            self._open()
+            index = self._ids.get(team)
+            if index is None:
+                return []
+            kickoff = self._column("kickoff")
+            rows = self._by_team.get(index, ())
+            if league is not None:
+                league_index = self._ids.get(league)
+                league_col = self._column("league")
+                rows = [r for r in rows if league_col[r] == league_index]
+            latest = sorted(rows, key=lambda r: -kickoff[r])[:n]
+            out = []
+            for r in latest:
+                match = self._match(r)
+                gf, ga = ((match["home_score"], match["away_score"]) if match["home"] == team
+                          else (match["away_score"], match["home_score"]))
+                match["result"] = WIN if gf > ga else DRAW if gf == ga else LOSS
+                out.append(match)
+            return out
+
+    def close(self):
+        with self._lock:
+            self._unmap()
+            self._strings = None
+            self._ids, self._seen = {}, set()
+            self._by_league, self._by_team = {}, {}
+            self._rows = 0
+
+
+archive = ResultsArchive()
+
+
+def append(events) -> int:
+    if not ARCHIVE_DIR:
+        return 0
+    try:
+        return archive.append(events)
+    except Exception as e:
+        print(f"⚠️ Results archive append failed: {e}")
+        return 0
+
+
+def league_table(league: str, since=None, until=None) -> list:
+    return archive.league_table(league, since, until)
+
+
+def head_to_head(team_a: str, team_b: str, limit: int = 10) -> dict:
+    return archive.head_to_head(team_a, team_b, limit)
+
+
+def form(team: str, n: int = 5, league: str = None) -> list:
+    return archive.form(team, n, league)
@@ -0,0 +1,48 @@
+# async_runtime.py
+#
+# RUNTIME=asyncio: one event loop runs the leader heartbeat, the AsyncIOScheduler
+# jobs (coroutines for the daily post, result checks, prefetch and keepalive) and
+# every ESPN/Telegram request over one pooled async HTTP client. Blocking storage
+# and Gemini calls share a small fixed thread pool, so the thread count stays flat
+# however many leagues and channels are served. The leader heartbeat gets a thread of
+# its own, so a pool busy with slow jobs can never hold up a lease renewal.
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import http_client
+import telegram_bot
+from config import ASYNC_BLOCKING_THREADS
+
+_loop = None
+
+
+def get_loop():
+    """The runtime's event loop (None until run() has started it)."""
+    return _loop
+
+
+async def _serve(elector, on_started=None):
+    global _loop
+    _loop = asyncio.get_running_loop()
+    _loop.set_default_executor(
+        ThreadPoolExecutor(max_workers=ASYNC_BLOCKING_THREADS, thread_name_prefix="blocking"))
+    telegram_bot.use_asyncio(_loop)
+    # Lease I/O can block (file lock, storage round-trip), so heartbeats run off the loop,
+    # on a thread the blocking job pool cannot starve
+    lease = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lease")
+    try:
+        await _loop.run_in_executor(lease, elector.step)
+        if on_started is not None:
+            on_started()
+        while True:
+            await asyncio.sleep(elector.heartbeat)
+            await _loop.run_in_executor(lease, elector.step)
+    finally:
+        lease.shutdown(wait=False)
+        await http_client.aclose()
+
+
+def run(elector, on_started=None):
+    """Run the bot on an event loop until the process exits."""
+    asyncio.run(_serve(elector, on_started))
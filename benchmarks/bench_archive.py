@@ -0,0 +1,90 @@
+# benchmarks/bench_archive.py
+#
+# Times the columnar results archive on synthetic seasons: appending posted
+# results in matchday batches, reopening (mmap + index build), and the stats
+# queries (league table, head-to-head, form).
+# Usage: python benchmarks/bench_archive.py [seasons] [leagues]
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("BOT_TOKEN", "0:bench")
+os.environ.setdefault("CHANNEL_ID", "-1000000000000")
+os.environ.setdefault("GOOGLE_AI_KEY", "bench")
+os.environ.setdefault("PERSONAL_CHAT_ID", "1")
+os.environ.setdefault("FIREBASE_KEY_B64", "e30=")
+
+from archive import ResultsArchive  # noqa: E402
+
+TEAMS_PER_LEAGUE = 20
+
+
+def make_results(seasons, leagues):
+    """Double round-robin per league and season, one matchday a week."""
+    rng = random.Random(7)
+    results = []
+    match_id = 400000
+    for season in range(seasons):
+        start = datetime(2015 + season, 8, 10, 14, 0, tzinfo=timezone.utc)
+        for lg in range(leagues):
+            teams = [f"Club {lg}-{t}" for t in range(TEAMS_PER_LEAGUE)]
+            fixtures = [(h, a) for h in teams for a in teams if h != a]
+            for i, (home, away) in enumerate(fixtures):
+                match_id += 1
+                results.append({
+                    "match_id":     str(match_id),
+                    "league_code":  f"sim.{lg}",
+                    "home":         home,
+                    "away":         away,
+                    "home_score":   rng.randint(0, 4),
+                    "away_score":   rng.randint(0, 3),
+                    "utc_datetime": (start + timedelta(days=7 * (i // 10))).isoformat(),
+                })
+    results.sort(key=lambda r: r["utc_datetime"])
+    return results
+
+
+def timed_op(label, fn, repeat=1):
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    elapsed = (time.perf_counter() - t0) / repeat
+    print(f"{label:<32} {elapsed * 1000:9.3f} ms")
+    return result
+
+
+def main():
+    seasons = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    leagues = int(sys.argv[2]) if len(sys.argv) > 2 else 40
+    results = make_results(seasons, leagues)
+    print(f"{len(results)} results ({seasons} seasons x {leagues} leagues)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResultsArchive(tmp)
+
+        def append_all():
+            for i in range(0, len(results), 200):
+                store.append(results[i:i + 200])
+        timed_op("append (batches of 200)", append_all)
+        size = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp))
+        print(f"{'on disk':<32} {size / len(results):9.1f} B/match")
+
+        store.close()
+        timed_op("reopen + index", lambda: len(store))
+
+        last = datetime(2015 + seasons - 1, 7, 1, tzinfo=timezone.utc)
+        timed_op("league table (all seasons)", lambda: store.league_table("sim.0"), 20)
+        timed_op("league table (one season)", lambda: store.league_table("sim.0", since=last), 20)
+        timed_op("head-to-head", lambda: store.head_to_head("Club 0-0", "Club 0-1"), 20)
+        timed_op("form (last 5)", lambda: store.form("Club 0-0"), 20)
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# benchmarks/bench_renderer.py
+#
+# Micro-benchmark for the fixtures renderer: sort + render a synthetic matchday.
+# Usage: python benchmarks/bench_renderer.py [matches] [repeats]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from renderer import LEAGUE_ALIASES, sort_fixtures, render_fixtures  # noqa: E402
+
+
+def make_matches(n):
+    leagues = list(LEAGUE_ALIASES) or ["Premier League", "LaLiga", "Serie A"]
+    matches = []
+    for i in range(n):
+        home, away = f"Home Club_{i} FC", f"Away [Club] {i}"
+        matches.append({
+            "match_id":   str(700000 + i),
+            "home":       home,
+            "away":       away,
+            "league":     leagues[(i * 7) % len(leagues)],
+            "local_time": "19:45",
+            "utc_time":   "18:45",
+        })
+    team_info = {}
+    for m in matches:
+        team_info[m["home"]] = ("🔴", m["home"][:12])
+        team_info[m["away"]] = ("🔵", m["away"][:12])
+    return matches, team_info
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    matches, team_info = make_matches(n)
+
+    best = float("inf")
+    for _ in range(repeats):
+        batch = list(matches)
+        t0 = time.perf_counter()
+        sort_fixtures(batch)
+        text = render_fixtures(batch, team_info)
+        best = min(best, time.perf_counter() - t0)
+
+    print(f"{n} matches: best {best * 1e3:.3f} ms total, "
+          f"{best / n * 1e6:.2f} µs/match, {len(text)} chars")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# benchmarks/bench_scoreboard.py
+#
+# Compare scoreboard.parse_scoreboard with the original per-event loop on a
+# synthetic multi-day, all-league payload.
+# Usage: python benchmarks/bench_scoreboard.py [events_per_league] [days]
+
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pytz
+from dateutil import parser as _p2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scoreboard import LOCAL_TIMEZONES, parse_scoreboard  # noqa: E402
+
+UTC = pytz.utc
+
+
+def make_payload(league, n_events, days):
+    base = datetime(2024, 8, 17, 11, 30)
+    events = []
+    for i in range(n_events * days):
+        kickoff = base + timedelta(days=i % days, minutes=15 * (i % 40))
+        events.append({
+            "id": f"{abs(hash(league)) % 10000}{i:05d}",
+            "league": {"name": league},
+            "status": {"type": {"name": "STATUS_SCHEDULED", "completed": False}},
+            "competitions": [{
+                "date": kickoff.strftime("%Y-%m-%dT%H:%MZ"),
+                "competitors": [
+                    {"homeAway": "home", "score": "0", "team": {"displayName": f"Home {i}"}},
+                    {"homeAway": "away", "score": "0", "team": {"displayName": f"Away {i}"}},
+                ],
+            }],
+        })
+    return json.dumps({"leagues": [{"name": league}], "events": events}).encode()
+
+
+def legacy_parse(content, league):
+    """The pre-scoreboard.py loop from get_fixtures, kept here as the baseline."""
+    data = json.loads(content)
+    fixtures = []
+    for event in data.get("events", []):
+        comp = (event.get("competitions") or [])[0]
+        iso_time = comp.get("date")
+        try:
+            match_time_utc = datetime.fromisoformat(iso_time.rstrip("Z")).replace(tzinfo=UTC)
+        except Exception:
+            match_time_utc = _p2.parse(iso_time)
+        league_name = event.get("league", {}).get("name") or data.get("leagues", [{}])[0].get("name")
+        local_tz = pytz.timezone(LOCAL_TIMEZONES.get(league_name, "UTC"))
+        local_dt = match_time_utc.astimezone(local_tz)
+        home = next(t for t in comp["competitors"] if t.get("homeAway") == "home")
+        away = next(t for t in comp["competitors"] if t.get("homeAway") == "away")
+        status = (event.get("status", {}).get("type", {}).get("name") or "").upper()
+        fixtures.append({
+            "match_id":     event.get("id"),
+            "home":         home["team"]["displayName"],
+            "away":         away["team"]["displayName"],
+            "local_time":   local_dt.strftime("%H:%M"),
+            "utc_time":     match_time_utc.strftime("%H:%M"),
+            "status":       status,
+            "league_code":  league,
+            "league":       league_name,
+            "home_score":   int(home.get("score", 0)),
+            "away_score":   int(away.get("score", 0)),
+            "utc_datetime": match_time_utc.isoformat(),
+        })
+    return list({m["match_id"]: m for m in fixtures}.values())
+
+
+def best_of(fn, payloads, repeats):
+    best = float("inf")
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        total = sum(len(fn(content, league)) for league, content in payloads)
+        best = min(best, time.perf_counter() - t0)
+    return best, total
+
+
+def main():
+    per_league = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    leagues = list(LOCAL_TIMEZONES) or [f"lg.{i}" for i in range(60)]
+    payloads = [(league, make_payload(league, per_league, days)) for league in leagues]
+
+    old, n = best_of(legacy_parse, payloads, 5)
+    new, _ = best_of(parse_scoreboard, payloads, 5)
+    print(f"{len(leagues)} leagues × {days} days, {n} events")
+    print(f"  legacy loop:      {old * 1e3:8.2f} ms ({old / n * 1e6:.2f} µs/event)")
+    print(f"  parse_scoreboard: {new * 1e3:8.2f} ms ({new / n * 1e6:.2f} µs/event)")
+    print(f"  speed-up: {old / new:.1f}×")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/bench_storage.py
+#
+# Times the SQLite storage backend on a synthetic matchday: bulk save, due-match
+# query, next_check updates, team mapping reads/writes and bulk delete.
+# Usage: python benchmarks/bench_storage.py [matches]
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("BOT_TOKEN", "0:bench")
+os.environ.setdefault("CHANNEL_ID", "-1000000000000")
+os.environ.setdefault("GOOGLE_AI_KEY", "bench")
+os.environ.setdefault("PERSONAL_CHAT_ID", "1")
+os.environ["STORAGE_BACKEND"] = "sqlite"
+
+import storage  # noqa: E402
+from sqlite_backend import SQLiteBackend  # noqa: E402
+
+
+def make_matches(n, start):
+    matches = []
+    for i in range(n):
+        kickoff = start + timedelta(minutes=(i * 17) % 1200)
+        matches.append({
+            "match_id":     str(800000 + i),
+            "league_code":  f"sim.{i % 50}",
+            "home":         f"Home Club {i}",
+            "away":         f"Away Club {i}",
+            "utc_datetime": kickoff.isoformat(),
+            "kickoff":      kickoff,
+            "next_check":   kickoff + timedelta(minutes=15),
+        })
+    return matches
+
+
+def timed_op(label, fn, per=1):
+    t0 = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - t0
+    print(f"{label:<28} {elapsed * 1000:9.2f} ms  ({elapsed * 1e6 / max(per, 1):8.1f} µs/item)")
+    return result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    start = datetime(2024, 8, 17, 8, 30, tzinfo=timezone.utc)
+    matches = make_matches(n, start)
+    teams = {f"Home Club {i}": {"short_name": f"Home {i}", "emoji": "⚽"} for i in range(n)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage.set_backend(SQLiteBackend(os.path.join(tmp, "bench.db")))
+        stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+        try:
+            storage.warm_up()
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+
+        def quiet(fn):
+            def run():
+                saved, sys.stdout = sys.stdout, open(os.devnull, "w")
+                try:
+                    return fn()
+                finally:
+                    sys.stdout.close()
+                    sys.stdout = saved
+            return run
+
+        timed_op("save_matches", quiet(lambda: storage.save_matches(matches)), n)
+        timed_op("save_matches (all exist)", quiet(lambda: storage.save_matches(matches)), n)
+        now = start + timedelta(hours=6)
+        due = timed_op("get_due_matches", lambda: storage.get_due_matches(now), n)
+        timed_op("set_next_checks", lambda: storage.set_next_checks(
+            {m["match_id"]: now + timedelta(minutes=15) for m in due}), len(due))
+        timed_op("get_match x1000", lambda: [storage.get_match(m["match_id"]) for m in matches[:1000]], 1000)
+        timed_op("save_team_mappings", quiet(lambda: storage.save_team_mappings(teams)), n)
+        timed_op("get_team_mappings", lambda: storage.get_team_mappings(list(teams)), n)
+        timed_op("remove_matches", quiet(lambda: storage.remove_matches(matches)), n)
+        storage.set_backend(None)
+
+
+if __name__ == "__main__":
+    main()
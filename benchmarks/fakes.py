@@ -0,0 +1,183 @@
+# benchmarks/fakes.py
+#
+# In-process stand-ins used by the replay harness: a controllable clock, an in-memory
+# replacement for the storage functions and a stub for the Gemini team shortener.
+
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytz
+
+UTC = pytz.utc
+
+
+class FakeClock:
+    def __init__(self, start: datetime):
+        self._now = start.astimezone(UTC)
+        self._lock = threading.Lock()
+
+    def __call__(self) -> datetime:
+        with self._lock:
+            return self._now
+
+    def advance(self, delta: timedelta):
+        with self._lock:
+            self._now += delta
+
+    def set(self, when: datetime):
+        with self._lock:
+            self._now = when.astimezone(UTC)
+
+
+class InMemoryStorage:
+    """Implements the storage module's functions against dicts and counts every call."""
+
+    def __init__(self):
+        self.matches = {}
+        self.teams = {}
+        self.channels = {}
+        self.ops = Counter()
+        self._lock = threading.Lock()
+
+    def _count(self, name, rpcs=1):
+        with self._lock:
+            self.ops[name] += 1
+            self.ops["rpcs"] += rpcs
+
+    # matches
+
+    def save_matches(self, matches):
+        self._count("save_matches")
+        created = []
+        with self._lock:
+            for m in matches:
+                mid = str(m["match_id"])
+                if mid not in self.matches:
+                    self.matches[mid] = dict(m)
+                    created.append(mid)
+        return created
+
+    def save_match_to_db(self, match):
+        self._count("save_match_to_db", rpcs=2)
+        with self._lock:
+            self.matches.setdefault(str(match["match_id"]), dict(match))
+
+    def get_match(self, match_id):
+        self._count("get_match")
+        with self._lock:
+            m = self.matches.get(str(match_id))
+            return dict(m) if m else None
+
+    def get_tracked_matches(self):
+        self._count("get_tracked_matches")
+        with self._lock:
+            return [dict(m) for m in self.matches.values()]
+
+    def get_due_matches(self, now, limit=None):
+        self._count("get_due_matches")
+        with self._lock:
+            due = sorted(
+                (dict(m) for m in self.matches.values() if m.get("next_check") and m["next_check"] <= now),
+                key=lambda m: m["next_check"],
+            )
+        return due[:limit] if limit else due
+
+    def set_next_checks(self, next_checks):
+        self._count("set_next_checks")
+        with self._lock:
+            for mid, when in next_checks.items():
+                if str(mid) in self.matches:
+                    self.matches[str(mid)]["next_check"] = when
+
+    def backfill_match_timestamps(self, first_check_after):
+        self._count("backfill_match_timestamps")
+
+    def remove_matches(self, matches):
+        self._count("remove_matches")
+        with self._lock:
+            for m in matches:
+                self.matches.pop(str(m["match_id"]), None)
+
+    def remove_match_from_db(self, match):
+        self.remove_matches([match])
+
+    # teams
+
+    def get_team_mapping(self, team_name):
+        self._count("get_team_mapping")
+        return self.teams.get(team_name)
+
+    def get_team_mappings(self, team_names):
+        self._count("get_team_mappings")
+        return {n: self.teams[n] for n in team_names if n in self.teams}
+
+    def get_all_team_mappings(self, limit=None):
+        self._count("get_all_team_mappings")
+        return dict(self.teams)
+
+    def save_team_mapping(self, team_name, short_name, emoji):
+        self._count("save_team_mapping")
+        self.teams[team_name] = {"short_name": short_name, "emoji": emoji}
+
+    def save_team_mappings(self, mappings):
+        self._count("save_team_mappings")
+        for name, m in mappings.items():
+            self.teams[name] = {"short_name": m["short_name"], "emoji": m["emoji"]}
+
+    # channels
+
+    def get_subscriptions(self):
+        self._count("get_subscriptions")
+        return {chat_id: dict(doc) for chat_id, doc in self.channels.items()}
+
+    def save_subscription(self, chat_id, leagues=None, priority=None):
+        self._count("save_subscription")
+        self.channels[str(chat_id)] = {
+            "leagues": list(leagues) if leagues is not None else None,
+            "priority": list(priority or []),
+        }
+
+    def remove_subscription(self, chat_id):
+        self._count("remove_subscription")
+        self.channels.pop(str(chat_id), None)
+
+    def functions(self):
+        return {
+            name: getattr(self, name)
+            for name in dir(self)
+            if not name.startswith("_") and callable(getattr(self, name)) and name != "functions"
+        }
+
+
+class StubShortener:
+    """Deterministic replacement for ai_processor.shorten_and_emoji(_batch)."""
+
+    def __init__(self):
+        self.calls = 0
+        self.names = 0
+
+    def batch(self, team_names):
+        self.calls += 1
+        names = list(dict.fromkeys(n for n in team_names if n))
+        self.names += len(names)
+        return {n: {"short_name": " ".join(n.split()[:2]), "emoji": "⚽"} for n in names}
+
+    def single(self, team_name):
+        return self.batch([team_name])[team_name]
+
+
+def install(modules, storage: InMemoryStorage, shortener: StubShortener):
+    """
+    Point every already-imported app module at the fakes. Modules that did
+    `from storage import x` hold their own reference, so each one is patched.
+    """
+    fns = storage.functions()
+    for module in modules:
+        for name, fn in fns.items():
+            if hasattr(module, name):
+                setattr(module, name, fn)
+        if hasattr(module, "shorten_and_emoji_batch"):
+            module.shorten_and_emoji_batch = shortener.batch
+        if hasattr(module, "shorten_and_emoji"):
+            module.shorten_and_emoji = shortener.single
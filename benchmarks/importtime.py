@@ -0,0 +1,59 @@
+# benchmarks/importtime.py
+#
+# Measure the cold import cost of the web entry point with `python -X importtime`
+# and fail if it exceeds the budget. Dummy credentials are injected so config loads.
+# Usage: python benchmarks/importtime.py [module] [budget_ms]
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DUMMY_ENV = {
+    "BOT_TOKEN": "0:dummy",
+    "CHANNEL_ID": "-1000000000000",
+    "GOOGLE_AI_KEY": "dummy",
+    "PERSONAL_CHAT_ID": "0",
+    "FIREBASE_KEY_B64": "e30=",  # "{}"
+}
+
+
+def measure(module):
+    env = {**DUMMY_ENV, **os.environ}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr[-2000:])
+        raise SystemExit(f"import {module} failed")
+
+    # Lines look like "import time:   self_us |   cumulative_us |   name"
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(cumulative_us), int(self_us), name.strip()))
+    return rows
+
+
+def main():
+    module = sys.argv[1] if len(sys.argv) > 1 else "main"
+    budget_ms = float(sys.argv[2]) if len(sys.argv) > 2 else float(os.getenv("IMPORT_BUDGET_MS", "400"))
+
+    rows = measure(module)
+    total_us = next((c for c, _, name in rows if name == module), max(c for c, _, _ in rows))
+    print(f"import {module}: {total_us / 1000:.1f} ms (budget {budget_ms:.0f} ms)")
+    print("slowest imports (cumulative):")
+    for cumulative, _, name in sorted(rows, key=lambda r: -r[0])[:10]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    if total_us / 1000 > budget_ms:
+        raise SystemExit(f"❌ import {module} exceeds the {budget_ms:.0f} ms budget")
+    print("✅ within budget")
+
+
+if __name__ == "__main__":
+    main()
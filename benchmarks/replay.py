@@ -0,0 +1,193 @@
+# benchmarks/replay.py
+#
+# Replay a whole matchday offline through post_daily_fixtures and post_results,
+# against the local ESPN/Telegram stand-in, in-memory storage, a stubbed AI
+# shortener and a fake clock that jumps from tick to tick.
+#
+# Usage: python benchmarks/replay.py [league counts...]   (default: 10 100 1000)
+#        RUNTIME=asyncio python benchmarks/replay.py ...   drives the coroutine jobs instead
+
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Dummy credentials and wide-open Telegram limits; must be set before config loads
+os.environ.setdefault("BOT_TOKEN", "0:replay")
+os.environ.setdefault("CHANNEL_ID", "-1000000000000")
+os.environ.setdefault("GOOGLE_AI_KEY", "replay")
+os.environ.setdefault("PERSONAL_CHAT_ID", "1")
+os.environ.setdefault("FIREBASE_KEY_B64", "e30=")
+os.environ.setdefault("TEAM_CACHE_PRELOAD", "0")
+os.environ.setdefault("WARMUP_ON_START", "0")
+os.environ.setdefault("JOURNAL_PATH", os.path.join(tempfile.mkdtemp(prefix="replay-"), "replay.journal"))
+for knob in ("TG_GLOBAL_RATE", "TG_CHAT_RATE", "TG_GROUP_PER_MINUTE"):
+    os.environ.setdefault(knob, "1000000")
+
+import pytz  # noqa: E402
+
+import archive  # noqa: E402
+import async_runtime  # noqa: E402
+import clock  # noqa: E402
+import enrichment  # noqa: E402
+import fixture_cache  # noqa: E402
+import formatter  # noqa: E402
+import get_fixtures  # noqa: E402
+import get_results  # noqa: E402
+import http_client  # noqa: E402
+import journal  # noqa: E402
+import scheduler  # noqa: E402
+import snapshots  # noqa: E402
+import storage  # noqa: E402
+import subscriptions  # noqa: E402
+import team_cache  # noqa: E402
+import telegram_bot  # noqa: E402
+
+from fakes import FakeClock, InMemoryStorage, StubShortener, install  # noqa: E402
+from standin import MatchdaySim, StandIn  # noqa: E402
+
+IST = pytz.timezone("Asia/Kolkata")
+UTC = pytz.utc
+
+MATCHES_PER_LEAGUE = 5
+TICK = timedelta(minutes=15)
+MAX_TICKS = 30 * 4
+
+ASYNC = scheduler.ASYNC
+_loop = None
+
+
+def _run(job, async_job):
+    """Run a job the way the configured runtime would: directly, or as a coroutine on the loop."""
+    global _loop
+    if not ASYNC:
+        return job()
+    if _loop is None:
+        _loop = asyncio.new_event_loop()
+        _loop.set_default_executor(ThreadPoolExecutor(max_workers=async_runtime.ASYNC_BLOCKING_THREADS))
+        threading.Thread(target=_loop.run_forever, name="replay-loop", daemon=True).start()
+        telegram_bot.use_asyncio(_loop)
+    return asyncio.run_coroutine_threadsafe(async_job(), _loop).result()
+
+
+APP_MODULES = [storage, team_cache, subscriptions, enrichment, formatter, get_results, scheduler, telegram_bot]
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def replay(n_leagues, quiet=True):
+    window_start = IST.localize(datetime(2024, 8, 17, 14, 0)).astimezone(UTC)
+    fake_clock = FakeClock(window_start)
+    clock.set_source(fake_clock)
+
+    leagues = [f"sim.{i}" for i in range(n_leagues)]
+    sim = MatchdaySim(fake_clock, leagues, MATCHES_PER_LEAGUE, window_start)
+    standin = StandIn(sim).start()
+    store, shortener = InMemoryStorage(), StubShortener()
+    install(APP_MODULES, store, shortener)
+    team_cache.clear()
+    fixture_cache.clear()
+    snapshots.clear()
+    journal.journal.clear()
+    archive.archive = archive.ResultsArchive(tempfile.mkdtemp(prefix="replay-archive-"))
+    subscriptions.invalidate()
+
+    get_fixtures.ESPN_FIXTURES_URL = f"{standin.base_url}/apis/site/v2/sports/soccer/{{}}/scoreboard"
+    telegram_bot.SEND_URL = f"{standin.base_url}/bot0:replay/sendMessage"
+    scheduler.load_leagues = lambda: leagues
+
+    # Record when each result is handed to Telegram (in simulated time)
+    posted_at = {}
+    send_results = telegram_bot.send_results
+
+    def recording_send_results(matches):
+        for m in matches:
+            posted_at[m["match_id"]] = fake_clock()
+        return send_results(matches)
+
+    get_results.send_results = recording_send_results
+
+    stats_before = http_client.stats()
+    stdout = sys.stdout
+    if quiet:
+        sys.stdout = open(os.devnull, "w")
+    t0 = time.perf_counter()
+    try:
+        _run(scheduler.post_daily_fixtures, scheduler.post_daily_fixtures_async)
+        telegram_bot.outbound.join()
+        daily_s = time.perf_counter() - t0
+        ticks = 0
+        while store.matches and ticks < MAX_TICKS:
+            fake_clock.advance(TICK)
+            _run(get_results.post_results, get_results.post_results_async)
+            telegram_bot.outbound.join()
+            ticks += 1
+        wall_s = time.perf_counter() - t0
+        enrichment.enricher.join()
+    finally:
+        if quiet:
+            sys.stdout.close()
+            sys.stdout = stdout
+        clock.set_source(None)
+        get_results.send_results = send_results
+        standin.stop()
+
+    latencies = [
+        (posted_at[mid] - ft).total_seconds() / 60
+        for mid, ft in sim.full_time.items()
+        if mid in posted_at
+    ]
+    client = {}
+    for host, s in http_client.stats().items():
+        before = stats_before.get(host, {})
+        client = {k: client.get(k, 0) + v - before.get(k, 0) for k, v in s.items()}
+
+    return {
+        "leagues": n_leagues,
+        "matches": len(sim.full_time),
+        "posted": len(posted_at),
+        "ticks": ticks,
+        "daily_s": daily_s,
+        "wall_s": wall_s,
+        "espn_requests": standin.espn_requests,
+        "espn_304": standin.espn_not_modified,
+        "telegram_requests": standin.telegram_requests,
+        "client_bytes": client.get("bytes", 0),
+        "storage_calls": sum(v for k, v in store.ops.items() if k != "rpcs"),
+        "storage_rpcs": store.ops["rpcs"],
+        "ai_calls": shortener.calls,
+        "latency_p50_min": _percentile(latencies, 0.5),
+        "latency_max_min": max(latencies, default=0.0),
+    }
+
+
+def main():
+    counts = [int(a) for a in sys.argv[1:]] or [10, 100, 1000]
+    header = (f"{'leagues':>7} {'matches':>7} {'posted':>6} {'daily s':>8} {'wall s':>7} "
+              f"{'ESPN':>6} {'304':>5} {'TG':>5} {'KiB':>7} {'store':>6} {'rpcs':>5} {'AI':>3} "
+              f"{'p50 min':>7} {'max min':>7}")
+    print(f"runtime: {'asyncio' if ASYNC else 'threads'}")
+    print(header)
+    for n in counts:
+        r = replay(n)
+        print(f"{r['leagues']:>7} {r['matches']:>7} {r['posted']:>6} {r['daily_s']:>8.2f} {r['wall_s']:>7.2f} "
+              f"{r['espn_requests']:>6} {r['espn_304']:>5} {r['telegram_requests']:>5} "
+              f"{r['client_bytes'] / 1024:>7.0f} {r['storage_calls']:>6} {r['storage_rpcs']:>5} {r['ai_calls']:>3} "
+              f"{r['latency_p50_min']:>7.1f} {r['latency_max_min']:>7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+# benchmarks/standin.py
+#
+# Local HTTP stand-in for the ESPN scoreboard API and the Telegram Bot API. ESPN
+# responses are generated from a recorded scoreboard and a simulated matchday whose
+# statuses follow the fake clock; Telegram calls are recorded.
+
+import copy
+import hashlib
+import json
+import os
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RECORDED_SCOREBOARD = os.path.join(HERE, "fixtures", "espn_scoreboard_eng1.json")
+
+# (minutes after kickoff, ESPN status) — full time is added per match
+PHASES = [
+    (0,  "STATUS_FIRST_HALF", "in"),
+    (47, "STATUS_HALFTIME", "in"),
+    (63, "STATUS_SECOND_HALF", "in"),
+]
+
+
+def load_recorded():
+    with open(RECORDED_SCOREBOARD, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class MatchdaySim:
+    """A synthetic matchday: `per_league` matches in each league, kickoffs spread over the window."""
+
+    def __init__(self, clock, leagues, per_league, window_start, window_hours=20):
+        self.clock = clock
+        self.recorded = load_recorded()
+        template = self.recorded["events"][0]
+        self.leagues = {}
+        self.full_time = {}
+        n = 0
+        for li, league in enumerate(leagues):
+            events = []
+            for k in range(per_league):
+                n += 1
+                kickoff = window_start + timedelta(minutes=30 + ((li * 37 + k * 211) % (window_hours * 60)))
+                ft_after = 106 + (n * 7) % 14
+                event = copy.deepcopy(template)
+                event_id = str(900000 + n)
+                event["id"] = event_id
+                event["league"] = {"name": f"Sim League {li}", "slug": league}
+                comp = event["competitions"][0]
+                comp["id"] = event_id
+                comp["date"] = kickoff.strftime("%Y-%m-%dT%H:%MZ")
+                comp["competitors"][0]["team"]["displayName"] = f"Home Club {li}-{k}"
+                comp["competitors"][1]["team"]["displayName"] = f"Away Club {li}-{k}"
+                events.append((kickoff, ft_after, event))
+                self.full_time[event_id] = kickoff + timedelta(minutes=ft_after)
+            self.leagues[league] = events
+
+    def _status(self, kickoff, ft_after, now):
+        elapsed = (now - kickoff).total_seconds() / 60
+        if elapsed < 0:
+            return "STATUS_SCHEDULED", "pre", False
+        if elapsed >= ft_after:
+            return "STATUS_FULL_TIME", "post", True
+        name, state = "STATUS_SCHEDULED", "pre"
+        for start, phase, phase_state in PHASES:
+            if elapsed >= start:
+                name, state = phase, phase_state
+        return name, state, False
+
+    def scoreboard(self, league, dates):
+        now = self.clock()
+        if dates and "-" in dates:
+            first, last = dates.split("-", 1)
+        else:
+            first = last = dates
+        events = []
+        for kickoff, ft_after, event in self.leagues.get(league, []):
+            day = kickoff.strftime("%Y%m%d")
+            if first and not (first <= day <= last):
+                continue
+            name, state, completed = self._status(kickoff, ft_after, now)
+            event = dict(event)
+            event["status"] = {"type": {"name": name, "state": state, "completed": completed}}
+            events.append(event)
+        payload = {"leagues": [{"name": f"Sim {league}", "slug": league}], "events": events}
+        return json.dumps(payload).encode()
+
+
+class StandIn:
+    """Runs the stand-in server on a background thread and counts requests."""
+
+    def __init__(self, sim):
+        self.sim = sim
+        self.espn_requests = 0
+        self.espn_not_modified = 0
+        self.telegram_requests = 0
+        self.messages = []
+        self._lock = threading.Lock()
+        # The async runtime opens a burst of pooled connections; the default backlog of 5 drops them
+        ThreadingHTTPServer.request_queue_size = 128
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Send headers and body in one segment; avoids delayed-ACK stalls on keep-alive
+            disable_nagle_algorithm = True
+            wbufsize = -1
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, code, body=b"", headers=None):
+                self.send_response(code)
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if body:
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                parts = url.path.strip("/").split("/")
+                if len(parts) < 2 or parts[-1] != "scoreboard":
+                    return self._reply(404)
+                dates = (parse_qs(url.query).get("dates") or [None])[0]
+                body = standin.sim.scoreboard(parts[-2], dates)
+                etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+                with standin._lock:
+                    standin.espn_requests += 1
+                    if self.headers.get("If-None-Match") == etag:
+                        standin.espn_not_modified += 1
+                        return self._reply(304, headers={"ETag": etag})
+                self._reply(200, body, {"Content-Type": "application/json", "ETag": etag})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                with standin._lock:
+                    standin.telegram_requests += 1
+                    message_id = len(standin.messages) + 1
+                    standin.messages.append((standin.sim.clock(), self.path.rsplit("/", 1)[-1], payload))
+                body = json.dumps({"ok": True, "result": {"message_id": message_id}}).encode()
+                self._reply(200, body, {"Content-Type": "application/json"})
+
+        return Handler
@@ -0,0 +1,24 @@
+# clock.py
+#
+# Single source of "now" for match logic, so replays and benchmarks can drive time.
+
+from datetime import datetime
+
+import pytz
+
+UTC = pytz.utc
+
+_source = None
+
+
+def now(tz=UTC) -> datetime:
+    """Current time in tz (UTC by default), from the override source if one is set."""
+    if _source is None:
+        return datetime.now(tz)
+    return _source().astimezone(tz)
+
+
+def set_source(source):
+    """Install a callable returning an aware datetime; None restores the wall clock."""
+    global _source
+    _source = source
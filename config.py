@@ -2,6 +2,8 @@
 
 import os
 import base64
+import json
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,20 +13,112 @@ CHANNEL_ID       = os.getenv("CHANNEL_ID")
 GOOGLE_AI_KEY    = os.getenv("GOOGLE_AI_KEY")
 PERSONAL_CHAT_ID = os.getenv("PERSONAL_CHAT_ID")
 
-# Get and decode Base64-encoded Firebase key
+# Storage backend: "firestore" (default) or "sqlite" (local WAL file at SQLITE_PATH)
+STORAGE_BACKENDS = ("firestore", "sqlite")
+STORAGE_BACKEND  = os.getenv("STORAGE_BACKEND", "firestore").strip().lower()
+SQLITE_PATH      = os.getenv("SQLITE_PATH", "football_bot.db")
+if STORAGE_BACKEND not in STORAGE_BACKENDS:
+    raise ValueError(f"❌ Error: Unknown STORAGE_BACKEND {STORAGE_BACKEND!r} "
+                     f"(expected one of {', '.join(STORAGE_BACKENDS)}).")
+
+# Base64-encoded Firebase key; decoded in memory on first use (no temp file)
 FIREBASE_KEY_B64 = os.getenv("FIREBASE_KEY_B64")
-if not FIREBASE_KEY_B64:
+if STORAGE_BACKEND == "firestore" and not FIREBASE_KEY_B64:
     raise ValueError("❌ Error: Missing FIREBASE_KEY_B64 in environment variables.")
 
-# Ensure config/ exists, then write decoded JSON
-os.makedirs("config", exist_ok=True)
-key_json = base64.b64decode(FIREBASE_KEY_B64).decode("utf-8")
-with open("config/firebase-key.json", "w") as f:
-    f.write(key_json)
+def firebase_credentials() -> dict:
+    """Service-account info for firebase_admin.credentials.Certificate."""
+    return json.loads(base64.b64decode(FIREBASE_KEY_B64).decode("utf-8"))
 
 FIRESTORE_COLLECTION = "fixtures"
 BASE_URL = "https://site.api.espn.com/apis/site/v2/sports/soccer"
 
+# ESPN fetch tuning: parallel league fetches and per-request timeout (seconds)
+FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", "8"))
+FETCH_TIMEOUT     = float(os.getenv("FETCH_TIMEOUT", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+
+# Telegram outbound limits: messages/s overall, per private chat, per group/channel per minute
+TG_GLOBAL_RATE      = float(os.getenv("TG_GLOBAL_RATE", "30"))
+TG_CHAT_RATE        = float(os.getenv("TG_CHAT_RATE", "1"))
+TG_GROUP_PER_MINUTE = float(os.getenv("TG_GROUP_PER_MINUTE", "20"))
+TG_QUEUE_SIZE       = int(os.getenv("TG_QUEUE_SIZE", "1000"))
+
+# Runtime: "threads" (BackgroundScheduler + blocking I/O) or "asyncio" (one event loop,
+# AsyncIOScheduler, pooled async HTTP for ESPN/Telegram; storage and Gemini calls go to
+# a pool of ASYNC_BLOCKING_THREADS threads). ASYNC_HTTP_CONNECTIONS caps the shared pool
+# and ASYNC_FETCH_CONCURRENCY the ESPN requests in flight.
+RUNTIMES                = ("threads", "asyncio")
+RUNTIME                 = os.getenv("RUNTIME", "threads").strip().lower()
+ASYNC_HTTP_CONNECTIONS  = int(os.getenv("ASYNC_HTTP_CONNECTIONS", "16"))
+ASYNC_FETCH_CONCURRENCY = int(os.getenv("ASYNC_FETCH_CONCURRENCY", "16"))
+ASYNC_BLOCKING_THREADS  = int(os.getenv("ASYNC_BLOCKING_THREADS", "4"))
+if RUNTIME not in RUNTIMES:
+    raise ValueError(f"❌ Error: Unknown RUNTIME {RUNTIME!r} (expected one of {', '.join(RUNTIMES)}).")
+
+# Warm heavy SDK clients (Firestore, Gemini, team cache) in the background at startup
+WARMUP_ON_START = os.getenv("WARMUP_ON_START", "1") not in ("0", "false", "False")
+
+# Leader election for the scheduled jobs: "file" (flock, one machine), "storage"
+# (lease in the storage backend, many instances) or "none"
+LEADER_ELECTIONS = ("file", "storage", "none")
+LEADER_ELECTION  = os.getenv("LEADER_ELECTION", "file").strip().lower()
+LEADER_LOCK_PATH = os.getenv("LEADER_LOCK_PATH", os.path.join(tempfile.gettempdir(), "football_bot.leader.lock"))
+LEASE_TTL        = float(os.getenv("LEASE_TTL", "20"))
+if LEADER_ELECTION not in LEADER_ELECTIONS:
+    raise ValueError(f"❌ Error: Unknown LEADER_ELECTION {LEADER_ELECTION!r} "
+                     f"(expected one of {', '.join(LEADER_ELECTIONS)}).")
+
+# ESPN resilience: a league's breaker opens after BREAKER_FAILURES consecutive failures
+# and probes again after BREAKER_RESET s (doubling up to BREAKER_RESET_MAX). Callers get
+# the last good snapshot if ESPN has not answered within SWR_WAIT s.
+BREAKER_FAILURES  = int(os.getenv("BREAKER_FAILURES", "3"))
+BREAKER_RESET     = float(os.getenv("BREAKER_RESET", "60"))
+BREAKER_RESET_MAX = float(os.getenv("BREAKER_RESET_MAX", "900"))
+SWR_WAIT          = float(os.getenv("SWR_WAIT", "2"))
+SNAPSHOT_MAX      = int(os.getenv("SNAPSHOT_MAX", "2048"))
+
+# Outbound journal (JSON lines) used to resume result deliveries after a crash; empty
+# disables it. Records are fsynced in batches gathered for up to JOURNAL_FSYNC_INTERVAL
+# s, and the file is compacted after JOURNAL_COMPACT_EVERY records. Finished deliveries
+# are remembered for JOURNAL_RETENTION s. An interrupted delivery is resumed at most
+# JOURNAL_MAX_ATTEMPTS times, and only within JOURNAL_RESUME_WINDOW s of becoming due.
+JOURNAL_PATH           = os.getenv("JOURNAL_PATH", "football_bot.journal")
+JOURNAL_FSYNC_INTERVAL = float(os.getenv("JOURNAL_FSYNC_INTERVAL", "0.05"))
+JOURNAL_COMPACT_EVERY  = int(os.getenv("JOURNAL_COMPACT_EVERY", "5000"))
+JOURNAL_RETENTION      = float(os.getenv("JOURNAL_RETENTION", str(2 * 86400)))
+JOURNAL_MAX_ATTEMPTS   = int(os.getenv("JOURNAL_MAX_ATTEMPTS", "3"))
+JOURNAL_RESUME_WINDOW  = float(os.getenv("JOURNAL_RESUME_WINDOW", str(6 * 3600)))
+
+# Directory of the local columnar archive of posted results (for stats); empty disables it
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "results_archive")
+
+# Multi-day fixture prefetch: days fetched per league, how long a cached day's fixture list
+# is reused for the daily post, and how long cached statuses may skip a result check (seconds)
+PREFETCH_DAYS        = int(os.getenv("PREFETCH_DAYS", "10"))
+FIXTURE_SCHEDULE_TTL = int(os.getenv("FIXTURE_SCHEDULE_TTL", str(7 * 86400)))
+FIXTURE_CACHE_TTL    = int(os.getenv("FIXTURE_CACHE_TTL", "21600"))
+
+# Channel subscriptions are re-read from storage at most this often (seconds)
+SUBSCRIPTION_TTL = int(os.getenv("SUBSCRIPTION_TTL", "300"))
+
+# Live in-play updates: poll in-progress scoreboards every LIVE_INTERVAL seconds
+LIVE_UPDATES  = os.getenv("LIVE_UPDATES", "0") not in ("0", "false", "False")
+LIVE_INTERVAL = int(os.getenv("LIVE_INTERVAL", "45"))
+LIVE_CHAT_ID  = os.getenv("LIVE_CHAT_ID") or CHANNEL_ID
+
+# How results are checked: "interval" (sweep every 15 min) or "per_match" (date jobs)
+RESULT_SCHEDULINGS = ("interval", "per_match")
+RESULT_SCHEDULING  = os.getenv("RESULT_SCHEDULING", "interval").strip().lower()
+if RESULT_SCHEDULING not in RESULT_SCHEDULINGS:
+    raise ValueError(f"❌ Error: Unknown RESULT_SCHEDULING {RESULT_SCHEDULING!r} "
+                     f"(expected one of {', '.join(RESULT_SCHEDULINGS)}).")
+
+# In-process team mapping cache (entries, seconds) and startup preload toggle
+TEAM_CACHE_SIZE    = int(os.getenv("TEAM_CACHE_SIZE", "4096"))
+TEAM_CACHE_TTL     = float(os.getenv("TEAM_CACHE_TTL", str(6 * 3600)))
+TEAM_CACHE_PRELOAD = os.getenv("TEAM_CACHE_PRELOAD", "1") not in ("0", "false", "False")
+
 # Validate critical env vars
 if not all([BOT_TOKEN, CHANNEL_ID, GOOGLE_AI_KEY, PERSONAL_CHAT_ID]):
     raise ValueError("❌ Error: Missing one of BOT_TOKEN, CHANNEL_ID, GOOGLE_AI_KEY, or PERSONAL_CHAT_ID")
@@ -0,0 +1,108 @@
+# enrichment.py
+#
+# Background team enrichment. Renders never wait on Gemini: unknown teams are shown
+# with the local shortener's result and queued here. One worker thread resolves them
+# in batches and writes the mappings through the team cache to storage, so the next
+# post picks them up.
+
+import queue
+import threading
+import time
+
+import metrics
+import team_cache
+from ai_processor import BATCH_SIZE, shorten_and_emoji_batch
+
+QUEUE_SIZE = 2048
+# How long the worker waits for more names before sending a partial batch
+BATCH_WAIT = 2.0
+PLACEHOLDER_EMOJI = "◽"
+
+
+class EnrichmentQueue:
+    """Deduplicating queue of team names drained by one daemon worker."""
+
+    def __init__(self, maxsize: int = QUEUE_SIZE):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._worker = None
+
+    def _ensure_worker(self):
+        if self._worker and self._worker.is_alive():
+            return
+        with self._lock:
+            if not (self._worker and self._worker.is_alive()):
+                self._worker = threading.Thread(target=self._run, name="team-enrichment", daemon=True)
+                self._worker.start()
+
+    def submit(self, team_names) -> int:
+        """Queue names that are not already waiting; returns how many were added."""
+        with self._lock:
+            new = [n for n in dict.fromkeys(team_names) if n and n not in self._pending]
+            self._pending.update(new)
+        if not new:
+            return 0
+        self._ensure_worker()
+        for i, name in enumerate(new):
+            try:
+                self._queue.put_nowait(name)
+            except queue.Full:
+                # Dropped names are simply queued again by a later render
+                with self._lock:
+                    self._pending.difference_update(new[i:])
+                print(f"⚠️ Enrichment queue full; dropped {len(new) - i} teams.")
+                return i
+        return len(new)
+
+    def _next_batch(self) -> list:
+        names = [self._queue.get()]
+        deadline = time.monotonic() + BATCH_WAIT
+        while len(names) < BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                names.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return names
+
+    def _run(self):
+        while True:
+            names = self._next_batch()
+            try:
+                results = shorten_and_emoji_batch(names)
+                # A failed AI call comes back as the bare name; leave it unsaved so it is retried
+                resolved = {
+                    name: m for name, m in results.items()
+                    if not (m["short_name"] == name and m["emoji"] == PLACEHOLDER_EMOJI)
+                }
+                team_cache.save_many(resolved)
+                print(f"🧠 Enriched {len(resolved)}/{len(names)} teams.")
+            except Exception as e:
+                print(f"⚠️ Team enrichment failed: {e}")
+            finally:
+                with self._lock:
+                    self._pending.difference_update(names)
+                for _ in names:
+                    self._queue.task_done()
+
+    def join(self):
+        """Block until every queued name has been processed."""
+        self._queue.join()
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+
+enricher = EnrichmentQueue()
+
+
+@metrics.register_collector
+def _export_queue_depth():
+    metrics.ENRICHMENT_QUEUE_DEPTH.set(enricher.qsize())
+
+
+def submit(team_names) -> int:
+    return enricher.submit(team_names)
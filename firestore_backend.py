@@ -0,0 +1,260 @@
+# firestore_backend.py
+#
+# Firestore implementation of the storage backend: tracked matches in
+# FIRESTORE_COLLECTION, team mappings in "teams", subscriptions in "channels".
+
+import threading
+from datetime import datetime, timedelta, timezone
+
+import config
+from storage import StorageBackend, get_match_id
+
+# Firestore caps a write batch at 500 operations
+BATCH_LIMIT = 500
+# gRPC status code returned by create() when the document already exists
+ALREADY_EXISTS = 6
+
+
+class FirestoreBackend(StorageBackend):
+    name = "firestore"
+
+    def __init__(self):
+        self._db = None
+        self._db_lock = threading.Lock()
+
+    @property
+    def db(self):
+        """Firestore client, created on first use so importing storage stays cheap."""
+        if self._db is None:
+            with self._db_lock:
+                if self._db is None:
+                    import firebase_admin
+                    from firebase_admin import credentials, firestore
+                    if not firebase_admin._apps:
+                        cred = credentials.Certificate(config.firebase_credentials())
+                        firebase_admin.initialize_app(cred)
+                    self._db = firestore.client()
+        return self._db
+
+    def connect(self):
+        return self.db
+
+
+    def save_match_to_db(self, match: dict):
+        match_id = get_match_id(match)
+        doc_ref = self.db.collection(config.FIRESTORE_COLLECTION).document(match_id)
+        if doc_ref.get().exists:
+            print(f"⏭️ Match {match_id} already tracked in Firestore.")
+            return
+        doc_ref.set(match)
+        print(f"✅ Match {match_id} saved to Firestore.")
+
+    def save_matches(self, matches: list) -> list:
+        """
+        Track many matches in one BulkWriter pass. create() carries an implicit
+        "must not exist" precondition, so already-tracked matches are skipped without
+        a read. Returns the match_ids that were newly saved.
+        """
+        if not matches:
+            return []
+        collection = self.db.collection(config.FIRESTORE_COLLECTION)
+        created, lock = [], threading.Lock()
+
+        def on_result(doc_ref, _result, _writer):
+            with lock:
+                created.append(doc_ref.id)
+
+        def on_error(failure, _writer):
+            if failure.code == ALREADY_EXISTS:
+                return False
+            print(f"⚠️ Bulk write failed for {failure.operation.reference.id}: {failure.message}")
+            return failure.attempts < 3
+
+        writer = self.db.bulk_writer()
+        writer.on_write_result(on_result)
+        writer.on_write_error(on_error)
+        for match in matches:
+            writer.create(collection.document(get_match_id(match)), match)
+        writer.close()
+
+        print(f"✅ {len(created)} new matches saved to Firestore ({len(matches) - len(created)} skipped).")
+        return created
+
+    def get_match(self, match_id: str):
+        doc = self.db.collection(config.FIRESTORE_COLLECTION).document(str(match_id)).get()
+        return doc.to_dict() if doc.exists else None
+
+    def get_tracked_matches(self):
+        return [doc.to_dict() for doc in self.db.collection(config.FIRESTORE_COLLECTION).stream()]
+
+    def get_due_matches(self, now: datetime, limit: int = None) -> list:
+        """
+        Range query on the precomputed next_check timestamp, so a poll only reads the
+        matches that actually need a check. Ordered by next_check, oldest first.
+        """
+        query = (self.db.collection(config.FIRESTORE_COLLECTION)
+                   .where("next_check", "<=", now)
+                   .order_by("next_check"))
+        if limit:
+            query = query.limit(limit)
+        return [doc.to_dict() for doc in query.stream()]
+
+    def get_matches_kicking_off(self, start: datetime, end: datetime) -> list:
+        """Range query on the kickoff timestamp (backfilled at startup for older records)."""
+        query = (self.db.collection(config.FIRESTORE_COLLECTION)
+                   .where("kickoff", ">=", start)
+                   .where("kickoff", "<=", end))
+        return [doc.to_dict() for doc in query.stream()]
+
+    def set_next_checks(self, next_checks: dict):
+        """Batch-update {match_id: next_check datetime} for matches that stay tracked."""
+        items = list(next_checks.items())
+        collection = self.db.collection(config.FIRESTORE_COLLECTION)
+        for i in range(0, len(items), BATCH_LIMIT):
+            batch = self.db.batch()
+            for match_id, when in items[i:i + BATCH_LIMIT]:
+                batch.update(collection.document(str(match_id)), {"next_check": when})
+            batch.commit()
+
+    def backfill_match_timestamps(self, first_check_after: timedelta):
+        """
+        One-off migration for matches tracked before kickoff/next_check existed: derive
+        both from utc_datetime so the range query can see them.
+        """
+        collection = self.db.collection(config.FIRESTORE_COLLECTION)
+        batch, pending, fixed = self.db.batch(), 0, 0
+        for doc in collection.stream():
+            data = doc.to_dict()
+            if "next_check" in data or not data.get("utc_datetime"):
+                continue
+            try:
+                kickoff = datetime.fromisoformat(data["utc_datetime"])
+            except ValueError:
+                continue
+            if kickoff.tzinfo is None:
+                kickoff = kickoff.replace(tzinfo=timezone.utc)
+            batch.update(doc.reference, {
+                "kickoff":    kickoff,
+                "next_check": kickoff + first_check_after,
+            })
+            pending += 1
+            fixed += 1
+            if pending == BATCH_LIMIT:
+                batch.commit()
+                batch, pending = self.db.batch(), 0
+        if pending:
+            batch.commit()
+        if fixed:
+            print(f"🔧 Backfilled kickoff/next_check on {fixed} tracked matches.")
+
+    def remove_match_from_db(self, match: dict):
+        match_id = get_match_id(match)
+        self.db.collection(config.FIRESTORE_COLLECTION).document(match_id).delete()
+        print(f"🗑️ Match {match_id} removed from Firestore.")
+
+    def remove_matches(self, matches: list):
+        """Delete many tracked matches with batched writes."""
+        ids = list(dict.fromkeys(get_match_id(m) for m in matches))
+        collection = self.db.collection(config.FIRESTORE_COLLECTION)
+        for i in range(0, len(ids), BATCH_LIMIT):
+            batch = self.db.batch()
+            for match_id in ids[i:i + BATCH_LIMIT]:
+                batch.delete(collection.document(match_id))
+            batch.commit()
+        if ids:
+            print(f"🗑️ {len(ids)} matches removed from Firestore.")
+
+    # CHANNEL SUBSCRIPTIONS
+
+    def get_subscriptions(self) -> dict:
+        """{chat_id: {"leagues": [...] or None, "priority": [...]}} for every subscribed channel."""
+        return {doc.id: doc.to_dict() for doc in self.db.collection("channels").stream()}
+
+    def save_subscription(self, chat_id, leagues=None, priority=None):
+        self.db.collection("channels").document(str(chat_id)).set({
+            "leagues": list(leagues) if leagues is not None else None,
+            "priority": list(priority or []),
+        })
+        print(f"✅ Saved subscription for {chat_id}.")
+
+    def remove_subscription(self, chat_id):
+        self.db.collection("channels").document(str(chat_id)).delete()
+        print(f"🗑️ Removed subscription for {chat_id}.")
+
+    # LEADER LEASE
+
+    def acquire_lease(self, name: str, holder: str, now: datetime, ttl: timedelta) -> bool:
+        """Read-check-write in a transaction, so two instances cannot both take the lease."""
+        from google.cloud import firestore
+        ref = self.db.collection("leases").document(name)
+
+        @firestore.transactional
+        def attempt(transaction):
+            snapshot = ref.get(transaction=transaction)
+            lease = snapshot.to_dict() if snapshot.exists else None
+            if lease and lease.get("holder") != holder and lease.get("expires") and lease["expires"] > now:
+                return False
+            transaction.set(ref, {"holder": holder, "expires": now + ttl})
+            return True
+
+        return attempt(self.db.transaction())
+
+    def release_lease(self, name: str, holder: str):
+        from google.cloud import firestore
+        ref = self.db.collection("leases").document(name)
+
+        @firestore.transactional
+        def attempt(transaction):
+            snapshot = ref.get(transaction=transaction)
+            if snapshot.exists and snapshot.to_dict().get("holder") == holder:
+                transaction.delete(ref)
+
+        attempt(self.db.transaction())
+
+    # TEAM INFO (Short name + emoji)
+
+    def get_team_mapping(self, team_name: str):
+        doc_ref = self.db.collection("teams").document(team_name)
+        doc = doc_ref.get()
+        if doc.exists:
+            return doc.to_dict()
+        return None
+
+    def get_team_mappings(self, team_names) -> dict:
+        """Fetch several team mappings in one batched read; missing teams are omitted."""
+        names = [n for n in dict.fromkeys(team_names) if n]
+        if not names:
+            return {}
+        teams = self.db.collection("teams")
+        refs = [teams.document(n) for n in names]
+        return {doc.id: doc.to_dict() for doc in self.db.get_all(refs) if doc.exists}
+
+    def get_all_team_mappings(self, limit: int = None) -> dict:
+        """Stream the whole teams collection (optionally capped) for cache preloading."""
+        query = self.db.collection("teams")
+        if limit:
+            query = query.limit(limit)
+        return {doc.id: doc.to_dict() for doc in query.stream()}
+
+    def save_team_mapping(self, team_name: str, short_name: str, emoji: str):
+        doc_ref = self.db.collection("teams").document(team_name)
+        doc_ref.set({
+            "short_name": short_name,
+            "emoji": emoji
+        })
+        print(f"✅ Saved team: {team_name} -> {emoji} {short_name}")
+
+    def save_team_mappings(self, mappings: dict):
+        """Persist {team_name: {"short_name", "emoji"}} with batched writes."""
+        items = [(name, m) for name, m in mappings.items() if name]
+        teams = self.db.collection("teams")
+        for i in range(0, len(items), BATCH_LIMIT):
+            batch = self.db.batch()
+            for name, m in items[i:i + BATCH_LIMIT]:
+                batch.set(teams.document(name), {
+                    "short_name": m["short_name"],
+                    "emoji": m["emoji"]
+                })
+            batch.commit()
+        if items:
+            print(f"✅ Saved {len(items)} team mappings.")
@@ -0,0 +1,209 @@
+# fixture.py
+#
+# Typed fixture model shared by the fetch, cache, storage, result and formatting
+# paths. Kickoff is kept as epoch seconds (no ISO round-trips), team and league
+# names are interned, and status is an enum (with the raw ESPN code and `completed`
+# flag kept alongside, for codes the enum does not know). Fixtures still answer fixture["home"]
+# and fixture.get("home") so renderers that also take plain dicts keep working.
+
+import json
+import sys
+from datetime import datetime, timezone
+from enum import Enum
+
+_intern = sys.intern
+
+
+class Status(str, Enum):
+    """ESPN status codes seen on soccer scoreboards; compares equal to the raw code."""
+
+    SCHEDULED = "STATUS_SCHEDULED"
+    DELAYED = "STATUS_DELAYED"
+    FIRST_HALF = "STATUS_FIRST_HALF"
+    HALFTIME = "STATUS_HALFTIME"
+    SECOND_HALF = "STATUS_SECOND_HALF"
+    IN_PROGRESS = "STATUS_IN_PROGRESS"
+    END_OF_REGULATION = "STATUS_END_OF_REGULATION"
+    OVERTIME = "STATUS_OVERTIME"
+    FIRST_HALF_EXTRA_TIME = "STATUS_FIRST_HALF_EXTRA_TIME"
+    HALFTIME_ET = "STATUS_HALFTIME_ET"
+    SECOND_HALF_EXTRA_TIME = "STATUS_SECOND_HALF_EXTRA_TIME"
+    END_OF_EXTRATIME = "STATUS_END_OF_EXTRATIME"
+    SHOOTOUT = "STATUS_SHOOTOUT"
+    SUSPENDED = "STATUS_SUSPENDED"
+    FULL_TIME = "STATUS_FULL_TIME"
+    FINAL = "STATUS_FINAL"
+    FINAL_AET = "STATUS_FINAL_AET"
+    FINAL_PEN = "STATUS_FINAL_PEN"
+    FORFEIT = "STATUS_FORFEIT"
+    POSTPONED = "STATUS_POSTPONED"
+    CANCELED = "STATUS_CANCELED"
+    ABANDONED = "STATUS_ABANDONED"
+    # Short forms some feeds and older stored records use
+    LEGACY_SCHEDULED = "SCHEDULED"
+    LEGACY_FINAL = "FINAL"
+    LEGACY_FULL_TIME = "FULL_TIME"
+    UNKNOWN = ""
+
+    # Render as the raw code in f-strings and json on every Python version
+    __str__ = str.__str__
+    __format__ = str.__format__
+
+    @classmethod
+    def _missing_(cls, value):
+        if isinstance(value, str) and value != value.upper():
+            return cls(value.upper())
+        return cls.UNKNOWN
+
+    @classmethod
+    def parse(cls, code) -> "Status":
+        return _STATUS_BY_CODE.get(code) or cls(code or "")
+
+
+_STATUS_BY_CODE = {s.value: s for s in Status}
+
+
+# The keys of the dicts fixtures used to be; Fixture answers these by name
+KEYS = (
+    "match_id", "home", "away", "local_time", "utc_time", "status",
+    "league_code", "league", "home_score", "away_score", "utc_datetime",
+)
+_KEYSET = frozenset(KEYS)
+
+
+def _epoch(value) -> int:
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        dt = datetime.fromisoformat(value)
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+
+class Fixture:
+    __slots__ = (
+        "match_id", "league_code", "league", "home", "away",
+        "kickoff", "local_time", "status", "home_score", "away_score",
+        "status_code", "completed",
+    )
+
+    def __init__(self, match_id, league_code, league, home, away, kickoff: int,
+                 local_time="", status=Status.UNKNOWN, home_score=0, away_score=0,
+                 completed=False):
+        self.match_id = str(match_id)
+        self.league_code = _intern(league_code or "")
+        self.league = _intern(league or "")
+        self.home = _intern(home or "")
+        self.away = _intern(away or "")
+        self.kickoff = int(kickoff)            # epoch seconds, UTC
+        self.local_time = _intern(local_time or "")
+        # status_code is the code as ESPN sent it (status is UNKNOWN for codes not in the
+        # enum); completed is ESPN's own "this match is over" flag, which covers those too
+        self.status = status if isinstance(status, Status) else Status.parse(status)
+        self.status_code = self.status.value or status or ""
+        self.home_score = int(home_score or 0)
+        self.away_score = int(away_score or 0)
+        self.completed = bool(completed)
+
+    # DERIVED FIELDS
+
+    @property
+    def kickoff_dt(self) -> datetime:
+        return datetime.fromtimestamp(self.kickoff, timezone.utc)
+
+    @property
+    def utc_datetime(self) -> str:
+        return self.kickoff_dt.isoformat()
+
+    @property
+    def utc_time(self) -> str:
+        seconds = self.kickoff % 86400
+        return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}"
+
+    @property
+    def day(self) -> str:
+        """UTC kickoff day as YYYYMMDD."""
+        return self.kickoff_dt.strftime("%Y%m%d")
+
+    # DICT-STYLE ACCESS
+
+    def __getitem__(self, key):
+        if key not in _KEYSET:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in _KEYSET else default
+
+    def __contains__(self, key):
+        return key in _KEYSET
+
+    def keys(self):
+        return KEYS
+
+    def __eq__(self, other):
+        if not isinstance(other, Fixture):
+            return NotImplemented
+        return all(getattr(self, s) == getattr(other, s) for s in self.__slots__)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (f"Fixture({self.match_id}, {self.league_code}, {self.home!r} v {self.away!r}, "
+                f"{self.utc_datetime}, {self.status.name}, {self.home_score}-{self.away_score})")
+
+    # CONVERTERS
+
+    def to_dict(self) -> dict:
+        """The legacy 11-key dict plus `completed`, JSON-safe (utc_datetime as ISO, status as the raw code)."""
+        return {key: self.get(key) for key in KEYS} | {"status": self.status_code, "completed": self.completed}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Fixture":
+        """From to_dict() output, a legacy fixture dict or a stored match record."""
+        kickoff = data.get("kickoff")
+        return cls(
+            data["match_id"],
+            data.get("league_code"),
+            data.get("league"),
+            data.get("home"),
+            data.get("away"),
+            _epoch(kickoff if kickoff is not None else data["utc_datetime"]),
+            data.get("local_time"),
+            data.get("status"),
+            data.get("home_score"),
+            data.get("away_score"),
+            data.get("completed", False),
+        )
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, text: str) -> "Fixture":
+        return cls.from_dict(json.loads(text))
+
+    def to_firestore(self) -> dict:
+        """
+        The tracked-match document: the fields post_results needs, with kickoff as a
+        native timestamp. utc_datetime stays for records read by older code.
+        """
+        return {
+            "match_id":     self.match_id,
+            "league_code":  self.league_code,
+            "home":         self.home,
+            "away":         self.away,
+            "utc_datetime": self.utc_datetime,
+            "kickoff":      self.kickoff_dt,
+        }
+
+    @classmethod
+    def from_firestore(cls, doc: dict) -> "Fixture":
+        return cls.from_dict(doc)
+
+
+def as_fixture(value) -> Fixture:
+    return value if isinstance(value, Fixture) else Fixture.from_dict(value)
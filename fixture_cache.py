@@ -0,0 +1,246 @@
+# fixture_cache.py
+#
+# Parsed fixtures per (league, UTC day), filled by multi-day `dates=first-last` range
+# fetches. A league is range-fetched again only once a posting-window day is missing
+# or older than FIXTURE_SCHEDULE_TTL; in between, the window days are revalidated
+# before every daily post with per-date conditional GETs, which are mostly 304s.
+# Result checks skip ESPN for matches whose recently cached status can no longer
+# change (postponed, cancelled, finished).
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import clock
+from config import FETCH_CONCURRENCY, PREFETCH_DAYS, FIXTURE_CACHE_TTL, FIXTURE_SCHEDULE_TTL
+from get_fixtures import get_fixtures_range, get_fixtures_range_async, get_scoreboard, get_scoreboard_async
+from scoreboard import UTC, custom_window
+
+_days = {}      # (league, "YYYYMMDD") -> (fetched_at, {match_id: fixture})
+_checked = {}   # match_id -> when a single-day result check last refreshed it
+_lock = threading.Lock()
+
+# A 14:00 → 13:59 IST posting window spans two UTC days, starting with the current one
+WINDOW_DAYS = 2
+
+
+def _day(dt: datetime) -> str:
+    return dt.strftime("%Y%m%d")
+
+
+def day_of(fixture) -> str:
+    """UTC kickoff day of a parsed fixture ("20240817")."""
+    return fixture.day
+
+
+def _midnight(dt: datetime) -> datetime:
+    return dt.astimezone(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _dates(first: datetime, n_days: int):
+    # ESPN dates are not UTC days, so ask for one extra date on each side
+    return _day(first - timedelta(days=1)), _day(first + timedelta(days=n_days))
+
+
+def _espn_dates(first: datetime, n_days: int) -> list:
+    # The same span as _dates(), one date per request so yesterday's validators still apply
+    return [_day(first + timedelta(days=i)) for i in range(-1, n_days + 1)]
+
+
+def fetch_league(league: str, first: datetime, n_days: int) -> bool:
+    """Range-fetch one league and record every UTC day in [first, first + n_days), even empty ones."""
+    return _store(league, first, n_days, get_fixtures_range(league, *_dates(first, n_days)))
+
+
+async def fetch_league_async(league: str, first: datetime, n_days: int) -> bool:
+    return _store(league, first, n_days, await get_fixtures_range_async(league, *_dates(first, n_days)))
+
+
+def revalidate_league(league: str, first: datetime, n_days: int) -> bool:
+    """Re-read the UTC days [first, first + n_days) date by date; unchanged dates cost a 304."""
+    return _store_boards(league, first, n_days, [get_scoreboard(league, d) for d in _espn_dates(first, n_days)])
+
+
+async def revalidate_league_async(league: str, first: datetime, n_days: int) -> bool:
+    boards = await asyncio.gather(*(get_scoreboard_async(league, d) for d in _espn_dates(first, n_days)))
+    return _store_boards(league, first, n_days, boards)
+
+
+def _store_boards(league, first, n_days, boards) -> bool:
+    # A stale snapshot is not a revalidation; keep the old days and try again at the next post
+    if any(board is None or board.stale for board in boards):
+        return False
+    return _store(league, first, n_days, [f for board in boards for f in board.fixtures])
+
+
+def _store(league: str, first: datetime, n_days: int, fixtures) -> bool:
+    if fixtures is None:
+        return False
+    buckets = {_day(first + timedelta(days=i)): {} for i in range(n_days)}
+    for f in fixtures:
+        bucket = buckets.get(day_of(f))
+        if bucket is not None:
+            bucket[f.match_id] = f
+    fetched_at = clock.now(UTC)
+    with _lock:
+        for day, matches in buckets.items():
+            _days[(league, day)] = (fetched_at, matches)
+    return True
+
+
+def _fetch_many(leagues, first, n_days, fetch=fetch_league) -> int:
+    if not leagues:
+        return 0
+    workers = max(1, min(FETCH_CONCURRENCY, len(leagues)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="espn") as pool:
+        return sum(pool.map(lambda league: fetch(league, first, n_days), leagues))
+
+
+async def _fetch_many_async(leagues, first, n_days, fetch=fetch_league_async) -> int:
+    # Concurrency is bounded by get_fixtures' ASYNC_FETCH_CONCURRENCY semaphore
+    return sum(await asyncio.gather(*(fetch(league, first, n_days) for league in leagues)))
+
+
+def _prune(before: str):
+    cutoff = clock.now(UTC) - timedelta(seconds=FIXTURE_CACHE_TTL)
+    with _lock:
+        for key in [k for k in _days if k[1] < before]:
+            del _days[key]
+        for mid in [m for m, at in _checked.items() if at < cutoff]:
+            del _checked[mid]
+
+
+def _fresh(league, day, now, ttl: int = FIXTURE_CACHE_TTL) -> bool:
+    entry = _days.get((league, day))
+    return entry is not None and now - entry[0] < timedelta(seconds=ttl)
+
+
+def _stale(leagues, wanted):
+    """
+    (stale, unchecked): leagues with a wanted day missing or older than
+    FIXTURE_SCHEDULE_TTL, which need a range fetch, and the rest whose wanted days
+    were not revalidated within FIXTURE_CACHE_TTL, i.e. not yet for today's post.
+    """
+    now = clock.now(UTC)
+    stale, unchecked = [], []
+    with _lock:
+        for l in leagues:
+            if not all(_fresh(l, day, now, FIXTURE_SCHEDULE_TTL) for day in wanted):
+                stale.append(l)
+            elif not all(_fresh(l, day, now) for day in wanted):
+                unchecked.append(l)
+    return stale, unchecked
+
+
+def _plan_prefetch(leagues):
+    first = _midnight(clock.now(UTC))
+    wanted = [_day(first + timedelta(days=i)) for i in range(WINDOW_DAYS)]
+    leagues = list(dict.fromkeys(leagues))
+    return (leagues, first) + _stale(leagues, wanted)
+
+
+def prefetch(leagues, days: int = PREFETCH_DAYS):
+    """
+    Pull the next `days` UTC days, one request per league, for leagues whose next
+    posting window is not already cached by an earlier prefetch, and revalidate the
+    window days of the others.
+    """
+    leagues, first, stale, unchecked = _plan_prefetch(leagues)
+    ok = _fetch_many(stale, first, days)
+    checked = _fetch_many(unchecked, first, WINDOW_DAYS, revalidate_league)
+    _prefetched(leagues, stale, unchecked, first, days, ok, checked)
+
+
+async def prefetch_async(leagues, days: int = PREFETCH_DAYS):
+    leagues, first, stale, unchecked = _plan_prefetch(leagues)
+    ok = await _fetch_many_async(stale, first, days)
+    checked = await _fetch_many_async(unchecked, first, WINDOW_DAYS, revalidate_league_async)
+    _prefetched(leagues, stale, unchecked, first, days, ok, checked)
+
+
+def _prefetched(leagues, stale, unchecked, first, days, ok, checked):
+    _prune(_day(first - timedelta(days=1)))
+    print(f"📦 Prefetched {days} days of fixtures for {ok}/{len(stale)} leagues, "
+          f"revalidated {checked}/{len(unchecked)} ({len(leagues) - len(stale) - len(unchecked)} still cached).")
+
+
+def _plan_window(leagues):
+    """(window, leagues, first day, days to fetch, wanted days, stale, unchecked) for the posting window."""
+    start, end = custom_window()
+    first = _midnight(start)
+    n_days = (_midnight(end) - first).days + 1
+    wanted = [_day(first + timedelta(days=i)) for i in range(n_days)]
+    leagues = list(dict.fromkeys(leagues))
+    return ((start, end), leagues, first, n_days, wanted) + _stale(leagues, wanted)
+
+
+def window_fixtures(leagues) -> list:
+    """
+    Fixtures in the current 14:00 → 13:59 IST posting window, deduplicated by match_id.
+    Leagues whose days are missing or older than FIXTURE_SCHEDULE_TTL are range-fetched
+    now; window days the prefetch did not revalidate today are revalidated first.
+    """
+    window, leagues, first, n_days, wanted, stale, unchecked = _plan_window(leagues)
+    _fetch_many(stale, first, max(n_days, PREFETCH_DAYS))
+    _fetch_many(unchecked, first, n_days, revalidate_league)
+    return _collect(window, leagues, wanted, stale, unchecked)
+
+
+async def window_fixtures_async(leagues) -> list:
+    window, leagues, first, n_days, wanted, stale, unchecked = _plan_window(leagues)
+    await _fetch_many_async(stale, first, max(n_days, PREFETCH_DAYS))
+    await _fetch_many_async(unchecked, first, n_days, revalidate_league_async)
+    return _collect(window, leagues, wanted, stale, unchecked)
+
+
+def _collect(window, leagues, wanted, stale, unchecked) -> list:
+    start, end = window
+    lo, hi = int(start.timestamp()), int(end.timestamp())
+    unique = {}
+    with _lock:
+        for league in leagues:
+            for day in wanted:
+                entry = _days.get((league, day))
+                if entry is None:
+                    continue
+                for f in entry[1].values():
+                    if lo <= f.kickoff <= hi:
+                        unique.setdefault(f.match_id, f)
+    print(f"✅ {len(unique)} fixtures in window across {len(leagues)} leagues "
+          f"({len(stale)} fetched, {len(unchecked)} revalidated, "
+          f"{len(leagues) - len(stale) - len(unchecked)} cached).")
+    return list(unique.values())
+
+
+def cached(league: str, day: str, match_id: str):
+    """
+    The cached fixture for a match, or None unless its day was fetched (or the match
+    refreshed by a result check) within FIXTURE_CACHE_TTL.
+    """
+    now = clock.now(UTC)
+    with _lock:
+        entry = _days.get((league, day))
+        if entry is None:
+            return None
+        checked = _checked.get(match_id)
+        if not _fresh(league, day, now) and not (checked and now - checked < timedelta(seconds=FIXTURE_CACHE_TTL)):
+            return None
+        return entry[1].get(match_id)
+
+
+def update(league: str, fixtures):
+    """Write fresher fixtures from a single-day check back into already cached days."""
+    now = clock.now(UTC)
+    with _lock:
+        for f in fixtures:
+            entry = _days.get((league, day_of(f)))
+            if entry is not None:
+                entry[1][f.match_id] = f
+                _checked[f.match_id] = now
+
+
+def clear():
+    with _lock:
+        _days.clear()
+        _checked.clear()
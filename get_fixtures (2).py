@@ -1,148 +1,261 @@
+import asyncio
 import requests
-import json
-import os
-from datetime import datetime, timedelta
-import pytz
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import datetime
 from typing import Optional
-from dateutil import parser as _p2
 
-from config import BASE_URL
-
-# Load local timezones mapping from JSON
-LOCAL_TIMEZONES = {}
-try:
-    here = os.path.dirname(__file__)
-    with open(os.path.join(here, "local_time.json"), "r") as f:
-        LOCAL_TIMEZONES = json.load(f)
-except Exception as e:
-    print(f"⚠️ Could not load local_time.json: {e}")
+import http_client
+import metrics
+import snapshots
+from config import BASE_URL, FETCH_CONCURRENCY, SWR_WAIT, ASYNC_FETCH_CONCURRENCY
+from snapshots import Scoreboard
+# IST, UTC, LOCAL_TIMEZONES and parse_date_to_utc are re-exported for existing callers
+from scoreboard import (
+    IST, UTC, LOCAL_TIMEZONES,
+    custom_window, parse_date_to_utc, parse_scoreboard,
+)
 
 # Compose scoreboard URL from config
 ESPN_FIXTURES_URL = f"{BASE_URL}/{{}}/scoreboard"
-IST = pytz.timezone("Asia/Kolkata")
-UTC = pytz.utc
 
 
 def is_within_custom_window(match_time_utc: datetime) -> bool:
     """
     Return True if match_time_utc falls between 14:00 IST today and 13:59 IST tomorrow.
     """
-    now_ist = datetime.now(IST)
-    start_window = now_ist.replace(hour=14, minute=0, second=0, microsecond=0)
-    if now_ist.hour < 14:
-        start_window -= timedelta(days=1)
-    end_window = start_window + timedelta(days=1) - timedelta(minutes=1)
-    match_time_ist = match_time_utc.astimezone(IST)
-    return start_window <= match_time_ist <= end_window
+    start_window, end_window = custom_window()
+    return start_window <= match_time_utc <= end_window
+
+
+class CircuitOpen(requests.exceptions.RequestException):
+    """The league's circuit breaker is open; no request was made."""
+
+
+def _params(espn_date: Optional[str]) -> dict:
+    return {"dates": espn_date} if espn_date else {}
+
+
+def _request_scoreboard(league: str, espn_date: Optional[str], timeout: Optional[float], scope: str = ""):
+    """Conditional GET that reports its outcome to the league's circuit breaker."""
+    cb = snapshots.breaker(league)
+    try:
+        response = http_client.get(ESPN_FIXTURES_URL.format(league), params=_params(espn_date),
+                                   conditional=True, timeout=timeout, scope=scope)
+        response.raise_for_status()
+    except requests.exceptions.RequestException:
+        cb.record_failure()
+        raise
+    cb.record_success()
+    return response
 
 
-def parse_date_to_utc(iso_time: str) -> Optional[datetime]:
+def fetch_scoreboard(league: str, espn_date: Optional[str] = None, timeout: Optional[float] = None,
+                     scope: str = ""):
     """
-    Parse an ISO8601 timestamp to a timezone-aware UTC datetime.
+    Conditional GET of a league scoreboard; raises requests exceptions on failure.
+    `scope` keeps separate ETag validators, so not_modified means "since this
+    scope's last fetch" rather than since anyone's.
     """
+    if not snapshots.breaker(league).allow():
+        raise CircuitOpen(f"circuit open for {league}")
+    return _request_scoreboard(league, espn_date, timeout, scope)
+
+
+# Revalidations run here so a slow ESPN answer can finish after the caller moved on
+_revalidator = ThreadPoolExecutor(max_workers=FETCH_CONCURRENCY, thread_name_prefix="espn-revalidate")
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+
+def _store_snapshot(key, response) -> Scoreboard:
+    previous = snapshots.get(key)
+    if response.not_modified and previous is not None:
+        return snapshots.put(key, previous.fixtures)
+    return snapshots.put(key, parse_scoreboard(response.content, key[0]))
+
+
+def _revalidate(key, timeout):
+    """Fetch and parse one scoreboard into the snapshot store; returns the new Scoreboard or None."""
+    league, espn_date = key
+    t0 = time.perf_counter()
     try:
-        utc_time = datetime.fromisoformat(iso_time.rstrip("Z")).replace(tzinfo=UTC)
-    except Exception:
-        try:
-            utc_time = _p2.parse(iso_time)
-            if utc_time.tzinfo is None:
-                utc_time = utc_time.replace(tzinfo=UTC)
-            else:
-                utc_time = utc_time.astimezone(UTC)
-        except Exception as e:
-            print(f"⚠️ Time conversion error: {e}")
-            return None
-    return utc_time
+        return _store_snapshot(key, _request_scoreboard(league, espn_date or None, timeout))
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Error fetching fixtures: {e}")
+        metrics.ESPN_FETCH_ERRORS.inc(league=league)
+        return None
+    finally:
+        metrics.ESPN_FETCH_SECONDS.observe(time.perf_counter() - t0, league=league)
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+
+def get_scoreboard(league: str, espn_date: Optional[str] = None, timeout: Optional[float] = None) -> Optional[Scoreboard]:
+    """
+    Stale-while-revalidate scoreboard read. Returns fresh fixtures when ESPN answers
+    within SWR_WAIT seconds; otherwise (failure, slow answer, open breaker) the last
+    good snapshot with stale=True. None only when ESPN failed and there is no snapshot,
+    so callers can tell "no matches" from "no answer".
+    """
+    key = (league, espn_date or "")
+    snapshot = snapshots.get(key)
+    stale = snapshot._replace(stale=True) if snapshot else None
+
+    with _inflight_lock:
+        future = _inflight.get(key)
+        if future is None:
+            if not snapshots.breaker(league).allow():
+                if stale:
+                    metrics.ESPN_STALE_SERVED.inc(league=league)
+                return stale
+            future = _inflight[key] = _revalidator.submit(_revalidate, key, timeout)
+
+    try:
+        fresh = future.result(timeout=SWR_WAIT if snapshot else None)
+    except FutureTimeout:
+        fresh = None
+    if fresh is None and stale:
+        metrics.ESPN_STALE_SERVED.inc(league=league)
+        return stale
+    return fresh
 
 
 def get_fixtures(
     league: str = "eng.1",
     filter_by_window: bool = False,
     espn_date: Optional[str] = None,
+    timeout: Optional[float] = None,
 ) -> list:
     """
     Fetch fixtures for a league on a specific date (YYYYMMDD). If filter_by_window is True,
-    only include matches in the 14:00 IST → 13:59 IST window.
+    only include matches in the 14:00 IST → 13:59 IST window. Falls back to the last
+    good snapshot when ESPN fails; use get_scoreboard() to see whether it is stale.
     """
+    print(f"📡 Fetching fixtures for {league} (date={espn_date})…")
+    board = get_scoreboard(league, espn_date, timeout)
+    if board is None:
+        return []
+    final = board.fixtures
+    if filter_by_window:
+        start, end = custom_window()
+        lo, hi = int(start.timestamp()), int(end.timestamp())
+        final = [f for f in final if lo <= f.kickoff <= hi]
+    print(f"✅ {len(final)} fixtures fetched{' (stale)' if board.stale else ''}.")
+    return final
+
+
+def get_fixtures_range(
+    league: str,
+    first_day: str,
+    last_day: str,
+    timeout: Optional[float] = None,
+) -> Optional[list]:
+    """
+    Fetch every fixture of a league between two ESPN dates (YYYYMMDD, inclusive) with
+    one `dates=first-last` request. Returns None (not []) when the fetch failed, so
+    callers can tell "no matches" from "no answer".
+    """
+    t0 = time.perf_counter()
     try:
-        print(f"📡 Fetching fixtures for {league} (date={espn_date})…")
-        params = {}
-        if espn_date:
-            params["dates"] = espn_date
+        print(f"📡 Fetching fixtures for {league} ({first_day}-{last_day})…")
+        response = fetch_scoreboard(league, f"{first_day}-{last_day}", timeout)
+        return parse_scoreboard(response.content, league)
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Error fetching fixtures: {e}")
+        metrics.ESPN_FETCH_ERRORS.inc(league=league)
+        return None
+    finally:
+        metrics.ESPN_FETCH_SECONDS.observe(time.perf_counter() - t0, league=league)
+
+
+# ASYNC (RUNTIME=asyncio): the same breaker, snapshot and SWR rules on the event loop
+
+_espn_slots = None
+_ainflight = {}   # key -> asyncio.Task; only touched from the loop thread
 
-        url = ESPN_FIXTURES_URL.format(league)
-        response = requests.get(url, params=params)
+
+def _slots() -> asyncio.Semaphore:
+    global _espn_slots
+    if _espn_slots is None:
+        _espn_slots = asyncio.Semaphore(ASYNC_FETCH_CONCURRENCY)
+    return _espn_slots
+
+
+async def _request_scoreboard_async(league: str, espn_date: Optional[str], timeout: Optional[float],
+                                     scope: str = ""):
+    cb = snapshots.breaker(league)
+    try:
+        async with _slots():
+            response = await http_client.aget(ESPN_FIXTURES_URL.format(league), params=_params(espn_date),
+                                              conditional=True, timeout=timeout, scope=scope)
         response.raise_for_status()
-        data = response.json()
-        events = data.get("events", [])
-
-        fixtures = []
-        for event in events:
-            try:
-                comps = event.get("competitions") or []
-                if not comps:
-                    print(f"⚠️ No competition data for event {event.get('id')}")
-                    continue
-                comp = comps[0]
-
-                iso_time = comp.get("date")
-                if not iso_time:
-                    print(f"⚠️ Missing date for event {event.get('id')}")
-                    continue
-
-                match_time_utc = parse_date_to_utc(iso_time)
-                if not match_time_utc:
-                    continue
-
-                if filter_by_window and not is_within_custom_window(match_time_utc):
-                    continue
-
-                # Prefer event-level league name, fallback to response header
-                league_name = (
-                    event.get("league", {})
-                         .get("name")
-                    or data.get("leagues", [{}])[0].get("name", "Unknown League")
-                )
-
-                tz_name = LOCAL_TIMEZONES.get(league_name, "UTC")
-                local_tz = pytz.timezone(tz_name)
-                local_dt = match_time_utc.astimezone(local_tz)
-                local_time_str = local_dt.strftime("%H:%M")
-
-                home = next(t for t in comp["competitors"] if t.get("homeAway") == "home")
-                away = next(t for t in comp["competitors"] if t.get("homeAway") == "away")
-
-                # Safely extract status
-                status = (
-                    event.get("status", {})
-                         .get("type", {})
-                         .get("name")
-                    or ""
-                ).upper()
-
-                fixtures.append({
-                    "match_id":     event.get("id"),
-                    "home":          home["team"]["displayName"],
-                    "away":          away["team"]["displayName"],
-                    "local_time":    local_time_str,
-                    "utc_time":      match_time_utc.strftime("%H:%M"),
-                    "status":        status,
-                    "league_code":   league,
-                    "league":        league_name,
-                    "home_score":    int(home.get("score", 0)),
-                    "away_score":    int(away.get("score", 0)),
-                    "utc_datetime":  match_time_utc.isoformat(),
-                })
-            except Exception as e:
-                print(f"⚠️ Skipping event due to parsing error: {e}")
-                continue
-
-        # Deduplicate by match_id
-        unique = {m["match_id"]: m for m in fixtures}
-        final = list(unique.values())
-        print(f"✅ {len(final)} fixtures fetched.")
-        return final
+    except requests.exceptions.RequestException:
+        cb.record_failure()
+        raise
+    cb.record_success()
+    return response
+
+
+async def fetch_scoreboard_async(league: str, espn_date: Optional[str] = None, timeout: Optional[float] = None,
+                                 scope: str = ""):
+    if not snapshots.breaker(league).allow():
+        raise CircuitOpen(f"circuit open for {league}")
+    return await _request_scoreboard_async(league, espn_date, timeout, scope)
 
+
+async def _revalidate_async(key, timeout):
+    league, espn_date = key
+    t0 = time.perf_counter()
+    try:
+        return _store_snapshot(key, await _request_scoreboard_async(league, espn_date or None, timeout))
     except requests.exceptions.RequestException as e:
         print(f"❌ Error fetching fixtures: {e}")
-        return []
+        metrics.ESPN_FETCH_ERRORS.inc(league=league)
+        return None
+    finally:
+        metrics.ESPN_FETCH_SECONDS.observe(time.perf_counter() - t0, league=league)
+        _ainflight.pop(key, None)
+
+
+async def get_scoreboard_async(league: str, espn_date: Optional[str] = None,
+                               timeout: Optional[float] = None) -> Optional[Scoreboard]:
+    """Coroutine version of get_scoreboard()."""
+    key = (league, espn_date or "")
+    snapshot = snapshots.get(key)
+    stale = snapshot._replace(stale=True) if snapshot else None
+
+    task = _ainflight.get(key)
+    if task is None:
+        if not snapshots.breaker(league).allow():
+            if stale:
+                metrics.ESPN_STALE_SERVED.inc(league=league)
+            return stale
+        task = _ainflight[key] = asyncio.ensure_future(_revalidate_async(key, timeout))
+
+    try:
+        # shield: a slow answer keeps going and refreshes the snapshot for next time
+        fresh = await asyncio.wait_for(asyncio.shield(task), SWR_WAIT if snapshot else None)
+    except asyncio.TimeoutError:
+        fresh = None
+    if fresh is None and stale:
+        metrics.ESPN_STALE_SERVED.inc(league=league)
+        return stale
+    return fresh
+
+
+async def get_fixtures_range_async(league: str, first_day: str, last_day: str,
+                                   timeout: Optional[float] = None) -> Optional[list]:
+    """Coroutine version of get_fixtures_range()."""
+    t0 = time.perf_counter()
+    try:
+        print(f"📡 Fetching fixtures for {league} ({first_day}-{last_day})…")
+        response = await fetch_scoreboard_async(league, f"{first_day}-{last_day}", timeout)
+        return parse_scoreboard(response.content, league)
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Error fetching fixtures: {e}")
+        metrics.ESPN_FETCH_ERRORS.inc(league=league)
+        return None
+    finally:
+        metrics.ESPN_FETCH_SECONDS.observe(time.perf_counter() - t0, league=league)
@@ -1,74 +1,328 @@
+import asyncio
+from collections import defaultdict
 from datetime import datetime, timedelta
 import pytz
 
-from get_fixtures import get_fixtures
-from storage import get_tracked_matches, remove_match_from_db
+import archive
+import clock
+import fixture_cache
+import leader
+from fixture import Fixture, Status
+from get_fixtures import get_scoreboard, get_scoreboard_async
+from journal import journal, RESULT, DUE
+from storage import get_due_matches, get_match, remove_matches, set_next_checks
 from telegram_bot import send_results
 
 UTC = pytz.utc
 
-def post_results():
-    """Fetch and post any matches that have just finished (and clean up postponed)."""
-    now_utc = datetime.now(UTC)
-    finished = []
+POSTPONE_CHECK_AFTER = timedelta(minutes=15)
+RESULT_CHECK_AFTER   = timedelta(minutes=110)
+# How long to wait before re-checking a match that has not finished yet
+RECHECK_INTERVAL     = timedelta(minutes=15)
+
+SCHEDULED_CODES = {Status.SCHEDULED, Status.LEGACY_SCHEDULED}
+COMPLETED_CODES = {
+    Status.FINAL, Status.LEGACY_FINAL,
+    Status.FULL_TIME, Status.LEGACY_FULL_TIME,
+    Status.FINAL_AET, Status.FINAL_PEN,
+}
+CANCELLED_CODES = {
+    Status.POSTPONED, Status.CANCELED, Status.ABANDONED,
+}
+
+# Adaptive follow-up delays keyed by ESPN status once the first full-time check is due
+FOLLOW_UP_AFTER = {
+    Status.SECOND_HALF:            timedelta(minutes=2),
+    Status.IN_PROGRESS:            timedelta(minutes=2),
+    Status.END_OF_REGULATION:      timedelta(minutes=5),
+    Status.OVERTIME:               timedelta(minutes=5),
+    Status.FIRST_HALF_EXTRA_TIME:  timedelta(minutes=5),
+    Status.HALFTIME_ET:            timedelta(minutes=5),
+    Status.SECOND_HALF_EXTRA_TIME: timedelta(minutes=3),
+    Status.END_OF_EXTRATIME:       timedelta(minutes=3),
+    Status.SHOOTOUT:               timedelta(minutes=2),
+}
+
+# Statuses a match cannot leave; a cached fixture in one of these needs no refetch
+FINAL_CODES = COMPLETED_CODES | CANCELLED_CODES
+
+POST, REMOVE, WAIT = "post", "remove", "wait"
+
+
+def _parse_start(start_iso: str):
+    dt = datetime.fromisoformat(start_iso)
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=UTC)
+    return dt.astimezone(UTC)
+
+
+def kickoff_of(stored: dict):
+    """Native kickoff timestamp if stored, else parsed from the legacy ISO string."""
+    kickoff = stored.get("kickoff")
+    if isinstance(kickoff, datetime):
+        return kickoff.astimezone(UTC) if kickoff.tzinfo else kickoff.replace(tzinfo=UTC)
+    return _parse_start(stored["utc_datetime"])
+
+
+def tracking_fields(kickoff: datetime) -> dict:
+    """Timestamp fields stored with every tracked match for the due-match query."""
+    return {
+        "kickoff":    kickoff,
+        "next_check": kickoff + POSTPONE_CHECK_AFTER,
+    }
+
 
-    for stored in get_tracked_matches():
-        start_iso = stored.get("utc_datetime")
+def plan_checks(tracked: list, now_utc: datetime) -> dict:
+    """
+    Group the matches that are due for a check by (league_code, espn_date) so each
+    scoreboard is fetched once. Returns {(league, date): [(stored, start_dt), ...]}.
+    """
+    plan = defaultdict(list)
+    for stored in tracked:
         league    = stored.get("league_code")
         match_id  = stored.get("match_id")
 
-        if not (start_iso and league and match_id):
+        if not ((stored.get("kickoff") or stored.get("utc_datetime")) and league and match_id):
             print(f"⚠️ Skipping incomplete entry: {stored}")
             continue
 
         try:
-            start_dt = datetime.fromisoformat(start_iso)
-            if start_dt.tzinfo is None:
-                start_dt = start_dt.replace(tzinfo=UTC)
-            else:
-                start_dt = start_dt.astimezone(UTC)
+            start_dt = kickoff_of(stored)
         except Exception as e:
-            print(f"⚠️ Bad utc_datetime `{start_iso}`: {e}")
+            print(f"⚠️ Bad utc_datetime `{stored.get('utc_datetime')}`: {e}")
             continue
 
-        # 1) Not yet kicked off
-        if now_utc < start_dt:
+        # Not yet kicked off, or too early for the postponement check
+        if now_utc < start_dt + POSTPONE_CHECK_AFTER:
             continue
 
-        # 2) Postponed cleanup: 15–110 min after start but still scheduled
-        if now_utc < start_dt + timedelta(minutes=110):
-            if now_utc >= start_dt + timedelta(minutes=15):
-                espn_date = start_dt.strftime("%Y%m%d")
-                events = get_fixtures(league=league, filter_by_window=False, espn_date=espn_date)
-                evt = next((e for e in events if e.get("match_id") == match_id), None)
-                status = (evt or {}).get("status", "").upper()
-                if not evt or status in ("STATUS_SCHEDULED", "SCHEDULED"):
-                    print(f"ℹ️ Match {match_id} seems postponed; removing from tracking.")
-                    remove_match_from_db(stored)
+        plan[(league, start_dt.strftime("%Y%m%d"))].append((stored, start_dt))
+    return plan
+
+
+def events_for(league: str, espn_date: str, match_ids):
+    """
+    ({match_id: fixture}, stale) for a scoreboard check. Served from the fixture cache
+    when every match asked about is already in a final status; otherwise ESPN is asked
+    again and the cache is refreshed with the answer. Returns None when ESPN failed and
+    no earlier snapshot exists.
+    """
+    cached = _cached_final(league, espn_date, match_ids)
+    if cached:
+        return cached, False
+    return _board_events(league, get_scoreboard(league, espn_date))
+
+
+async def events_for_async(league: str, espn_date: str, match_ids):
+    cached = _cached_final(league, espn_date, match_ids)
+    if cached:
+        return cached, False
+    return _board_events(league, await get_scoreboard_async(league, espn_date))
+
+
+def _cached_final(league, espn_date, match_ids):
+    cached = {mid: fixture_cache.cached(league, espn_date, mid) for mid in match_ids}
+    if cached and all(f and (f.completed or f.status in FINAL_CODES) for f in cached.values()):
+        return cached
+    return None
+
+
+def _board_events(league, board):
+    if board is None:
+        return None
+    if not board.stale:
+        fixture_cache.update(league, board.fixtures)
+    return {f.match_id: f for f in board.fixtures}, board.stale
+
+
+def decide(evt: Fixture, start_dt: datetime, now_utc: datetime, stale: bool = False):
+    """
+    Decide what to do with a tracked match given its latest ESPN fixture (or None).
+    Returns (POST | REMOVE | WAIT, next_check) where next_check is set for WAIT.
+    A stale scoreboard never removes a match on the absence of news.
+    """
+    status = evt.status if evt else Status.UNKNOWN
+
+    if status in CANCELLED_CODES:
+        return REMOVE, None
+
+    # 1) Postponed cleanup: 15–110 min after start but still scheduled
+    if now_utc < start_dt + RESULT_CHECK_AFTER:
+        if not evt or status in SCHEDULED_CODES:
+            if stale:
+                return WAIT, now_utc + RECHECK_INTERVAL
+            return REMOVE, None
+        # In progress (first half, half time, ...) → first full-time check at +110
+        return WAIT, start_dt + RESULT_CHECK_AFTER
+
+    # 2) ≥110 minutes after start → check for any “ended” status; ESPN's completed flag
+    # also covers final codes the Status enum does not know yet
+    if evt and (status in COMPLETED_CODES or evt.completed):
+        return POST, None
+    return WAIT, now_utc + FOLLOW_UP_AFTER.get(status, RECHECK_INTERVAL)
+
+
+def _journal_due(events):
+    """Durably note results that are about to be posted, before tracking stops."""
+    journal.record_many([(RESULT, e.match_id, DUE, {"data": e.to_dict()}) for e in events], durable=True)
+
+
+def resume_deliveries():
+    """
+    Finish result deliveries a crash or a lost election interrupted; channels that
+    already have them are skipped. Runs on election, so the journal is re-read first.
+    """
+    journal.reload()
+    pending = [Fixture.from_dict(data) for _, _, data in journal.resume(RESULT)]
+    if pending:
+        print(f"📒 Resuming {len(pending)} interrupted result deliveries.")
+        send_results(pending)
+
+
+def check_match(match_id: str):
+    """
+    Check a single tracked match (per-match scheduling mode). Posts/removes it when
+    done and returns None, otherwise stores and returns the next check time.
+    """
+    todo = _match_to_check(match_id)
+    if todo is None:
+        return None
+    stored, start_dt = todo
+    now_utc = clock.now(UTC)
+    result = events_for(stored.get("league_code"), start_dt.strftime("%Y%m%d"), [match_id])
+    return _settle_match(stored, start_dt, now_utc, result)
+
+
+async def check_match_async(match_id: str):
+    """check_match() with the scoreboard fetched on the event loop; storage runs off it."""
+    todo = await asyncio.to_thread(_match_to_check, match_id)
+    if todo is None:
+        return None
+    stored, start_dt = todo
+    now_utc = clock.now(UTC)
+    result = await events_for_async(stored.get("league_code"), start_dt.strftime("%Y%m%d"), [match_id])
+    return await asyncio.to_thread(_settle_match, stored, start_dt, now_utc, result)
+
+
+def _match_to_check(match_id: str):
+    """(stored match, kickoff) for a per-match check, or None when there is nothing to check."""
+    stored = get_match(match_id)
+    if not stored:
+        return None
+    if journal.known(RESULT, match_id):
+        # Posted (or being resumed) before a restart; only the tracking row was left behind
+        remove_matches([stored])
+        return None
+    try:
+        return stored, kickoff_of(stored)
+    except Exception as e:
+        print(f"⚠️ Bad kickoff for match {match_id}: {e}")
+        return None
+
+
+def _settle_match(stored, start_dt, now_utc, result):
+    match_id = stored.get("match_id")
+    if result is None:
+        # ESPN is down and we have nothing cached; try again later, never drop the match
+        next_check = now_utc + RECHECK_INTERVAL
+        set_next_checks({match_id: next_check})
+        return next_check
+    events, stale = result
+    evt = events.get(match_id)
+    action, next_check = decide(evt, start_dt, now_utc, stale)
+
+    if leader.stepped_down():
+        # Lost the lease while checking; the new leader checks the match again
+        print(f"🪑 Not the leader any more; leaving match {match_id} to the new one.")
+        return None
+    if action == POST:
+        _journal_due([evt])
+        archive.append([evt])
+        remove_matches([stored])
+        send_results([evt])
+        return None
+    if action == REMOVE:
+        print(f"ℹ️ Match {match_id} postponed or cancelled; removing from tracking.")
+        remove_matches([stored])
+        return None
+    set_next_checks({match_id: next_check})
+    return next_check
+
+
+def post_results():
+    """Fetch and post any matches that have just finished (and clean up postponed)."""
+    now_utc = clock.now(UTC)
+    plan, to_remove = _due_plan(now_utc)
+    results = {
+        (league, espn_date): events_for(league, espn_date, [stored.get("match_id") for stored, _ in due])
+        for (league, espn_date), due in plan.items()
+    }
+    _settle(now_utc, plan, results, to_remove)
+
+
+async def post_results_async():
+    """post_results() with every scoreboard fetched concurrently; storage runs off the loop."""
+    now_utc = clock.now(UTC)
+    plan, to_remove = await asyncio.to_thread(_due_plan, now_utc)
+    keys = list(plan)
+    fetched = await asyncio.gather(*(
+        events_for_async(league, espn_date, [stored.get("match_id") for stored, _ in plan[(league, espn_date)]])
+        for league, espn_date in keys
+    ))
+    await asyncio.to_thread(_settle, now_utc, plan, dict(zip(keys, fetched)), to_remove)
+
+
+def _due_plan(now_utc):
+    """Scoreboard checks for the due matches, and the ones the journal says were already posted."""
+    to_remove = []
+    due_matches = []
+    for stored in get_due_matches(now_utc):
+        # Already posted (or being resumed) before a restart; no need to ask ESPN again
+        if journal.known(RESULT, stored.get("match_id")):
+            to_remove.append(stored)
+        else:
+            due_matches.append(stored)
+    return plan_checks(due_matches, now_utc), to_remove
+
+
+def _settle(now_utc, plan, results, to_remove):
+    """Decide every planned match from its scoreboard, then update storage and post."""
+    finished = []
+    next_checks = {}
+    for (league, espn_date), due in plan.items():
+        result = results[(league, espn_date)]
+        if result is None:
+            print(f"⚠️ No scoreboard for {league} on {espn_date}; keeping {len(due)} matches tracked.")
+            for stored, _ in due:
+                next_checks[stored.get("match_id")] = now_utc + RECHECK_INTERVAL
             continue
+        by_id, stale = result
+
+        for stored, start_dt in due:
+            match_id = stored.get("match_id")
+            evt = by_id.get(match_id)
+            action, next_check = decide(evt, start_dt, now_utc, stale)
 
-        # 3) ≥110 minutes after start → check for any “ended” status
-        espn_date = start_dt.strftime("%Y%m%d")
-        events   = get_fixtures(league=league, filter_by_window=False, espn_date=espn_date)
-
-        completed_codes = {
-            "STATUS_FINAL", "FINAL",
-            "STATUS_FULL_TIME", "FULL_TIME"
-        }
-        updated = next(
-            (e for e in events
-             if e.get("match_id") == match_id
-             and (
-                 e.get("status") in completed_codes
-                 or e.get("status_type", {}).get("completed")
-             )
-            ),
-            None
-        )
-
-        if updated:
-            finished.append(updated)
-            remove_match_from_db(stored)
+            if action == POST:
+                finished.append(evt)
+                to_remove.append(stored)
+            elif action == REMOVE:
+                print(f"ℹ️ Match {match_id} seems postponed; removing from tracking.")
+                to_remove.append(stored)
+            else:
+                next_checks[match_id] = next_check
+
+    if leader.stepped_down():
+        # Lost the lease while fetching; the new leader sees the same matches still due
+        print(f"🪑 Not the leader any more; leaving {len(finished)} results to the new one.")
+        return
+    if finished:
+        _journal_due(finished)
+        archive.append(finished)
+    if to_remove:
+        remove_matches(to_remove)
+    if next_checks:
+        set_next_checks(next_checks)
 
     if finished:
         send_results(finished)
@@ -0,0 +1,266 @@
+# http_client.py
+
+import json as _json
+import threading
+from collections import OrderedDict
+from typing import Optional
+from urllib.parse import urlsplit, urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+from config import FETCH_CONCURRENCY, FETCH_TIMEOUT, HTTP_CONNECT_TIMEOUT, ASYNC_HTTP_CONNECTIONS
+
+DEFAULT_HEADERS = {
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip, deflate",
+    "User-Agent": "football-bot/1.0",
+}
+
+# Max number of URLs we keep ETag/Last-Modified validators (and bodies) for
+VALIDATOR_CACHE_SIZE = 1024
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+_validators = OrderedDict()
+_validators_lock = threading.Lock()
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+class HttpResult:
+    """Minimal response wrapper; a 304 is served with the cached body and status 200."""
+
+    __slots__ = ("status_code", "content", "headers", "not_modified", "url")
+
+    def __init__(self, status_code, content, headers, url, not_modified=False):
+        self.status_code  = status_code
+        self.content      = content
+        self.headers      = headers
+        self.url          = url
+        self.not_modified = not_modified
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return _json.loads(self.content)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.HTTPError(f"{self.status_code} error for url: {self.url}")
+
+
+def _session_for(host: str) -> requests.Session:
+    session = _sessions.get(host)
+    if session is not None:
+        return session
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=max(4, FETCH_CONCURRENCY),
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(DEFAULT_HEADERS)
+            _sessions[host] = session
+        return session
+
+
+def _record(host: str, nbytes: int, not_modified: bool = False, error: bool = False):
+    with _stats_lock:
+        s = _stats.setdefault(host, {"requests": 0, "bytes": 0, "not_modified": 0, "errors": 0})
+        s["requests"] += 1
+        s["bytes"] += nbytes
+        if not_modified:
+            s["not_modified"] += 1
+        if error:
+            s["errors"] += 1
+
+
+def _cache_key(url: str, params: Optional[dict], scope: str = "") -> str:
+    key = f"{url}?{urlencode(sorted(params.items()))}" if params else url
+    return f"{scope}|{key}" if scope else key
+
+
+def _timeout(timeout: Optional[float]):
+    return (HTTP_CONNECT_TIMEOUT, timeout or FETCH_TIMEOUT)
+
+
+def _wire_bytes(response: requests.Response) -> int:
+    try:
+        return int(response.headers.get("Content-Length") or len(response.content))
+    except ValueError:
+        return len(response.content)
+
+
+def _conditional_headers(key: str):
+    """If-None-Match / If-Modified-Since for a cached URL, and the cached entry."""
+    with _validators_lock:
+        cached = _validators.get(key)
+    headers = {}
+    if cached:
+        etag, last_modified, _ = cached
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+    return headers, cached
+
+
+def _finish_get(host, key, conditional, cached, response, wire_bytes) -> HttpResult:
+    """Shared by get() and aget(): serve 304s from cache and remember new validators."""
+    if response.status_code == 304 and cached:
+        _record(host, wire_bytes, not_modified=True)
+        with _validators_lock:
+            if key in _validators:
+                _validators.move_to_end(key)
+        return HttpResult(200, cached[2], response.headers, str(response.url), not_modified=True)
+
+    _record(host, wire_bytes, error=response.status_code >= 400)
+    if conditional and response.status_code == 200:
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            with _validators_lock:
+                _validators[key] = (etag, last_modified, response.content)
+                _validators.move_to_end(key)
+                while len(_validators) > VALIDATOR_CACHE_SIZE:
+                    _validators.popitem(last=False)
+
+    return HttpResult(response.status_code, response.content, response.headers, str(response.url))
+
+
+def get(url: str, params: Optional[dict] = None, conditional: bool = False,
+        timeout: Optional[float] = None, scope: str = "") -> HttpResult:
+    """
+    GET through the pooled session for the URL's host. With conditional=True the
+    last ETag/Last-Modified is sent back and a 304 returns the cached body. Callers
+    that need "unchanged since *my* last fetch" pass their own validator scope.
+    """
+    host = urlsplit(url).netloc
+    key = _cache_key(url, params, scope)
+    headers, cached = _conditional_headers(key) if conditional else ({}, None)
+
+    try:
+        response = _session_for(host).get(url, params=params, headers=headers,
+                                          timeout=_timeout(timeout))
+    except requests.RequestException:
+        _record(host, 0, error=True)
+        raise
+    return _finish_get(host, key, conditional, cached, response, _wire_bytes(response))
+
+
+def post(url: str, json: Optional[dict] = None, timeout: Optional[float] = None) -> HttpResult:
+    """POST a JSON body through the pooled session for the URL's host."""
+    host = urlsplit(url).netloc
+    try:
+        response = _session_for(host).post(url, json=json, timeout=_timeout(timeout))
+    except requests.RequestException:
+        _record(host, 0, error=True)
+        raise
+    _record(host, _wire_bytes(response), error=response.status_code >= 400)
+    return HttpResult(response.status_code, response.content, response.headers, response.url)
+
+
+# ASYNC (RUNTIME=asyncio)
+
+_async_client = None
+
+
+def _httpx():
+    # Imported on first async use only; the threaded runtime never needs it
+    import httpx
+    return httpx
+
+
+def _client():
+    """The one pooled httpx.AsyncClient shared by every coroutine on the event loop."""
+    global _async_client
+    if _async_client is None:
+        httpx = _httpx()
+        _async_client = httpx.AsyncClient(
+            headers=DEFAULT_HEADERS,
+            limits=httpx.Limits(max_connections=ASYNC_HTTP_CONNECTIONS,
+                                max_keepalive_connections=ASYNC_HTTP_CONNECTIONS),
+            timeout=httpx.Timeout(FETCH_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+        )
+    return _async_client
+
+
+def _async_timeout(timeout: Optional[float]):
+    return _httpx().Timeout(timeout or FETCH_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+
+
+def _async_wire_bytes(response) -> int:
+    try:
+        return int(response.headers.get("Content-Length") or len(response.content))
+    except ValueError:
+        return len(response.content)
+
+
+def _as_requests_error(e: Exception):
+    # Callers (circuit breakers, retries) only know requests' exception types
+    if isinstance(e, _httpx().TimeoutException):
+        return requests.Timeout(str(e) or type(e).__name__)
+    return requests.ConnectionError(str(e) or type(e).__name__)
+
+
+async def aget(url: str, params: Optional[dict] = None, conditional: bool = False,
+               timeout: Optional[float] = None, scope: str = "") -> HttpResult:
+    """Async twin of get(): same validator cache, stats and errors, over httpx."""
+    host = urlsplit(url).netloc
+    key = _cache_key(url, params, scope)
+    headers, cached = _conditional_headers(key) if conditional else ({}, None)
+
+    try:
+        response = await _client().get(url, params=params, headers=headers,
+                                       timeout=_async_timeout(timeout))
+    except _httpx().HTTPError as e:
+        _record(host, 0, error=True)
+        raise _as_requests_error(e) from e
+    return _finish_get(host, key, conditional, cached, response, _async_wire_bytes(response))
+
+
+async def apost(url: str, json: Optional[dict] = None, timeout: Optional[float] = None) -> HttpResult:
+    """Async twin of post()."""
+    host = urlsplit(url).netloc
+    try:
+        response = await _client().post(url, json=json, timeout=_async_timeout(timeout))
+    except _httpx().HTTPError as e:
+        _record(host, 0, error=True)
+        raise _as_requests_error(e) from e
+    _record(host, _async_wire_bytes(response), error=response.status_code >= 400)
+    return HttpResult(response.status_code, response.content, response.headers, str(response.url))
+
+
+async def aclose():
+    global _async_client
+    client, _async_client = _async_client, None
+    if client is not None:
+        await client.aclose()
+
+
+def stats() -> dict:
+    """Snapshot of per-host request/byte/304/error counters."""
+    with _stats_lock:
+        return {host: dict(s) for host, s in _stats.items()}
+
+
+@metrics.register_collector
+def _export_metrics():
+    for host, s in stats().items():
+        metrics.HTTP_REQUESTS.set(s["requests"], host=host)
+        metrics.HTTP_BYTES.set(s["bytes"], host=host)
+        metrics.HTTP_NOT_MODIFIED.set(s["not_modified"], host=host)
@@ -0,0 +1,331 @@
+# journal.py
+#
+# Crash-safe outbound journal. An append-only JSON-lines log of result deliveries
+# keyed by (kind, match_id): "due" when a result is known (with the event to post),
+# "sent" per chat once Telegram accepted it, "retry" each time a restart resumes it,
+# "done" when every channel has it (or resuming was given up). One
+# writer thread group-commits appended records with a single fsync; the log is
+# replayed on startup to skip finished work and compacted once it grows.
+
+import json
+import os
+import threading
+import time
+
+import metrics
+from config import (
+    JOURNAL_PATH, JOURNAL_FSYNC_INTERVAL, JOURNAL_COMPACT_EVERY, JOURNAL_RETENTION,
+    JOURNAL_MAX_ATTEMPTS, JOURNAL_RESUME_WINDOW,
+)
+
+RESULT = "result"
+DUE, SENT, RETRY, DONE = "due", "sent", "retry", "done"
+
+
+class Entry:
+    __slots__ = ("data", "sent", "done", "updated", "due_at", "attempts")
+
+    def __init__(self):
+        self.data = None
+        self.sent = set()
+        self.done = False
+        self.updated = 0.0
+        self.due_at = 0.0
+        self.attempts = 0
+
+
+class Journal:
+    """
+    In-memory view of the log plus the file behind it. record() applies a change
+    immediately and queues it for the writer; with durable=True it also waits until
+    the batch holding it has been fsynced.
+    """
+
+    def __init__(self, path: str = JOURNAL_PATH):
+        self.path = path
+        self._entries = {}          # (kind, match_id) -> Entry
+        self._pending = []          # encoded lines not yet written
+        self._seq = 0               # records appended
+        self._synced = 0            # records known to be on disk
+        self._lines = 0             # lines in the file since the last compaction
+        self._compact_at = JOURNAL_COMPACT_EVERY
+        self._loaded = False
+        self._file = None
+        self._waiters = 0           # durable callers waiting for the next fsync
+        self._lock = threading.Lock()
+        self._flushed = threading.Condition(self._lock)
+        # Serialises file writes with compaction's rename
+        self._io_lock = threading.Lock()
+        self._worker = None
+
+    # LOAD / REPLAY
+
+    def _apply(self, rec: dict):
+        key = (rec.get("k"), str(rec.get("id")))
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = Entry()
+        event = rec.get("e")
+        if event == DUE:
+            entry.data = rec.get("d")
+            entry.due_at = entry.due_at or rec.get("t", 0.0)
+        elif event == SENT:
+            entry.sent.add(str(rec.get("c")))
+        elif event == RETRY:
+            entry.attempts += 1
+        elif event == DONE:
+            entry.done = True
+        entry.updated = rec.get("t", 0.0)
+
+    def load(self):
+        """Replay the log once per process; a torn last line from a crash is ignored."""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            count = 0
+            if self.path and os.path.exists(self.path):
+                t0 = time.perf_counter()
+                try:
+                    with open(self.path, encoding="utf-8") as f:
+                        for line in f:
+                            try:
+                                self._apply(json.loads(line))
+                                count += 1
+                            except ValueError:
+                                print(f"⚠️ Skipping unreadable journal line: {line[:80]!r}")
+                    print(f"📒 Replayed {count} journal records ({len(self._unfinished())} unfinished) "
+                          f"in {time.perf_counter() - t0:.3f}s.")
+                except OSError as e:
+                    print(f"⚠️ Could not read journal {self.path}: {e}")
+            self._lines = count
+            self._loaded = True
+        if count >= self._compact_at:
+            self.compact()
+
+    # APPEND
+
+    def _ensure_worker(self):
+        if self._worker and self._worker.is_alive():
+            return
+        with self._lock:
+            if not (self._worker and self._worker.is_alive()):
+                self._worker = threading.Thread(target=self._run, name="journal-writer", daemon=True)
+                self._worker.start()
+
+    def record(self, kind: str, match_id, event: str, durable: bool = False, **fields):
+        self.record_many([(kind, match_id, event, fields)], durable)
+
+    def record_many(self, records, durable: bool = False):
+        """Apply and queue (kind, match_id, event, fields) tuples as one batch."""
+        self.load()
+        now = time.time()
+        with self._lock:
+            for kind, match_id, event, fields in records:
+                rec = {"t": round(now, 3), "k": kind, "id": str(match_id), "e": event}
+                if "chat_id" in fields:
+                    rec["c"] = str(fields["chat_id"])
+                if "data" in fields:
+                    rec["d"] = fields["data"]
+                self._apply(rec)
+                if self.path:
+                    self._pending.append(json.dumps(rec, ensure_ascii=False, default=str) + "\n")
+                    self._seq += 1
+            target = self._seq
+            if durable and self.path:
+                self._waiters += 1
+            self._flushed.notify_all()
+        if not self.path:
+            return
+        self._ensure_worker()
+        if durable:
+            with self._lock:
+                try:
+                    while self._synced < target:
+                        self._flushed.wait()
+                finally:
+                    self._waiters -= 1
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        return self._file
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._pending:
+                    self._flushed.wait()
+                # Let a burst of records pile up so they share one fsync, unless someone is waiting
+                deadline = time.monotonic() + JOURNAL_FSYNC_INTERVAL
+                while not self._waiters and time.monotonic() < deadline:
+                    self._flushed.wait(deadline - time.monotonic())
+                lines, self._pending = self._pending, []
+                target = self._seq
+            t0 = time.perf_counter()
+            with self._io_lock:
+                try:
+                    f = self._open()
+                    f.writelines(lines)
+                    f.flush()
+                    os.fsync(f.fileno())
+                except OSError as e:
+                    # Delivery carries on without the journal; the worst case is a duplicate after a crash
+                    print(f"⚠️ Journal write failed: {e}")
+            metrics.JOURNAL_FSYNC_SECONDS.observe(time.perf_counter() - t0)
+            with self._lock:
+                self._lines += len(lines)
+                self._synced = max(self._synced, target)
+                self._flushed.notify_all()
+                compact = self._lines >= self._compact_at
+            if compact:
+                self.compact()
+
+    # QUERIES
+
+    def entry(self, kind: str, match_id):
+        self.load()
+        return self._entries.get((kind, str(match_id)))
+
+    def sent_to(self, kind: str, match_id) -> set:
+        entry = self.entry(kind, match_id)
+        return set(entry.sent) if entry else set()
+
+    def known(self, kind: str, match_id) -> bool:
+        """True once a delivery has been journaled as due (whether or not it finished)."""
+        entry = self.entry(kind, match_id)
+        return bool(entry and (entry.data is not None or entry.done))
+
+    def unfinished(self, kind: str = None) -> list:
+        """[(kind, match_id, data)] for deliveries that are due but not done."""
+        self.load()
+        return self._unfinished(kind)
+
+    def _unfinished(self, kind: str = None) -> list:
+        return [
+            (k, mid, e.data) for (k, mid), e in list(self._entries.items())
+            if not e.done and e.data is not None and (kind is None or k == kind)
+        ]
+
+    def resume(self, kind: str, max_attempts: int = JOURNAL_MAX_ATTEMPTS,
+               max_age: float = JOURNAL_RESUME_WINDOW) -> list:
+        """
+        [(kind, match_id, data)] to deliver again, each journaled as one more attempt.
+        Deliveries already resumed max_attempts times, or due for longer than max_age
+        seconds, are marked done instead of being resent on every restart.
+        """
+        cutoff = time.time() - max_age
+        retry, give_up = [], []
+        for k, match_id, data in self.unfinished(kind):
+            e = self._entries[(k, match_id)]
+            if e.attempts >= max_attempts or e.due_at < cutoff:
+                give_up.append((k, match_id, DONE, {}))
+            else:
+                retry.append((k, match_id, data))
+        if give_up:
+            print(f"⚠️ Giving up on {len(give_up)} interrupted deliveries "
+                  f"(resumed {max_attempts} times or due over {max_age / 3600:.0f}h ago).")
+        self.record_many(give_up + [(k, match_id, RETRY, {}) for k, match_id, _ in retry], durable=True)
+        return retry
+
+    # COMPACTION
+
+    def _snapshot_lines(self, cutoff: float) -> list:
+        lines = []
+        for (kind, match_id), e in self._entries.items():
+            base = {"t": e.updated, "k": kind, "id": match_id}
+            if e.done:
+                # A bare marker is enough to keep skipping the match for a while
+                if e.updated >= cutoff:
+                    lines.append({**base, "e": DONE})
+                continue
+            if e.data is not None:
+                lines.append({**base, "t": e.due_at or e.updated, "e": DUE, "d": e.data})
+            lines.extend({**base, "e": SENT, "c": chat} for chat in sorted(e.sent))
+            lines.extend({**base, "e": RETRY} for _ in range(e.attempts))
+        return [json.dumps(rec, ensure_ascii=False, default=str) + "\n" for rec in lines]
+
+    def compact(self):
+        """Rewrite the log with only live state, via a temp file and an atomic rename."""
+        if not self.path:
+            return
+        cutoff = time.time() - JOURNAL_RETENTION
+        with self._io_lock, self._lock:
+            for key in [k for k, e in self._entries.items() if e.done and e.updated < cutoff]:
+                del self._entries[key]
+            # Records still waiting for the writer are part of the snapshot, so drop them.
+            # A batch the writer already took may be appended again; replay is idempotent.
+            lines = self._snapshot_lines(cutoff)
+            before, self._pending = self._lines + len(self._pending), []
+            self._synced = self._seq
+            tmp = self.path + ".tmp"
+            try:
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.writelines(lines)
+                    f.flush()
+                    os.fsync(f.fileno())
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                os.replace(tmp, self.path)
+                _fsync_dir(self.path)
+                self._lines = len(lines)
+                # Do not rewrite again until the log has at least doubled its live size
+                self._compact_at = max(JOURNAL_COMPACT_EVERY, 2 * len(lines))
+                print(f"🧹 Compacted journal: {before} → {len(lines)} records.")
+            except OSError as e:
+                print(f"⚠️ Journal compaction failed: {e}")
+            self._flushed.notify_all()
+
+    def flush(self):
+        """Block until everything recorded so far is on disk."""
+        with self._lock:
+            target = self._seq
+            self._flushed.notify_all()
+            while self._synced < target and self._worker and self._worker.is_alive():
+                self._flushed.wait(0.1)
+
+    def reload(self):
+        """
+        Replay the file again from scratch. Called when this process is elected, since
+        whichever process led in the meantime may have appended to or compacted the log.
+        """
+        self.flush()
+        with self._io_lock, self._lock:
+            # A compaction elsewhere replaces the file; appends must go to the new one
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._entries.clear()
+            self._loaded = False
+        self.load()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._pending = []
+            self._synced = self._seq
+            self._loaded = True
+
+
+def _fsync_dir(path: str):
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+journal = Journal()
+
+
+@metrics.register_collector
+def _export_unfinished():
+    if journal._loaded:
+        metrics.JOURNAL_UNFINISHED.set(len(journal._unfinished()))
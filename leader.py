@@ -0,0 +1,214 @@
+# leader.py
+#
+# Single-leader job execution. Every process serves HTTP, but only the holder of
+# the lease runs the APScheduler jobs, so extra gunicorn workers or instances do not
+# post anything twice.
+#
+#   LEADER_ELECTION=file     flock on LEADER_LOCK_PATH; one leader per machine,
+#                            released by the OS the moment the holder dies
+#   LEADER_ELECTION=storage  lease row in the storage backend, renewed every
+#                            LEASE_TTL / 3 seconds; one leader across instances
+#   LEADER_ELECTION=none     always lead (the old single-process behaviour)
+
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import datetime, timedelta, timezone
+
+import metrics
+from config import LEADER_ELECTION, LEADER_LOCK_PATH, LEASE_TTL
+
+try:
+    import fcntl
+except ImportError:  # not on POSIX
+    fcntl = None
+
+LEASE_NAME = "scheduler"
+
+# Set once this process loses leadership (cleared when it is elected again), so jobs
+# still running from before skip their sends. Never set outside an election.
+_stepped_down = threading.Event()
+# Monotonic time after which an unrenewed expiring lease may already be someone else's
+_lease_deadline = None
+
+
+def stepped_down() -> bool:
+    """True once leadership is lost, or once the lease has gone unrenewed for too long."""
+    deadline = _lease_deadline
+    return _stepped_down.is_set() or (deadline is not None and time.monotonic() > deadline)
+
+
+def holder_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+class AlwaysLease:
+    expires = False
+
+    def acquire(self) -> bool:
+        return True
+
+    def release(self):
+        pass
+
+
+class FileLease:
+    """Exclusive non-blocking flock, held for as long as the process keeps the file open."""
+
+    expires = False
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fh = None
+
+    def acquire(self) -> bool:
+        if self._fh is not None:
+            return True
+        fh = open(self.path, "a+")
+        try:
+            fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            fh.close()
+            return False
+        fh.seek(0)
+        fh.truncate()
+        fh.write(f"{os.getpid()}\n")
+        fh.flush()
+        self._fh = fh
+        return True
+
+    def release(self):
+        if self._fh is not None:
+            fcntl.flock(self._fh, fcntl.LOCK_UN)
+            self._fh.close()
+            self._fh = None
+
+
+class StorageLease:
+    """
+    Time-bound lease kept in the storage backend; acquire() also renews. Calls give up
+    after `timeout` seconds (LEASE_TTL / 4 by default), so a hung round-trip counts as
+    a failed renewal instead of stalling the heartbeat past the lease.
+    """
+
+    expires = True
+
+    def __init__(self, name: str, holder: str, ttl: float, timeout: float = None):
+        self.name = name
+        self.holder = holder
+        self.ttl = timedelta(seconds=ttl)
+        self.timeout = timeout or ttl / 4
+        self._rpc = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lease-rpc")
+        self._pending = None
+
+    def _call(self, fn, *args):
+        # A call still stuck from an earlier heartbeat fails this one straight away
+        if self._pending is not None and not self._pending.done():
+            raise TimeoutError("previous lease call still running")
+        self._pending = self._rpc.submit(fn, *args)
+        try:
+            return self._pending.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise TimeoutError(f"lease call took over {self.timeout:.0f}s") from None
+
+    def acquire(self) -> bool:
+        import storage
+        return self._call(storage.acquire_lease, self.name, self.holder, datetime.now(timezone.utc), self.ttl)
+
+    def release(self):
+        import storage
+        self._call(storage.release_lease, self.name, self.holder)
+
+
+def make_lease():
+    if LEADER_ELECTION == "storage":
+        return StorageLease(LEASE_NAME, holder_id(), LEASE_TTL)
+    if LEADER_ELECTION == "file":
+        if fcntl is None:
+            print("⚠️ File locks are not available here; running without leader election.")
+            return AlwaysLease()
+        return FileLease(LEADER_LOCK_PATH)
+    return AlwaysLease()
+
+
+class LeaderElector:
+    """
+    Heartbeat loop: try to take or renew the lease every `heartbeat` seconds, call
+    on_elected() when leadership is gained and on_demoted() when it is lost. A leader
+    that cannot renew steps down before its lease can expire elsewhere.
+
+    The callbacks run in order on a thread of their own, so a slow scheduler start
+    (cache preload, backfill, resumed deliveries) never delays the next renewal.
+    """
+
+    def __init__(self, lease, on_elected, on_demoted, ttl: float = LEASE_TTL, heartbeat: float = None):
+        self.lease = lease
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.ttl = ttl
+        self.heartbeat = heartbeat or max(1.0, ttl / 3)
+        self.is_leader = False
+        self._renewed_at = 0.0
+        self._stop = threading.Event()
+        self._callbacks = ThreadPoolExecutor(max_workers=1, thread_name_prefix="leader")
+
+    def _renewed(self, at: float):
+        global _lease_deadline
+        self._renewed_at = at
+        if self.lease.expires:
+            # Stop posting a heartbeat before the lease could lapse in storage
+            _lease_deadline = at + self.ttl - self.heartbeat
+
+    def step(self):
+        # Taken before the round-trip: the lease runs from when we asked, not when it answered
+        t = time.monotonic()
+        try:
+            held = self.lease.acquire()
+        except Exception as e:
+            print(f"⚠️ Lease renewal failed: {e}")
+            # Keep leading through a blip, but never past our own lease
+            held = self.is_leader and time.monotonic() < self._renewed_at + self.ttl - self.heartbeat
+        else:
+            if held:
+                self._renewed(t)
+
+        if held and not self.is_leader:
+            self.is_leader = True
+            _stepped_down.clear()
+            metrics.LEADER.set(1)
+            print("👑 Elected leader; starting scheduled jobs.")
+            self._callbacks.submit(self._callback, self.on_elected)
+        elif not held and self.is_leader:
+            self.is_leader = False
+            _stepped_down.set()
+            metrics.LEADER.set(0)
+            print("🪑 Lost leadership; stopping scheduled jobs.")
+            self._callbacks.submit(self._callback, self.on_demoted)
+
+    @staticmethod
+    def _callback(fn):
+        try:
+            fn()
+        except Exception as e:
+            print(f"❌ Leadership callback {getattr(fn, '__name__', fn)} failed: {e}")
+
+    def run(self):
+        while not self._stop.wait(self.heartbeat):
+            self.step()
+
+    def stop(self):
+        self._stop.set()
+        if self.is_leader:
+            self.is_leader = False
+            _stepped_down.set()
+            metrics.LEADER.set(0)
+            self._callbacks.submit(self._callback, self.on_demoted)
+        # Let a pending start finish, then its stop, before the lease goes
+        self._callbacks.shutdown(wait=True)
+        try:
+            self.lease.release()
+        except Exception as e:
+            print(f"⚠️ Lease release failed: {e}")
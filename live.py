@@ -0,0 +1,223 @@
+# live.py
+#
+# In-play updates. Polls the scoreboards of leagues with a tracked match in progress,
+# keeps the last parsed snapshot per match and only acts on what changed: goals, red
+# cards and status transitions. Each match gets one live message that is edited in
+# place; the final result is still posted by get_results.
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytz
+import requests
+
+import clock
+import leader
+from config import FETCH_CONCURRENCY, LIVE_CHAT_ID
+from formatter import format_live_match
+from get_fixtures import fetch_scoreboard, fetch_scoreboard_async
+from get_results import kickoff_of
+from scoreboard import parse_live
+from storage import get_matches_kicking_off
+from telegram_bot import send_message, edit_message
+
+IST = pytz.timezone("Asia/Kolkata")
+
+# A league is polled from shortly before the first tracked kickoff until this long after the last
+WATCH_BEFORE = timedelta(minutes=5)
+WATCH_AFTER  = timedelta(minutes=150)
+# How often the watchlist is re-read from storage
+WATCHLIST_REFRESH = timedelta(minutes=5)
+# The poller keeps its own ETag validators: a 304 must mean "unchanged since the last
+# live poll", not since some other caller fetched the same scoreboard
+VALIDATOR_SCOPE = "live"
+
+
+def signature(match) -> tuple:
+    """Everything a live message shows except the running clock."""
+    return (match["status"], match["home_score"], match["away_score"],
+            len(match["events"]), match["completed"])
+
+
+def diff(prev, cur) -> list:
+    """
+    Deltas between two snapshots of the same match, as ("status", new_status),
+    ("score", home, away) or (kind, minute, side, player) for new goals and red cards.
+    """
+    deltas = []
+    if prev is None or prev["status"] != cur["status"]:
+        deltas.append(("status", cur["status"]))
+    old_events = prev["events"] if prev else ()
+    if cur["events"][:len(old_events)] == old_events:
+        deltas.extend(cur["events"][len(old_events):])
+    elif cur["events"] != old_events:
+        # A goal was chalked off (VAR) or the feed reordered; treat the timeline as new
+        deltas.extend(cur["events"])
+    if prev is None or (prev["home_score"], prev["away_score"]) != (cur["home_score"], cur["away_score"]):
+        deltas.append(("score", cur["home_score"], cur["away_score"]))
+    return deltas
+
+
+class LiveTracker:
+    """Holds the per-match snapshots and live message ids between polls."""
+
+    def __init__(self, chat_id=LIVE_CHAT_ID):
+        self.chat_id = chat_id
+        self._snapshots = {}   # match_id -> (signature, parsed match)
+        self._messages = {}    # match_id -> Telegram message_id, None while the send is queued
+        self._latest = {}      # match_id -> last rendered text
+        self._watch = {}       # league_code -> {match_id: kickoff}
+        self._watch_loaded = None
+        self._lock = threading.Lock()
+
+    def _refresh_watchlist(self, now: datetime):
+        if self._watch_loaded and now - self._watch_loaded < WATCHLIST_REFRESH:
+            return
+        watch = {}
+        # Only matches that can become active before the next refresh
+        for stored in get_matches_kicking_off(now - WATCH_AFTER, now + WATCH_BEFORE + WATCHLIST_REFRESH):
+            try:
+                watch.setdefault(stored["league_code"], {})[stored["match_id"]] = kickoff_of(stored)
+            except Exception:
+                continue
+        tracked = {mid for matches in watch.values() for mid in matches}
+        with self._lock:
+            self._watch = watch
+            self._watch_loaded = now
+            # Matches that were posted and removed from storage are done with
+            for mid in list(self._snapshots):
+                if mid not in tracked:
+                    self._forget(mid)
+
+    def _forget(self, match_id):
+        self._snapshots.pop(match_id, None)
+        self._messages.pop(match_id, None)
+        self._latest.pop(match_id, None)
+
+    def active_leagues(self, now: datetime) -> list:
+        return [
+            league for league, matches in self._watch.items()
+            if any(k - WATCH_BEFORE <= now <= k + WATCH_AFTER for k in matches.values())
+        ]
+
+    def _fetch(self, league):
+        try:
+            return fetch_scoreboard(league, scope=VALIDATOR_SCOPE)
+        except requests.exceptions.RequestException as e:
+            print(f"[{datetime.now(IST)}] ⚠️ Live fetch failed for {league}: {e}")
+            return None
+
+    async def _fetch_async(self, league):
+        try:
+            return await fetch_scoreboard_async(league, scope=VALIDATOR_SCOPE)
+        except requests.exceptions.RequestException as e:
+            print(f"[{datetime.now(IST)}] ⚠️ Live fetch failed for {league}: {e}")
+            return None
+
+    def poll(self):
+        now = clock.now()
+        self._refresh_watchlist(now)
+        leagues = self.active_leagues(now)
+        if not leagues:
+            return
+        with ThreadPoolExecutor(max_workers=min(FETCH_CONCURRENCY, len(leagues))) as pool:
+            responses = list(pool.map(self._fetch, leagues))
+        self._apply(leagues, responses)
+
+    async def poll_async(self):
+        """poll() with the scoreboards fetched on the event loop; storage and sends run off it."""
+        now = clock.now()
+        await asyncio.to_thread(self._refresh_watchlist, now)
+        leagues = self.active_leagues(now)
+        if not leagues:
+            return
+        responses = await asyncio.gather(*(self._fetch_async(league) for league in leagues))
+        await asyncio.to_thread(self._apply, leagues, responses)
+
+    def _apply(self, leagues, responses):
+        for league, response in zip(leagues, responses):
+            # 304: nothing in this league changed since the last poll
+            if response is None or response.not_modified:
+                continue
+            tracked = self._watch.get(league, {})
+            for match in parse_live(response.content, league):
+                if match["match_id"] in tracked:
+                    self.update(match)
+
+    def update(self, match) -> list:
+        """
+        Apply one parsed snapshot and return the deltas since the previous one. The
+        live message is re-rendered from the whole snapshot, so the deltas are logged
+        rather than posted separately.
+        """
+        mid = match["match_id"]
+        sig = signature(match)
+        with self._lock:
+            prev = self._snapshots.get(mid)
+            if prev is not None and prev[0] == sig:
+                return []
+            snapshot = self._snapshots[mid] = (sig, match)
+            if prev is None and match["completed"]:
+                # Finished before we ever saw it live; the result post covers it
+                return []
+        deltas = diff(prev[1] if prev else None, match)
+        # Rendering can read storage and enqueueing can wait for queue space; neither holds the lock
+        text = format_live_match(match)
+        send = edit = None
+        with self._lock:
+            if self._snapshots.get(mid) is not snapshot:
+                # A newer snapshot (or a watchlist refresh) got here first
+                return deltas
+            self._latest[mid] = text
+            if mid not in self._messages:
+                self._messages[mid] = None
+                send = text
+            elif self._messages[mid] is not None:
+                edit = self._messages[mid]
+            # else: the first send is still queued; _sent() catches up with the latest text
+        if send is not None:
+            send_message(send, chat_id=self.chat_id, silent=True,
+                         on_result=lambda results, mid=mid, text=send: self._sent(mid, text, results))
+        elif edit is not None:
+            edit_message(self.chat_id, edit, text)
+        print(f"[{datetime.now(IST)}] 🔴 Live {match['home']} vs {match['away']}: {deltas}")
+        return deltas
+
+    def _sent(self, match_id, text, results):
+        """Outbound worker callback for the first live message of a match."""
+        result = results[0] if results else None
+        message_id = result.get("message_id") if isinstance(result, dict) else None
+        with self._lock:
+            if match_id not in self._messages:
+                return
+            if message_id is None:
+                # Send failed; let the next change try a fresh message
+                del self._messages[match_id]
+                return
+            self._messages[match_id] = message_id
+            latest = self._latest.get(match_id)
+        if latest is not None and latest != text:
+            edit_message(self.chat_id, message_id, latest)
+
+
+tracker = LiveTracker()
+
+
+def poll_live():
+    if leader.stepped_down():
+        return
+    try:
+        tracker.poll()
+    except Exception as e:
+        print(f"[{datetime.now(IST)}] ❌ Live poll failed: {e}")
+
+
+async def poll_live_async():
+    if leader.stepped_down():
+        return
+    try:
+        await tracker.poll_async()
+    except Exception as e:
+        print(f"[{datetime.now(IST)}] ❌ Live poll failed: {e}")
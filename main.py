@@ -1,25 +1,87 @@
-from flask import Flask
-from scheduler import start
+from flask import Flask, Response, jsonify
 from datetime import datetime
-import time, os, sys
+import threading, time, os, sys
+
+from config import WARMUP_ON_START, RUNTIME
+import metrics
 
 app = Flask(__name__)
 
+# starting → warming → ready; /health answers 200 in every state, /ready only when ready.
+# Every process serves HTTP; only the leader ("role") runs the scheduled jobs.
+_state = {"status": "starting", "since": time.time(), "role": "follower"}
+_warm = threading.Event()
+_scheduler_up = threading.Event()
+
 def log(msg):
     print(f"[{datetime.now()}] {msg}")
 
+def _refresh_state():
+    if _warm.is_set() and _scheduler_up.is_set():
+        _state["status"] = "ready"
+
 @app.route('/')
 @app.route('/health')
 def health():
-    return 'OK', 200
+    return jsonify(status=_state["status"], role=_state["role"],
+                   uptime=round(time.time() - _state["since"], 1)), 200
+
+@app.route('/ready')
+def ready():
+    code = 200 if _state["status"] == "ready" else 503
+    return jsonify(status=_state["status"]), code
+
+@app.route('/metrics')
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+def warm_up():
+    """Create the heavy SDK clients off the request path."""
+    t0 = time.perf_counter()
+    try:
+        import storage, ai_processor
+        storage.warm_up()
+        ai_processor.warm_up()
+        log(f"🔥 Warm-up finished in {time.perf_counter() - t0:.2f}s")
+    except Exception as e:
+        log(f"⚠️ Warm-up failed (clients will be created on first use): {e}")
+    finally:
+        _warm.set()
+        _refresh_state()
 
 def run_bot():
     log("🚀 Starting AI-powered bot...")
+    _state["status"] = "warming"
     try:
-        start()
-        log("⏱️ Scheduler started; entering main loop")
-        while True:
-            time.sleep(1)
+        if WARMUP_ON_START:
+            threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+        else:
+            _warm.set()
+        # Imported here so `import main` (and /health) does not wait on APScheduler & co.
+        from scheduler import start, stop
+        from leader import LeaderElector, make_lease
+
+        def on_elected():
+            start()
+            _state["role"] = "leader"
+
+        def on_demoted():
+            stop()
+            _state["role"] = "follower"
+
+        def on_started():
+            _scheduler_up.set()
+            _refresh_state()
+            log(f"⏱️ Running as {_state['role']} ({RUNTIME}); entering election loop")
+
+        elector = LeaderElector(make_lease(), on_elected, on_demoted)
+        if RUNTIME == "asyncio":
+            import async_runtime
+            async_runtime.run(elector, on_started)
+            return
+        elector.step()
+        on_started()
+        elector.run()
     except Exception as e:
         log(f"💥 CRASHED: {e}")
         time.sleep(5)
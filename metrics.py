@@ -0,0 +1,242 @@
+# metrics.py
+#
+# Tiny in-process Prometheus-style registry: counters, gauges and histograms with
+# labels, rendered in the text exposition format for /metrics.
+
+import functools
+import inspect
+import threading
+import time
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_registry = []
+_collectors = []
+
+
+def _label_key(labelnames, labels):
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _fmt_labels(labelnames, key, extra=None):
+    pairs = list(zip(labelnames, key))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape_label(v)}"' for n, v in pairs) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set(self, value, **labels):
+        """Mirror a total that is maintained elsewhere (e.g. http_client.stats())."""
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = value
+
+    def render(self):
+        lines = self._header()
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_fmt_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = state[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            state[1] += value
+            state[2] += 1
+
+    def render(self):
+        lines = self._header()
+        with self._lock:
+            items = sorted((k, (list(s[0]), s[1], s[2])) for k, s in self._values.items())
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets, counts):
+                cumulative += c
+                lines.append(f"{self.name}_bucket{_fmt_labels(self.labelnames, key, ('le', bound))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_fmt_labels(self.labelnames, key, ('le', '+Inf'))} {count}")
+            lines.append(f"{self.name}_sum{_fmt_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_fmt_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+def timed(histogram, errors=None, **labels):
+    """
+    Decorator: observe the call duration in `histogram`. An "op" label defaults to the
+    function name; exceptions are counted in `errors` (a Counter) when given. Works on
+    coroutine functions too (the await is timed).
+    """
+    def decorator(fn):
+        call_labels = dict(labels)
+        if "op" in histogram.labelnames and "op" not in call_labels:
+            call_labels["op"] = fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            except Exception:
+                if errors is not None:
+                    errors.inc(**call_labels)
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - t0, **call_labels)
+
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            except Exception:
+                if errors is not None:
+                    errors.inc(**call_labels)
+                raise
+            finally:
+                histogram.observe(time.perf_counter() - t0, **call_labels)
+
+        return async_wrapper if inspect.iscoroutinefunction(fn) else wrapper
+    return decorator
+
+
+def register_collector(fn):
+    """fn() is called at scrape time to refresh gauges derived from other modules."""
+    _collectors.append(fn)
+    return fn
+
+
+def render() -> str:
+    for collect in _collectors:
+        try:
+            collect()
+        except Exception as e:
+            print(f"⚠️ Metrics collector failed: {e}")
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# HOT-PATH METRICS
+
+ESPN_FETCH_SECONDS = Histogram(
+    "bot_espn_fetch_seconds", "ESPN scoreboard fetch + parse time", ("league",))
+ESPN_FETCH_ERRORS = Counter(
+    "bot_espn_fetch_errors_total", "ESPN scoreboard fetches that failed", ("league",))
+ESPN_STALE_SERVED = Counter(
+    "bot_espn_stale_total", "Scoreboards served from a stale snapshot", ("league",))
+ESPN_CIRCUIT_OPEN = Gauge(
+    "bot_espn_circuit_open", "1 while a league's ESPN circuit breaker is open or half-open", ("league",))
+STORAGE_SECONDS = Histogram(
+    "bot_storage_seconds", "Storage operation time", ("op",))
+STORAGE_ERRORS = Counter(
+    "bot_storage_errors_total", "Storage operations that raised", ("op",))
+AI_SECONDS = Histogram(
+    "bot_ai_seconds", "Team shortening (Gemini) call time", ("op",))
+TELEGRAM_SEND_SECONDS = Histogram(
+    "bot_telegram_send_seconds", "Telegram send time including retries")
+TELEGRAM_RETRIES = Counter(
+    "bot_telegram_retries_total", "Telegram send retries", ("reason",))
+TELEGRAM_FAILURES = Counter(
+    "bot_telegram_failures_total", "Telegram messages given up on")
+HTTP_REQUESTS = Counter(
+    "bot_http_requests_total", "HTTP requests made by the shared client", ("host",))
+HTTP_BYTES = Counter(
+    "bot_http_bytes_total", "HTTP response bytes received", ("host",))
+HTTP_NOT_MODIFIED = Counter(
+    "bot_http_not_modified_total", "Conditional requests answered with 304", ("host",))
+OUTBOUND_QUEUE_DEPTH = Gauge(
+    "bot_telegram_queue_depth", "Messages waiting in the Telegram outbound queue")
+ENRICHMENT_QUEUE_DEPTH = Gauge(
+    "bot_team_enrichment_queue_depth", "Unknown teams waiting for background AI enrichment")
+JOURNAL_FSYNC_SECONDS = Histogram(
+    "bot_journal_fsync_seconds", "Outbound journal batch write + fsync time")
+JOURNAL_UNFINISHED = Gauge(
+    "bot_journal_unfinished", "Result deliveries journaled as due but not yet done")
+LEADER = Gauge(
+    "bot_leader", "1 while this process holds the scheduler lease")
+JOB_LAG_SECONDS = Histogram(
+    "bot_job_lag_seconds", "Delay between a job's scheduled and actual start", ("job",))
+JOB_RUNS = Counter(
+    "bot_job_runs_total", "Scheduler job executions", ("job", "outcome"))
+JOB_MISSED = Counter(
+    "bot_job_missed_total", "Scheduler job runs missed", ("job",))
+
+
+def job_label(job_id) -> str:
+    # Per-match jobs are "match:<id>"; label by kind to keep cardinality flat
+    return str(job_id).split(":", 1)[0]
+
+
+def attach_scheduler(scheduler):
+    """Record APScheduler lag, outcomes and misfires."""
+    from datetime import datetime, timezone
+    from apscheduler.events import (
+        EVENT_JOB_SUBMITTED, EVENT_JOB_EXECUTED, EVENT_JOB_ERROR, EVENT_JOB_MISSED,
+    )
+
+    def listener(event):
+        job = job_label(event.job_id)
+        if event.code == EVENT_JOB_SUBMITTED:
+            if event.scheduled_run_times:
+                lag = datetime.now(timezone.utc) - event.scheduled_run_times[-1]
+                JOB_LAG_SECONDS.observe(max(0.0, lag.total_seconds()), job=job)
+        elif event.code == EVENT_JOB_EXECUTED:
+            JOB_RUNS.inc(job=job, outcome="ok")
+        elif event.code == EVENT_JOB_ERROR:
+            JOB_RUNS.inc(job=job, outcome="error")
+        elif event.code == EVENT_JOB_MISSED:
+            JOB_MISSED.inc(job=job)
+
+    scheduler.add_listener(
+        listener,
+        EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR | EVENT_JOB_MISSED,
+    )
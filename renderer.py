@@ -0,0 +1,206 @@
+# renderer.py
+#
+# Pure message rendering: no network or storage access. Team display info is passed
+# in as {team_name: (emoji, short_name)} by formatter.
+
+import json
+import os
+
+here = os.path.dirname(os.path.abspath(__file__))
+
+
+def _load_json(name, default):
+    try:
+        with open(os.path.join(here, name), encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"⚠️ Could not load {name}: {e}")
+        return default
+
+
+# Load emoji icons for leagues
+LEAGUES = _load_json("leagues.json", {})
+
+# Load grouped league aliases and flatten
+LEAGUE_ALIASES = {
+    alias: name
+    for group in _load_json("league_aliases_grouped.json", {}).values()
+    for alias, name in group.items()
+}
+
+# Load league priority
+league_priority = _load_json("league_priority.json", [])
+
+DEFAULT_ICON = "🔰"
+
+
+def _build_league_index():
+    """
+    Precompile alias → (canonical name, priority rank, icon) so sorting and
+    rendering need a single dict lookup per match.
+    """
+    unranked = len(league_priority)
+    rank = {name: i for i, name in reversed(list(enumerate(league_priority)))}
+    index = {}
+    for name in list(LEAGUES) + list(league_priority) + list(LEAGUE_ALIASES.values()):
+        index[name] = (name, rank.get(name, unranked), LEAGUES.get(name, DEFAULT_ICON))
+    for alias, name in LEAGUE_ALIASES.items():
+        index[alias] = index[name]
+    return index
+
+
+LEAGUE_INDEX = _build_league_index()
+
+
+def league_info(raw_league):
+    """(canonical name, priority rank, icon) for any raw ESPN or canonical league name."""
+    info = LEAGUE_INDEX.get(raw_league)
+    if info is None:
+        info = (raw_league, len(league_priority), DEFAULT_ICON)
+        LEAGUE_INDEX[raw_league] = info
+    return info
+
+
+# Telegram legacy Markdown (parse_mode="Markdown") only treats these as entities
+_ESCAPE_TABLE = str.maketrans({
+    "_": "\\_",
+    "*": "\\*",
+    "`": "\\`",
+    "[": "\\[",
+})
+
+
+def escape(text) -> str:
+    if text is None:
+        return ""
+    if not isinstance(text, str):
+        text = str(text)
+    return text.translate(_ESCAPE_TABLE)
+
+
+_SCORE_EMOJI = {
+    0: '0️⃣', 1: '1️⃣', 2: '2️⃣', 3: '3️⃣', 4: '4️⃣', 5: '5️⃣',
+    6: '6️⃣', 7: '7️⃣', 8: '8️⃣', 9: '9️⃣', 10: '🔟'
+}
+
+
+def score_to_emoji(score):
+    return _SCORE_EMOJI.get(score, str(score))
+
+
+def _team(team_info, name):
+    return team_info.get(name) or ("◽", name or "")
+
+
+def sort_fixtures(matches, priority=None):
+    """
+    Sort in place by league priority, keeping each league's matches together.
+    A channel's own priority list (canonical league names) ranks ahead of the global one.
+    """
+    if priority:
+        own = {name: i for i, name in reversed(list(enumerate(priority)))}
+        first = len(priority)
+
+        def sort_key(m):
+            name, rank, _ = league_info(m.get("league", ""))
+            return own.get(name, first + rank), name
+    else:
+        def sort_key(m):
+            name, rank, _ = league_info(m.get("league", ""))
+            return rank, name
+    matches.sort(key=sort_key)
+
+
+def render_fixture_line(match, team_info) -> str:
+    """The per-match fragment of the fixtures post; independent of the channel."""
+    home_emoji, home_short = _team(team_info, match.get("home", ""))
+    away_emoji, away_short = _team(team_info, match.get("away", ""))
+    utc = match.get("utc_time") or match.get("utc_datetime", "")
+    return (
+        f"{home_emoji} *{escape(home_short)}* 🆚 *{escape(away_short)}* {away_emoji}\n"
+        f"🕡 {match.get('local_time', '')} Local | {utc} UTC 🌐\n"
+    )
+
+
+def render_fixtures(matches, team_info, lines=None) -> str:
+    """
+    Render the daily fixtures post. Expects matches already sorted. `lines` maps
+    match_id to a fragment from render_fixture_line, so several channels can share
+    one rendering pass.
+    """
+    if not matches:
+        return "⚠️ No matches scheduled for today."
+
+    out = ["📌 𝗧𝗼𝗱𝗮𝘆'𝘀 𝗠𝗮𝘁𝗰𝗵𝗲𝘀\n"]
+    append = out.append
+    last_league = None
+
+    for match in matches:
+        league_name, _, league_icon = league_info(match.get("league", "Unknown League"))
+        if league_name != last_league:
+            append(f"\n{league_icon} *{escape(league_name)}*")
+            last_league = league_name
+
+        line = lines.get(match.get("match_id")) if lines else None
+        append(line if line is not None else render_fixture_line(match, team_info))
+
+    return "\n".join(out).strip()
+
+
+_LIVE_PHASE = {
+    "STATUS_HALFTIME": "HT",
+    "STATUS_HALFTIME_ET": "ET HT",
+    "STATUS_SHOOTOUT": "Penalties",
+}
+# Shown when the feed carries no running clock
+_LIVE_HALF = {"STATUS_FIRST_HALF": "1st half", "STATUS_SECOND_HALF": "2nd half"}
+_LIVE_ICON = {"goal": "⚽", "red": "🟥"}
+
+
+def render_live(match, team_info) -> str:
+    """One live message per match: score line plus the goal/red-card timeline."""
+    league_name, _, league_icon = league_info(match.get("league", "Unknown League"))
+
+    home_emoji, home_short = _team(team_info, match.get("home", ""))
+    away_emoji, away_short = _team(team_info, match.get("away", ""))
+    short = {"home": home_short, "away": away_short}
+
+    if match.get("completed"):
+        phase = "FT"
+    else:
+        status = match.get("status", "")
+        phase = _LIVE_PHASE.get(status) or match.get("clock") or _LIVE_HALF.get(status, "")
+
+    out = [
+        f"🔴 𝗟𝗜𝗩𝗘 | {escape(phase)}\n",
+        f"{league_icon} *{escape(league_name)}*",
+        f"{home_emoji} *{escape(home_short)}* {score_to_emoji(match.get('home_score', 0))} - "
+        f"{score_to_emoji(match.get('away_score', 0))} *{escape(away_short)}* {away_emoji}",
+    ]
+    timeline = match.get("events") or ()
+    if timeline:
+        out.append("")
+        for kind, minute, side, player in timeline:
+            team = short.get(side, "")
+            out.append(f"{_LIVE_ICON.get(kind, '•')} {escape(minute)} {escape(team)}"
+                       + (f" – {escape(player)}" if player else ""))
+    return "\n".join(out)
+
+
+def render_match_result(match, team_info) -> str:
+    league_name, _, league_icon = league_info(match.get("league", "Unknown League"))
+
+    home_emoji, home_short = _team(team_info, match.get("home", ""))
+    away_emoji, away_short = _team(team_info, match.get("away", ""))
+
+    home_score = score_to_emoji(match.get('home_score', 0))
+    away_score = score_to_emoji(match.get('away_score', 0))
+
+    league_hashtag = f"#{league_name.replace(' ', '').lower()}"
+
+    return (
+        f"📌 𝗠𝗮𝘁𝗰𝗵 𝗘𝗻𝗱𝗲𝗱 | 𝗙𝗧\n\n"
+        f"{league_icon} *{escape(league_name)}*\n"
+        f"{home_emoji} *{escape(home_short)}* {home_score} - {away_score} *{escape(away_short)}* {away_emoji}\n\n"
+        f"{escape(league_hashtag)}"
+    )
@@ -1,17 +1,43 @@
 # scheduler.py
 
+from apscheduler.events import EVENT_JOB_SUBMITTED, EVENT_JOB_EXECUTED, EVENT_JOB_ERROR
 from apscheduler.schedulers.background import BackgroundScheduler
-from datetime import datetime
+from datetime import datetime, timedelta
+import asyncio
+import functools
+import threading
 import pytz
 import json
 
-from telegram_bot import send_fixtures, send_keepalive, send_message
-from get_fixtures import get_fixtures
-from get_results import post_results
-from storage import save_match_to_db
-from config import PERSONAL_CHAT_ID
+from telegram_bot import send_fixtures, send_keepalive, send_keepalive_async, send_message
+import fixture_cache
+from get_results import (
+    post_results, post_results_async, check_match, check_match_async, resume_deliveries,
+    kickoff_of, tracking_fields, POSTPONE_CHECK_AFTER,
+)
+from storage import save_matches, backfill_match_timestamps, get_tracked_matches
+from config import (
+    PERSONAL_CHAT_ID, TEAM_CACHE_PRELOAD, RESULT_SCHEDULING, LIVE_UPDATES, LIVE_INTERVAL, RUNTIME,
+    LEASE_TTL,
+)
+import leader
+import team_cache
+import subscriptions
+import metrics
 
 IST = pytz.timezone("Asia/Kolkata")
+UTC = pytz.utc
+
+PER_MATCH = RESULT_SCHEDULING == "per_match"
+ASYNC = RUNTIME == "asyncio"
+
+# A demoted leader gives jobs already running this long to finish; its unrenewed lease
+# has about LEASE_TTL / 3 left, so they are done before a new leader can start
+STOP_WAIT = LEASE_TTL / 4
+
+_scheduler = None
+_running = 0
+_running_changed = threading.Condition()
 
 def load_leagues():
     try:
@@ -22,44 +48,187 @@ def load_leagues():
         return []
 
 def post_daily_fixtures():
-    fixtures = []
-    for league in load_leagues():
-        fixtures.extend(
-            get_fixtures(league=league, filter_by_window=True)
-        )
+    # Every league any channel follows is read once, from the prefetched fixture cache
+    _post_and_track(fixture_cache.window_fixtures(subscriptions.all_leagues(load_leagues())))
 
+async def post_daily_fixtures_async():
+    leagues = await asyncio.to_thread(lambda: subscriptions.all_leagues(load_leagues()))
+    fixtures = await fixture_cache.window_fixtures_async(leagues)
+    await asyncio.to_thread(_post_and_track, fixtures)
+
+def _post_and_track(fixtures):
     if not fixtures:
         print(f"[{datetime.now(IST)}] ℹ️ No fixtures to post in this window.")
         return
+    if leader.stepped_down():
+        print(f"[{datetime.now(IST)}] 🪑 Not the leader any more; leaving the daily post to the new one.")
+        return
 
     send_fixtures(fixtures)
+    # Save only the fields post_results needs
+    new_ids = set(save_matches([
+        {**m.to_firestore(), **tracking_fields(m.kickoff_dt)}
+        for m in fixtures
+    ]))
     for m in fixtures:
-        # Save only the fields post_results needs
-        save_match_to_db({
-            "match_id":     m["match_id"],
-            "league_code":  m["league_code"],
-            "home":         m["home"],
-            "away":         m["away"],
-            "utc_datetime": m["utc_datetime"],
-        })
+        if m.match_id not in new_ids:
+            continue
+        if PER_MATCH:
+            schedule_match_check(m.match_id, m.kickoff_dt + POSTPONE_CHECK_AFTER)
         send_message(
-            text=f"🔖 Tracking match: {m['home']} vs {m['away']} at {m['local_time']}",
+            text=f"🔖 Tracking match: {m.home} vs {m.away} at {m.local_time}",
             chat_id=PERSONAL_CHAT_ID
         )
 
+def prefetch_fixtures():
+    fixture_cache.prefetch(subscriptions.all_leagues(load_leagues()))
+
+async def prefetch_fixtures_async():
+    leagues = await asyncio.to_thread(lambda: subscriptions.all_leagues(load_leagues()))
+    await fixture_cache.prefetch_async(leagues)
+
+def _new_scheduler():
+    if ASYNC:
+        # Coroutine jobs run on the loop; plain functions go to its default executor
+        from apscheduler.schedulers.asyncio import AsyncIOScheduler
+        import async_runtime
+        return AsyncIOScheduler(timezone=IST, event_loop=async_runtime.get_loop())
+    return BackgroundScheduler(timezone=IST)
+
+def _track_running(event):
+    global _running
+    with _running_changed:
+        _running += 1 if event.code == EVENT_JOB_SUBMITTED else -1
+        _running_changed.notify_all()
+
+def _on_scheduler(scheduler, method, *args, **kwargs):
+    """Call a scheduler method from any thread; AsyncIOScheduler may only be touched on its loop."""
+    loop = None
+    if ASYNC:
+        import async_runtime
+        loop = async_runtime.get_loop()
+    if loop is not None:
+        loop.call_soon_threadsafe(functools.partial(method, *args, **kwargs))
+    else:
+        method(*args, **kwargs)
+
+# PER-MATCH RESULT SCHEDULING
+
+def schedule_match_check(match_id: str, when: datetime):
+    """(Re)register the single date job that checks one tracked match."""
+    scheduler = _scheduler
+    if scheduler is None:
+        return
+    _on_scheduler(
+        scheduler,
+        scheduler.add_job,
+        run_match_check_async if ASYNC else run_match_check,
+        "date",
+        run_date=max(when, datetime.now(UTC)),
+        args=[match_id],
+        id=f"match:{match_id}",
+        replace_existing=True,
+        misfire_grace_time=3600,
+        coalesce=True,
+    )
+
+def run_match_check(match_id: str):
+    try:
+        next_check = check_match(match_id)
+    except Exception as e:
+        print(f"[{datetime.now(IST)}] ❌ Check for match {match_id} failed: {e}")
+        next_check = datetime.now(UTC) + timedelta(minutes=5)
+    if next_check:
+        schedule_match_check(match_id, next_check)
+
+async def run_match_check_async(match_id: str):
+    try:
+        next_check = await check_match_async(match_id)
+    except Exception as e:
+        print(f"[{datetime.now(IST)}] ❌ Check for match {match_id} failed: {e}")
+        next_check = datetime.now(UTC) + timedelta(minutes=5)
+    if next_check:
+        schedule_match_check(match_id, next_check)
+
+def rebuild_match_jobs():
+    """Recreate per-match jobs from storage after a restart."""
+    count = 0
+    for stored in get_tracked_matches():
+        match_id = stored.get("match_id")
+        if not match_id:
+            continue
+        when = stored.get("next_check")
+        if not isinstance(when, datetime):
+            try:
+                when = kickoff_of(stored) + POSTPONE_CHECK_AFTER
+            except Exception:
+                continue
+        schedule_match_check(match_id, when)
+        count += 1
+    print(f"[{datetime.now(IST)}] 🔁 Rebuilt {count} per-match result jobs.")
+
 def start():
+    global _scheduler
+    if TEAM_CACHE_PRELOAD:
+        team_cache.preload()
+    try:
+        backfill_match_timestamps(POSTPONE_CHECK_AFTER)
+    except Exception as e:
+        print(f"[{datetime.now(IST)}] ⚠️ Tracked match backfill failed: {e}")
+    try:
+        resume_deliveries()
+    except Exception as e:
+        print(f"[{datetime.now(IST)}] ⚠️ Resuming journaled deliveries failed: {e}")
     try:
-        scheduler = BackgroundScheduler(timezone=IST)
+        scheduler = _new_scheduler()
+        # Pull the next few days of fixtures just before the daily post
+        scheduler.add_job(prefetch_fixtures_async if ASYNC else prefetch_fixtures,
+                          "cron", hour=13, minute=45, id="prefetch")
         # Your custom 24 h window start (e.g. 14:00 IST as in your get_fixtures)
-        scheduler.add_job(post_daily_fixtures, "cron", hour=14, minute=0)
-        # Every 15 min, check for finished/postponed matches
-        scheduler.add_job(post_results, "interval", minutes=15)
+        scheduler.add_job(post_daily_fixtures_async if ASYNC else post_daily_fixtures,
+                          "cron", hour=14, minute=0, id="daily_fixtures")
+        if not PER_MATCH:
+            # Every 15 min, check for finished/postponed matches
+            scheduler.add_job(post_results_async if ASYNC else post_results,
+                              "interval", minutes=15, id="results")
+        if LIVE_UPDATES:
+            from live import poll_live, poll_live_async
+            scheduler.add_job(poll_live_async if ASYNC else poll_live,
+                              "interval", seconds=LIVE_INTERVAL, id="live",
+                              max_instances=1, coalesce=True)
         # Heartbeat every 4 min
-        scheduler.add_job(send_keepalive, "interval", minutes=4)
-        scheduler.start()
+        scheduler.add_job(send_keepalive_async if ASYNC else send_keepalive,
+                          "interval", minutes=4, id="keepalive")
+        metrics.attach_scheduler(scheduler)
+        scheduler.add_listener(_track_running, EVENT_JOB_SUBMITTED | EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
+        _on_scheduler(scheduler, scheduler.start)
+        _scheduler = scheduler
+        if PER_MATCH:
+            rebuild_match_jobs()
         print(f"[{datetime.now(IST)}] ⏱️ Scheduler started...")
     except Exception as e:
         print(f"[{datetime.now(IST)}] ❌ Scheduler failed to start: {e}")
 
+def stop():
+    """
+    Shut the scheduler down when this process stops being the leader. No new runs
+    start; runs already going get up to STOP_WAIT seconds to finish, and skip their
+    sends once leader.stepped_down() is set.
+    """
+    global _scheduler
+    scheduler, _scheduler = _scheduler, None
+    if scheduler is None:
+        return
+    try:
+        _on_scheduler(scheduler, scheduler.pause)
+        with _running_changed:
+            if not _running_changed.wait_for(lambda: _running <= 0, STOP_WAIT):
+                print(f"[{datetime.now(IST)}] ⚠️ {_running} jobs still running after {STOP_WAIT:.0f}s; "
+                      f"they will not post.")
+        _on_scheduler(scheduler, scheduler.shutdown, wait=False)
+        print(f"[{datetime.now(IST)}] ⏹️ Scheduler stopped.")
+    except Exception as e:
+        print(f"[{datetime.now(IST)}] ⚠️ Scheduler shutdown failed: {e}")
+
 if __name__ == "__main__":
     start()
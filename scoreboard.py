@@ -0,0 +1,289 @@
+# scoreboard.py
+#
+# Fast parser for ESPN soccer scoreboard payloads → Fixture objects.
+
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+import pytz
+from dateutil import parser as _p2
+
+import clock
+from fixture import Fixture
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+IST = pytz.timezone("Asia/Kolkata")
+UTC = pytz.utc
+
+
+def _load_timezones():
+    try:
+        here = os.path.dirname(os.path.abspath(__file__))
+        with open(os.path.join(here, "local_time.json"), "r") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"⚠️ Could not load local_time.json: {e}")
+        return {}
+
+
+# Load local timezones mapping from JSON; tz objects are built once, not per event
+LOCAL_TIMEZONES = _load_timezones()
+_TZ_CACHE = {}
+
+
+def timezone_for(league_code: str, league_name: str = ""):
+    """pytz timezone for a league, keyed by ESPN code (falls back to name, then UTC)."""
+    key = league_code or league_name
+    tz = _TZ_CACHE.get(key)
+    if tz is None:
+        tz_name = LOCAL_TIMEZONES.get(league_code) or LOCAL_TIMEZONES.get(league_name) or "UTC"
+        try:
+            tz = pytz.timezone(tz_name)
+        except pytz.UnknownTimeZoneError:
+            print(f"⚠️ Unknown timezone {tz_name} for {key}")
+            tz = UTC
+        _TZ_CACHE[key] = tz
+    return tz
+
+
+# (tz, epoch // 3600) -> UTC offset in minutes; DST switches in our zones fall on whole UTC hours
+_OFFSET_CACHE = {}
+# (tz, kickoff epoch) -> "HH:MM"; a scoreboard only has a handful of distinct kickoffs
+_HHMM_CACHE = {}
+
+
+def local_hhmm(kickoff: int, tz) -> str:
+    """Local "HH:MM" for a kickoff in epoch seconds, reusing the tz offset of that UTC hour."""
+    key = (tz, kickoff)
+    hhmm = _HHMM_CACHE.get(key)
+    if hhmm is None:
+        hour = (tz, kickoff // 3600)
+        offset = _OFFSET_CACHE.get(hour)
+        if offset is None:
+            if len(_OFFSET_CACHE) > 50000:
+                _OFFSET_CACHE.clear()
+            utc = datetime.fromtimestamp(kickoff, UTC)
+            offset = _OFFSET_CACHE[hour] = int(utc.astimezone(tz).utcoffset().total_seconds() // 60)
+        minutes = (kickoff // 60 + offset) % 1440
+        if len(_HHMM_CACHE) > 50000:
+            _HHMM_CACHE.clear()
+        hhmm = _HHMM_CACHE[key] = f"{minutes // 60:02d}:{minutes % 60:02d}"
+    return hhmm
+
+
+def loads(payload):
+    """Decode JSON bytes/str, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+def parse_date_to_utc(iso_time: str) -> Optional[datetime]:
+    """
+    Parse an ESPN timestamp to a timezone-aware UTC datetime. The two formats ESPN
+    actually sends ("2024-08-17T14:00Z" and "2024-08-17T14:00:00Z") are sliced
+    directly; anything else goes through fromisoformat/dateutil.
+    """
+    n = len(iso_time)
+    if (n == 17 or n == 20) and iso_time[-1] == "Z" and iso_time[10] == "T":
+        try:
+            return datetime(
+                int(iso_time[0:4]), int(iso_time[5:7]), int(iso_time[8:10]),
+                int(iso_time[11:13]), int(iso_time[14:16]),
+                int(iso_time[17:19]) if n == 20 else 0,
+                tzinfo=UTC,
+            )
+        except ValueError:
+            pass
+    try:
+        utc_time = datetime.fromisoformat(iso_time.rstrip("Z"))
+        if utc_time.tzinfo is None:
+            return utc_time.replace(tzinfo=UTC)
+        return utc_time.astimezone(UTC)
+    except Exception:
+        try:
+            utc_time = _p2.parse(iso_time)
+            if utc_time.tzinfo is None:
+                return utc_time.replace(tzinfo=UTC)
+            return utc_time.astimezone(UTC)
+        except Exception as e:
+            print(f"⚠️ Time conversion error: {e}")
+            return None
+
+
+# ESPN timestamp string -> epoch seconds; kickoff strings repeat across events and polls
+_EPOCH_CACHE = {}
+
+
+def kickoff_epoch(iso_time: str) -> Optional[int]:
+    """Epoch seconds for an ESPN timestamp (None if it cannot be parsed), memoised per string."""
+    epoch = _EPOCH_CACHE.get(iso_time)
+    if epoch is None:
+        utc = parse_date_to_utc(iso_time)
+        if utc is None:
+            return None
+        if len(_EPOCH_CACHE) > 50000:
+            _EPOCH_CACHE.clear()
+        epoch = _EPOCH_CACHE[iso_time] = int(utc.timestamp())
+    return epoch
+
+
+def custom_window(now_ist: Optional[datetime] = None):
+    """(start, end) of the 14:00 IST → 13:59 IST posting window, as UTC datetimes."""
+    now_ist = now_ist or clock.now(IST)
+    start_window = now_ist.replace(hour=14, minute=0, second=0, microsecond=0)
+    if now_ist.hour < 14:
+        start_window -= timedelta(days=1)
+    end_window = start_window + timedelta(days=1) - timedelta(minutes=1)
+    return start_window.astimezone(UTC), end_window.astimezone(UTC)
+
+
+def parse_scoreboard(payload, league: str, filter_by_window: bool = False, window=None) -> list:
+    """
+    Parse a scoreboard response (dict, or raw JSON bytes/str) into Fixtures,
+    deduplicated by match_id.
+    """
+    data = payload if isinstance(payload, dict) else loads(payload)
+    events = data.get("events") or []
+    if filter_by_window and window is None:
+        window = custom_window()
+    lo, hi = (int(window[0].timestamp()), int(window[1].timestamp())) if window else (None, None)
+
+    leagues = data.get("leagues") or [{}]
+    default_league_name = leagues[0].get("name", "Unknown League")
+
+    unique = {}
+    for event in events:
+        try:
+            comps = event.get("competitions")
+            if not comps:
+                print(f"⚠️ No competition data for event {event.get('id')}")
+                continue
+            comp = comps[0]
+
+            iso_time = comp.get("date")
+            if not iso_time:
+                print(f"⚠️ Missing date for event {event.get('id')}")
+                continue
+
+            kickoff = kickoff_epoch(iso_time)
+            if kickoff is None:
+                continue
+
+            if lo is not None and not (lo <= kickoff <= hi):
+                continue
+
+            # Prefer event-level league name, fallback to response header
+            league_name = (event.get("league") or {}).get("name") or default_league_name
+
+            home = away = None
+            for team in comp["competitors"]:
+                side = team.get("homeAway")
+                if side == "home":
+                    home = team
+                elif side == "away":
+                    away = team
+            if home is None or away is None:
+                print(f"⚠️ Missing home/away for event {event.get('id')}")
+                continue
+
+            # Safely extract status
+            status_type = (event.get("status") or {}).get("type") or {}
+            status = status_type.get("name")
+
+            match_id = event.get("id")
+            unique[match_id] = Fixture(
+                match_id,
+                league,
+                league_name,
+                home["team"]["displayName"],
+                away["team"]["displayName"],
+                kickoff,
+                local_hhmm(kickoff, timezone_for(league, league_name)),
+                status,
+                home.get("score"),
+                away.get("score"),
+                status_type.get("completed", False),
+            )
+        except Exception as e:
+            print(f"⚠️ Skipping event due to parsing error: {e}")
+            continue
+
+    return list(unique.values())
+
+
+LIVE_STATES = {"in"}
+
+
+def _live_details(comp, home_id, away_id):
+    """Goals and red cards from competitions[0].details as (kind, minute, side, player) tuples."""
+    out = []
+    for d in comp.get("details") or ():
+        if d.get("scoringPlay"):
+            kind = "goal"
+        elif d.get("redCard"):
+            kind = "red"
+        else:
+            continue
+        team_id = (d.get("team") or {}).get("id")
+        side = "home" if team_id == home_id else "away" if team_id == away_id else ""
+        athletes = d.get("athletesInvolved") or ()
+        player = athletes[0].get("displayName", "") if athletes else ""
+        if d.get("ownGoal"):
+            player = f"{player} (OG)"
+        elif d.get("penaltyKick"):
+            player = f"{player} (P)"
+        minute = (d.get("clock") or {}).get("displayValue", "")
+        out.append((kind, minute, side, player))
+    return tuple(out)
+
+
+def parse_live(payload, league: str) -> list:
+    """
+    Parse the in-play view of a scoreboard: status, clock, score and the goal/red-card
+    timeline for every event that is live or has just finished.
+    """
+    data = payload if isinstance(payload, dict) else loads(payload)
+    leagues = data.get("leagues") or [{}]
+    default_league_name = leagues[0].get("name", "Unknown League")
+
+    live = []
+    for event in data.get("events") or ():
+        try:
+            status = event.get("status") or {}
+            status_type = status.get("type") or {}
+            state = status_type.get("state")
+            if state not in LIVE_STATES and not status_type.get("completed"):
+                continue
+            comp = (event.get("competitions") or [{}])[0]
+            home = away = None
+            for team in comp.get("competitors") or ():
+                side = team.get("homeAway")
+                if side == "home":
+                    home = team
+                elif side == "away":
+                    away = team
+            if home is None or away is None:
+                continue
+            live.append({
+                "match_id":    event.get("id"),
+                "league_code": league,
+                "league":      (event.get("league") or {}).get("name") or default_league_name,
+                "home":        home["team"]["displayName"],
+                "away":        away["team"]["displayName"],
+                "home_score":  int(home.get("score") or 0),
+                "away_score":  int(away.get("score") or 0),
+                "status":      (status_type.get("name") or "").upper(),
+                "completed":   bool(status_type.get("completed")),
+                "clock":       status.get("displayClock", ""),
+                "events":      _live_details(comp, home.get("id"), away.get("id")),
+            })
+        except Exception as e:
+            print(f"⚠️ Skipping live event due to parsing error: {e}")
+    return live
@@ -0,0 +1,80 @@
+# shortener.py
+#
+# Deterministic, local team shortening: a bundled dictionary of known clubs and
+# national teams, then rule-based abbreviation for everything else. Never blocks
+# and never calls the network; Gemini enrichment happens later in enrichment.py.
+
+import functools
+import json
+import os
+import re
+
+here = os.path.dirname(os.path.abspath(__file__))
+
+MAX_WORDS = 2
+MAX_SHORT_NAME_LEN = 24
+DEFAULT_EMOJI = "◽"
+
+# Legal-form and filler tokens dropped from unknown club names (compared lower-case)
+NOISE = {
+    "fc", "afc", "cf", "sc", "ac", "as", "ss", "ssc", "cd", "ud", "sd", "ca", "rc", "rcd",
+    "fk", "sk", "nk", "bk", "if", "sv", "tsg", "club", "de", "del", "di", "da", "do",
+    "calcio", "football", "futbol", "fútbol", "clube",
+}
+_NUMBERED = re.compile(r"^\d+\.$")          # "1. FC Köln"
+# Kept on the short name but ignored when looking up a national team's flag
+_SQUAD_SUFFIX = re.compile(r"\s+(U-?\d{2}|Women|Olympic)$", re.IGNORECASE)
+
+
+def _load_known():
+    try:
+        with open(os.path.join(here, "known_teams.json"), encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception as e:
+        print(f"⚠️ Could not load known_teams.json: {e}")
+        return {}, {}
+    clubs = {name: {"short_name": short, "emoji": emoji} for name, (short, emoji) in data.get("clubs", {}).items()}
+    return clubs, data.get("nations", {})
+
+
+KNOWN_CLUBS, NATION_FLAGS = _load_known()
+
+
+def known(team_name: str):
+    """Bundled mapping for a club or national team, or None."""
+    mapping = KNOWN_CLUBS.get(team_name)
+    if mapping:
+        return mapping
+    match = _SQUAD_SUFFIX.search(team_name)
+    base = team_name[:match.start()] if match else team_name
+    flag = NATION_FLAGS.get(base)
+    if flag:
+        return {"short_name": team_name, "emoji": flag}
+    return None
+
+
+def abbreviate(team_name: str) -> str:
+    """Drop legal forms and fillers ("FC", "Club", "de", ...) and keep at most two words."""
+    words = [w for w in team_name.split() if w.lower() not in NOISE and not _NUMBERED.match(w)]
+    if not words:
+        return team_name
+    short = " ".join(words[:MAX_WORDS])
+    if len(short) > MAX_SHORT_NAME_LEN:
+        short = words[0][:MAX_SHORT_NAME_LEN]
+    return short
+
+
+@functools.lru_cache(maxsize=4096)
+def _shorten(team_name: str):
+    mapping = known(team_name)
+    if mapping:
+        return mapping["short_name"], mapping["emoji"]
+    return abbreviate(team_name), DEFAULT_EMOJI
+
+
+def shorten(team_name: str) -> dict:
+    """{"short_name", "emoji"} for any team name, computed locally."""
+    if not team_name:
+        return {"short_name": team_name or "", "emoji": DEFAULT_EMOJI}
+    short_name, emoji = _shorten(team_name)
+    return {"short_name": short_name, "emoji": emoji}
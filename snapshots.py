@@ -0,0 +1,116 @@
+# snapshots.py
+#
+# ESPN resilience: the last good parsed scoreboard per (league, date) and a circuit
+# breaker per league. get_fixtures serves a snapshot flagged stale when a fetch
+# fails, runs slow or the league's breaker is open.
+
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+import clock
+import metrics
+from config import BREAKER_FAILURES, BREAKER_RESET, BREAKER_RESET_MAX, SNAPSHOT_MAX
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+def _now() -> float:
+    # Follows clock.set_source(), so replays with a fake clock see breakers reset
+    return clock.now().timestamp()
+
+
+class Scoreboard(NamedTuple):
+    fixtures: list
+    stale: bool
+    fetched_at: float   # epoch seconds (clock.now) of the fetch that produced these fixtures
+
+
+class CircuitBreaker:
+    """
+    Opens after `failures` consecutive failures. Once `reset` seconds have passed a
+    single probe is let through (half-open); success closes the breaker, failure
+    re-opens it with the wait doubled up to `reset_max`.
+    """
+
+    def __init__(self, failures=BREAKER_FAILURES, reset=BREAKER_RESET, reset_max=BREAKER_RESET_MAX):
+        self.failures = failures
+        self.reset = reset
+        self.reset_max = reset_max
+        self.state = CLOSED
+        self._count = 0
+        self._wait = reset
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and _now() >= self._retry_at:
+                self.state = HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self._count = 0
+            self._wait = self.reset
+
+    def record_failure(self):
+        with self._lock:
+            self._count += 1
+            if self.state == HALF_OPEN:
+                self._wait = min(self._wait * 2, self.reset_max)
+            elif self._count < self.failures:
+                return
+            self.state = OPEN
+            self._retry_at = _now() + self._wait
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def breaker(league: str) -> CircuitBreaker:
+    cb = _breakers.get(league)
+    if cb is None:
+        with _breakers_lock:
+            cb = _breakers.setdefault(league, CircuitBreaker())
+    return cb
+
+
+_snapshots = OrderedDict()   # (league, espn_date) -> Scoreboard
+_snapshots_lock = threading.Lock()
+
+
+def get(key):
+    with _snapshots_lock:
+        snap = _snapshots.get(key)
+        if snap is not None:
+            _snapshots.move_to_end(key)
+        return snap
+
+
+def put(key, fixtures) -> Scoreboard:
+    snap = Scoreboard(fixtures, False, _now())
+    with _snapshots_lock:
+        _snapshots[key] = snap
+        _snapshots.move_to_end(key)
+        while len(_snapshots) > SNAPSHOT_MAX:
+            _snapshots.popitem(last=False)
+    return snap
+
+
+def clear():
+    with _snapshots_lock:
+        _snapshots.clear()
+    with _breakers_lock:
+        _breakers.clear()
+
+
+@metrics.register_collector
+def _export_breakers():
+    for league, cb in list(_breakers.items()):
+        metrics.ESPN_CIRCUIT_OPEN.set(0 if cb.state == CLOSED else 1, league=league)
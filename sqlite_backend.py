@@ -0,0 +1,257 @@
+# sqlite_backend.py
+#
+# Local SQLite implementation of the storage backend for single-instance deployments,
+# benchmarks and tests. WAL journal, one shared connection guarded by a lock, and
+# constant parameterised SQL so sqlite3's statement cache keeps every query prepared.
+
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+
+from storage import StorageBackend, get_match_id
+
+# Stay well under SQLite's bound-parameter limit for IN (...) lookups
+IN_CHUNK = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    match_id    TEXT PRIMARY KEY,
+    league_code TEXT,
+    kickoff     REAL,
+    next_check  REAL,
+    data        TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS matches_kickoff    ON matches (kickoff);
+CREATE INDEX IF NOT EXISTS matches_next_check ON matches (next_check);
+CREATE TABLE IF NOT EXISTS teams (
+    name       TEXT PRIMARY KEY,
+    short_name TEXT NOT NULL,
+    emoji      TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    name    TEXT PRIMARY KEY,
+    holder  TEXT NOT NULL,
+    expires REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS channels (
+    chat_id  TEXT PRIMARY KEY,
+    leagues  TEXT,
+    priority TEXT NOT NULL
+);
+"""
+
+INSERT_MATCH = ("INSERT OR IGNORE INTO matches (match_id, league_code, kickoff, next_check, data) "
+                "VALUES (?, ?, ?, ?, ?)")
+SELECT_MATCH = "SELECT kickoff, next_check, data FROM matches"
+# One statement, so the check and the take are atomic across processes sharing the file
+ACQUIRE_LEASE = ("INSERT INTO leases (name, holder, expires) VALUES (?, ?, ?) "
+                 "ON CONFLICT(name) DO UPDATE SET holder = excluded.holder, expires = excluded.expires "
+                 "WHERE leases.holder = excluded.holder OR leases.expires <= ?")
+UPSERT_TEAM = ("INSERT INTO teams (name, short_name, emoji) VALUES (?, ?, ?) "
+               "ON CONFLICT(name) DO UPDATE SET short_name = excluded.short_name, emoji = excluded.emoji")
+
+
+def _ts(value):
+    """Aware datetime → epoch seconds (naive values are taken as UTC)."""
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _dt(ts):
+    return datetime.fromtimestamp(ts, timezone.utc) if ts is not None else None
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot store {type(value).__name__}")
+
+
+def _match_row(match: dict) -> tuple:
+    data = {k: v for k, v in match.items() if k not in ("kickoff", "next_check")}
+    return (
+        get_match_id(match),
+        match.get("league_code"),
+        _ts(match.get("kickoff")),
+        _ts(match.get("next_check")),
+        json.dumps(data, default=_json_default, ensure_ascii=False),
+    )
+
+
+def _match_dict(row) -> dict:
+    kickoff, next_check, data = row
+    match = json.loads(data)
+    if kickoff is not None:
+        match["kickoff"] = _dt(kickoff)
+    if next_check is not None:
+        match["next_check"] = _dt(next_check)
+    return match
+
+
+class SQLiteBackend(StorageBackend):
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = None
+        self._lock = threading.RLock()
+
+    def connect(self):
+        if self._conn is None:
+            with self._lock:
+                if self._conn is None:
+                    conn = sqlite3.connect(self.path, check_same_thread=False, cached_statements=256)
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute("PRAGMA synchronous=NORMAL")
+                    conn.execute("PRAGMA busy_timeout=5000")
+                    conn.executescript(SCHEMA)
+                    self._conn = conn
+        return self._conn
+
+    def _read(self, sql, params=()):
+        conn = self.connect()
+        with self._lock:
+            return conn.execute(sql, params).fetchall()
+
+    def _write(self, sql, rows):
+        """executemany in one transaction; returns the number of rows changed."""
+        conn = self.connect()
+        with self._lock, conn:
+            return conn.executemany(sql, rows).rowcount
+
+    # TRACKED MATCHES
+
+    def save_match_to_db(self, match: dict):
+        match_id = get_match_id(match)
+        if self._write(INSERT_MATCH, [_match_row(match)]):
+            print(f"✅ Match {match_id} saved to SQLite.")
+        else:
+            print(f"⏭️ Match {match_id} already tracked in SQLite.")
+
+    def save_matches(self, matches: list) -> list:
+        """INSERT OR IGNORE row by row in one transaction, so the new ids are known."""
+        if not matches:
+            return []
+        conn = self.connect()
+        created = []
+        with self._lock, conn:
+            for match in matches:
+                row = _match_row(match)
+                if conn.execute(INSERT_MATCH, row).rowcount:
+                    created.append(row[0])
+        print(f"✅ {len(created)} new matches saved to SQLite ({len(matches) - len(created)} skipped).")
+        return created
+
+    def get_match(self, match_id: str):
+        rows = self._read(SELECT_MATCH + " WHERE match_id = ?", (str(match_id),))
+        return _match_dict(rows[0]) if rows else None
+
+    def get_tracked_matches(self):
+        return [_match_dict(r) for r in self._read(SELECT_MATCH)]
+
+    def get_due_matches(self, now: datetime, limit: int = None) -> list:
+        rows = self._read(
+            SELECT_MATCH + " WHERE next_check <= ? ORDER BY next_check LIMIT ?",
+            (_ts(now), limit or -1),
+        )
+        return [_match_dict(r) for r in rows]
+
+    def get_matches_kicking_off(self, start: datetime, end: datetime) -> list:
+        rows = self._read(SELECT_MATCH + " WHERE kickoff BETWEEN ? AND ?", (_ts(start), _ts(end)))
+        return [_match_dict(r) for r in rows]
+
+    def set_next_checks(self, next_checks: dict):
+        self._write(
+            "UPDATE matches SET next_check = ? WHERE match_id = ?",
+            [(_ts(when), str(mid)) for mid, when in next_checks.items()],
+        )
+
+    def backfill_match_timestamps(self, first_check_after: timedelta):
+        rows = self._read("SELECT match_id, data FROM matches WHERE next_check IS NULL")
+        updates = []
+        for match_id, data in rows:
+            try:
+                kickoff = datetime.fromisoformat(json.loads(data)["utc_datetime"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if kickoff.tzinfo is None:
+                kickoff = kickoff.replace(tzinfo=timezone.utc)
+            updates.append((_ts(kickoff), _ts(kickoff + first_check_after), match_id))
+        if updates:
+            self._write("UPDATE matches SET kickoff = ?, next_check = ? WHERE match_id = ?", updates)
+            print(f"🔧 Backfilled kickoff/next_check on {len(updates)} tracked matches.")
+
+    def remove_match_from_db(self, match: dict):
+        match_id = get_match_id(match)
+        self._write("DELETE FROM matches WHERE match_id = ?", [(match_id,)])
+        print(f"🗑️ Match {match_id} removed from SQLite.")
+
+    def remove_matches(self, matches: list):
+        ids = list(dict.fromkeys(get_match_id(m) for m in matches))
+        if ids:
+            self._write("DELETE FROM matches WHERE match_id = ?", [(i,) for i in ids])
+            print(f"🗑️ {len(ids)} matches removed from SQLite.")
+
+    # CHANNEL SUBSCRIPTIONS
+
+    def get_subscriptions(self) -> dict:
+        return {
+            chat_id: {"leagues": json.loads(leagues) if leagues else None, "priority": json.loads(priority)}
+            for chat_id, leagues, priority in self._read("SELECT chat_id, leagues, priority FROM channels")
+        }
+
+    def save_subscription(self, chat_id, leagues=None, priority=None):
+        self._write(
+            "INSERT OR REPLACE INTO channels (chat_id, leagues, priority) VALUES (?, ?, ?)",
+            [(str(chat_id),
+              json.dumps(list(leagues)) if leagues is not None else None,
+              json.dumps(list(priority or [])))],
+        )
+        print(f"✅ Saved subscription for {chat_id}.")
+
+    def remove_subscription(self, chat_id):
+        self._write("DELETE FROM channels WHERE chat_id = ?", [(str(chat_id),)])
+        print(f"🗑️ Removed subscription for {chat_id}.")
+
+    # LEADER LEASE
+
+    def acquire_lease(self, name: str, holder: str, now: datetime, ttl: timedelta) -> bool:
+        return self._write(ACQUIRE_LEASE, [(name, holder, _ts(now + ttl), _ts(now))]) == 1
+
+    def release_lease(self, name: str, holder: str):
+        self._write("DELETE FROM leases WHERE name = ? AND holder = ?", [(name, holder)])
+
+    # TEAM INFO (Short name + emoji)
+
+    def get_team_mapping(self, team_name: str):
+        rows = self._read("SELECT short_name, emoji FROM teams WHERE name = ?", (team_name,))
+        return {"short_name": rows[0][0], "emoji": rows[0][1]} if rows else None
+
+    def get_team_mappings(self, team_names) -> dict:
+        names = [n for n in dict.fromkeys(team_names) if n]
+        found = {}
+        for i in range(0, len(names), IN_CHUNK):
+            chunk = names[i:i + IN_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            for name, short_name, emoji in self._read(
+                    f"SELECT name, short_name, emoji FROM teams WHERE name IN ({marks})", chunk):
+                found[name] = {"short_name": short_name, "emoji": emoji}
+        return found
+
+    def get_all_team_mappings(self, limit: int = None) -> dict:
+        rows = self._read("SELECT name, short_name, emoji FROM teams LIMIT ?", (limit or -1,))
+        return {name: {"short_name": s, "emoji": e} for name, s, e in rows}
+
+    def save_team_mapping(self, team_name: str, short_name: str, emoji: str):
+        self._write(UPSERT_TEAM, [(team_name, short_name, emoji)])
+        print(f"✅ Saved team: {team_name} -> {emoji} {short_name}")
+
+    def save_team_mappings(self, mappings: dict):
+        rows = [(name, m["short_name"], m["emoji"]) for name, m in mappings.items() if name]
+        if rows:
+            self._write(UPSERT_TEAM, rows)
+            print(f"✅ Saved {len(rows)} team mappings.")
@@ -1,47 +1,198 @@
-import firebase_admin, json
-from firebase_admin import credentials, firestore
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
 import config
+from metrics import timed, STORAGE_SECONDS, STORAGE_ERRORS
 
-# Init Firebase Admin
-if not firebase_admin._apps:
-    cred = credentials.Certificate("config/firebase-key.json")
-    firebase_admin.initialize_app(cred)
-
-db = firestore.client()
+# Storage is a thin facade over one backend, picked by STORAGE_BACKEND:
+#   "firestore" → firestore_backend.FirestoreBackend (default)
+#   "sqlite"    → sqlite_backend.SQLiteBackend (single instance, local WAL file)
+# Callers keep using the module-level functions below.
 
 def get_match_id(match: dict) -> str:
     return f"{match['match_id']}"
 
+
+class StorageBackend(ABC):
+    """
+    Operations every backend implements. Datetimes go in and come out timezone-aware
+    (UTC). A backend missing one of them fails when it is constructed.
+    """
+
+    name = ""
+
+    def connect(self):
+        """Open the underlying client/connection eagerly (used by warm-up)."""
+
+    # Tracked matches
+    @abstractmethod
+    def save_match_to_db(self, match: dict): ...
+    @abstractmethod
+    def save_matches(self, matches: list) -> list: ...
+    @abstractmethod
+    def get_match(self, match_id: str): ...
+    @abstractmethod
+    def get_tracked_matches(self) -> list: ...
+    @abstractmethod
+    def get_due_matches(self, now: datetime, limit: int = None) -> list: ...
+    @abstractmethod
+    def get_matches_kicking_off(self, start: datetime, end: datetime) -> list: ...
+    @abstractmethod
+    def set_next_checks(self, next_checks: dict): ...
+    @abstractmethod
+    def backfill_match_timestamps(self, first_check_after: timedelta): ...
+    @abstractmethod
+    def remove_match_from_db(self, match: dict): ...
+    @abstractmethod
+    def remove_matches(self, matches: list): ...
+
+    # Channel subscriptions
+    @abstractmethod
+    def get_subscriptions(self) -> dict: ...
+    @abstractmethod
+    def save_subscription(self, chat_id, leagues=None, priority=None): ...
+    @abstractmethod
+    def remove_subscription(self, chat_id): ...
+
+    # Leader lease: acquire (or renew) succeeds if free, expired or already ours
+    @abstractmethod
+    def acquire_lease(self, name: str, holder: str, now: datetime, ttl: timedelta) -> bool: ...
+    @abstractmethod
+    def release_lease(self, name: str, holder: str): ...
+
+    # Team mappings
+    @abstractmethod
+    def get_team_mapping(self, team_name: str): ...
+    @abstractmethod
+    def get_team_mappings(self, team_names) -> dict: ...
+    @abstractmethod
+    def get_all_team_mappings(self, limit: int = None) -> dict: ...
+    @abstractmethod
+    def save_team_mapping(self, team_name: str, short_name: str, emoji: str): ...
+    @abstractmethod
+    def save_team_mappings(self, mappings: dict): ...
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def backend() -> StorageBackend:
+    """The configured backend, created on first use so importing storage stays cheap."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if config.STORAGE_BACKEND == "sqlite":
+                    from sqlite_backend import SQLiteBackend
+                    _backend = SQLiteBackend(config.SQLITE_PATH)
+                elif config.STORAGE_BACKEND == "firestore":
+                    from firestore_backend import FirestoreBackend
+                    _backend = FirestoreBackend()
+                else:
+                    raise ValueError(f"❌ Unknown STORAGE_BACKEND {config.STORAGE_BACKEND!r} "
+                                     f"(expected one of {', '.join(config.STORAGE_BACKENDS)}).")
+    return _backend
+
+def set_backend(instance: StorageBackend):
+    """Swap the backend (benchmarks, one-off migrations)."""
+    global _backend
+    with _backend_lock:
+        _backend = instance
+
+def warm_up():
+    backend().connect()
+
+# TRACKED MATCHES
+
+@timed(STORAGE_SECONDS, errors=STORAGE_ERRORS)
 def save_match_to_db(match: dict):
-    match_id = get_match_id(match)
-    doc_ref = db.collection(config.FIRESTORE_COLLECTION).document(match_id)
-    if doc_ref.get().exists:
-        print(f"⏭️ Match {match_id} already tracked in Firestore.")
-        return
-    doc_ref.set(match)
-    print(f"✅ Match {match_id} saved to Firestore.")
+    return backend().save_match_to_db(match)
+
+@timed(STORAGE_SECONDS, errors=STORAGE_ERRORS)
+def save_matches(matches: list) -> list:
+    """Track many matches at once; returns the match_ids that were newly saved."""
+    return backend().save_matches(matches)
 
+@timed(STORAGE_SECONDS, errors=STORAGE_ERRORS)
+def get_match(match_id: str):
+    return backend().get_match(match_id)
+
+@timed(STORAGE_SECONDS, errors=STORAGE_ERRORS)
 def get_tracked_matches():
-    return [doc.to_dict() for doc in db.collection(config.FIRESTORE_COLLECTION).stream()]
+    return backend().get_tracked_matches()
+
+@timed(STORAGE_SECONDS, errors=STORAGE_ERRORS)
+def get_due_matches(now: datetime, limit: int = None) -> list:
+    """Tracked matches whose next_check is at or before now, oldest first."""
+    return backend().get_due_matches(now, limit)
+
+@timed(STORAGE_SECONDS, errors=STORAGE_ERRORS)
+def get_matches_kicking_off(start: datetime, end: datetime) -> list:
+    """Tracked matches with a kickoff in [start, end]."""
+    return backend().get_matches_kicking_off(start, end)
+
+@timed(STORAGE_SECONDS, errors=STORAGE_ERRORS)
+def set_next_checks(next_checks: dict):
+    """Bulk-update {match_id: next_check datetime} for matches that stay tracked."""
+    return backend().set_next_checks(next_checks)
 
+@timed(STORAGE_SECONDS, errors=STORAGE_ERRORS)
+def backfill_match_timestamps(first_check_after: timedelta):
+    return backend().backfill_match_timestamps(first_check_after)
+
+@timed(STORAGE_SECONDS, errors=STORAGE_ERRORS)
 def remove_match_from_db(match: dict):
-    match_id = get_match_id(match)
-    db.collection(config.FIRESTORE_COLLECTION).document(match_id).delete()
-    print(f"🗑️ Match {match_id} removed from Firestore.")
+    return backend().remove_match_from_db(match)
+
+@timed(STORAGE_SECONDS, errors=STORAGE_ERRORS)
+def remove_matches(matches: list):
+    return backend().remove_matches(matches)
+
+# CHANNEL SUBSCRIPTIONS
+
+@timed(STORAGE_SECONDS, errors=STORAGE_ERRORS)
+def get_subscriptions() -> dict:
+    """{chat_id: {"leagues": [...] or None, "priority": [...]}} for every subscribed channel."""
+    return backend().get_subscriptions()
+
+@timed(STORAGE_SECONDS, errors=STORAGE_ERRORS)
+def save_subscription(chat_id, leagues=None, priority=None):
+    return backend().save_subscription(chat_id, leagues, priority)
+
+@timed(STORAGE_SECONDS, errors=STORAGE_ERRORS)
+def remove_subscription(chat_id):
+    return backend().remove_subscription(chat_id)
+
+# LEADER LEASE
+
+@timed(STORAGE_SECONDS, errors=STORAGE_ERRORS)
+def acquire_lease(name: str, holder: str, now: datetime, ttl: timedelta) -> bool:
+    return backend().acquire_lease(name, holder, now, ttl)
+
+@timed(STORAGE_SECONDS, errors=STORAGE_ERRORS)
+def release_lease(name: str, holder: str):
+    return backend().release_lease(name, holder)
 
 # TEAM INFO (Short name + emoji)
 
+@timed(STORAGE_SECONDS, errors=STORAGE_ERRORS)
 def get_team_mapping(team_name: str):
-    doc_ref = db.collection("teams").document(team_name)
-    doc = doc_ref.get()
-    if doc.exists:
-        return doc.to_dict()
-    return None
+    return backend().get_team_mapping(team_name)
+
+@timed(STORAGE_SECONDS, errors=STORAGE_ERRORS)
+def get_team_mappings(team_names) -> dict:
+    """Fetch several team mappings in one batched read; missing teams are omitted."""
+    return backend().get_team_mappings(team_names)
 
+@timed(STORAGE_SECONDS, errors=STORAGE_ERRORS)
+def get_all_team_mappings(limit: int = None) -> dict:
+    return backend().get_all_team_mappings(limit)
+
+@timed(STORAGE_SECONDS, errors=STORAGE_ERRORS)
 def save_team_mapping(team_name: str, short_name: str, emoji: str):
-    doc_ref = db.collection("teams").document(team_name)
-    doc_ref.set({
-        "short_name": short_name,
-        "emoji": emoji
-    })
-    print(f"✅ Saved team: {team_name} -> {emoji} {short_name}")
+    return backend().save_team_mapping(team_name, short_name, emoji)
+
+@timed(STORAGE_SECONDS, errors=STORAGE_ERRORS)
+def save_team_mappings(mappings: dict):
+    """Persist {team_name: {"short_name", "emoji"}} in bulk."""
+    return backend().save_team_mappings(mappings)
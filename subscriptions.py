@@ -0,0 +1,77 @@
+# subscriptions.py
+#
+# Which channels get which leagues. Subscriptions are stored in the "channels"
+# collection and cached in memory for SUBSCRIPTION_TTL seconds. With nothing stored,
+# everything goes to CHANNEL_ID as before.
+
+import threading
+import time
+
+from config import CHANNEL_ID, SUBSCRIPTION_TTL
+from storage import get_subscriptions, save_subscription, remove_subscription
+
+
+class Subscription:
+    """One channel: the league codes it follows (None = all) and its own league order."""
+
+    __slots__ = ("chat_id", "leagues", "priority")
+
+    def __init__(self, chat_id, leagues=None, priority=None):
+        self.chat_id = chat_id
+        self.leagues = frozenset(leagues) if leagues is not None else None
+        self.priority = list(priority or [])
+
+    def wants(self, match) -> bool:
+        return self.leagues is None or match.get("league_code") in self.leagues
+
+    def __repr__(self):
+        return f"Subscription({self.chat_id!r}, leagues={sorted(self.leagues) if self.leagues is not None else None})"
+
+
+DEFAULT = [Subscription(CHANNEL_ID)]
+
+_cache = None
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+def active() -> list:
+    """Current subscriptions, re-read from storage once the cache has expired."""
+    global _cache, _loaded_at
+    with _lock:
+        if _cache is not None and time.monotonic() - _loaded_at < SUBSCRIPTION_TTL:
+            return _cache
+    try:
+        stored = get_subscriptions()
+        subs = [
+            Subscription(chat_id, doc.get("leagues"), doc.get("priority"))
+            for chat_id, doc in stored.items()
+        ] or DEFAULT
+    except Exception as e:
+        print(f"⚠️ Could not load subscriptions, using the previous set: {e}")
+        subs = _cache or DEFAULT
+    with _lock:
+        _cache, _loaded_at = subs, time.monotonic()
+    return subs
+
+
+def all_leagues(base) -> list:
+    """`base` plus any league a channel subscribes to, each listed once."""
+    extra = [code for sub in active() if sub.leagues for code in sorted(sub.leagues)]
+    return list(dict.fromkeys(list(base) + extra))
+
+
+def subscribe(chat_id, leagues=None, priority=None):
+    save_subscription(chat_id, leagues, priority)
+    invalidate()
+
+
+def unsubscribe(chat_id):
+    remove_subscription(chat_id)
+    invalidate()
+
+
+def invalidate():
+    global _cache
+    with _lock:
+        _cache = None
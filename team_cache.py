@@ -0,0 +1,104 @@
+# team_cache.py
+
+import threading
+import time
+from collections import OrderedDict
+
+import storage
+from config import TEAM_CACHE_SIZE, TEAM_CACHE_TTL
+
+# Cached "not in Firestore" marker, so unknown teams are not re-queried every render
+_MISSING = object()
+
+_entries = OrderedDict()   # team_name -> (expires_at, mapping | _MISSING)
+_lock = threading.Lock()
+
+
+def _lookup(team_name: str, now: float):
+    entry = _entries.get(team_name)
+    if entry is None:
+        return None
+    expires_at, value = entry
+    if expires_at < now:
+        del _entries[team_name]
+        return None
+    _entries.move_to_end(team_name)
+    return value
+
+
+def _store(team_name: str, value, now: float):
+    _entries[team_name] = (now + TEAM_CACHE_TTL, value)
+    _entries.move_to_end(team_name)
+    while len(_entries) > TEAM_CACHE_SIZE:
+        _entries.popitem(last=False)
+
+
+def get_many(team_names) -> dict:
+    """
+    Return {team_name: mapping} for every name that has a stored mapping. Names not
+    in memory are fetched together in a single batched Firestore read.
+    """
+    now = time.monotonic()
+    found, misses = {}, []
+    with _lock:
+        for name in dict.fromkeys(team_names):
+            if not name:
+                continue
+            value = _lookup(name, now)
+            if value is None:
+                misses.append(name)
+            elif value is not _MISSING:
+                found[name] = value
+
+    if misses:
+        fetched = storage.get_team_mappings(misses)
+        with _lock:
+            for name in misses:
+                mapping = fetched.get(name)
+                _store(name, mapping if mapping else _MISSING, now)
+                if mapping:
+                    found[name] = mapping
+    return found
+
+
+def get(team_name: str):
+    """Single-team lookup; None when the team has no stored mapping."""
+    return get_many([team_name]).get(team_name)
+
+
+def save(team_name: str, short_name: str, emoji: str):
+    """Write-through: persist the mapping and update the cache."""
+    storage.save_team_mapping(team_name, short_name, emoji)
+    with _lock:
+        _store(team_name, {"short_name": short_name, "emoji": emoji}, time.monotonic())
+
+
+def save_many(mappings: dict):
+    """Write-through for several mappings in one batched write."""
+    if not mappings:
+        return
+    storage.save_team_mappings(mappings)
+    now = time.monotonic()
+    with _lock:
+        for name, m in mappings.items():
+            _store(name, {"short_name": m["short_name"], "emoji": m["emoji"]}, now)
+
+
+def preload():
+    """Bulk-load the teams collection (up to the cache size) into memory."""
+    try:
+        mappings = storage.get_all_team_mappings(limit=TEAM_CACHE_SIZE)
+    except Exception as e:
+        print(f"⚠️ Team cache preload failed: {e}")
+        return 0
+    now = time.monotonic()
+    with _lock:
+        for name, mapping in mappings.items():
+            _store(name, mapping, now)
+    print(f"✅ Preloaded {len(mappings)} team mappings.")
+    return len(mappings)
+
+
+def clear():
+    with _lock:
+        _entries.clear()
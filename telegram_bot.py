@@ -1,29 +1,334 @@
 # telegram_bot.py
 
-import requests
+import asyncio
+import random
+import threading
 import time
-from config import BOT_TOKEN, CHANNEL_ID, PERSONAL_CHAT_ID
-from formatter import format_fixtures, format_match_result
+from collections import deque
+from concurrent.futures import Future
 
+import http_client
+import metrics
+from config import (
+    BOT_TOKEN, CHANNEL_ID, PERSONAL_CHAT_ID,
+    TG_GLOBAL_RATE, TG_CHAT_RATE, TG_GROUP_PER_MINUTE, TG_QUEUE_SIZE,
+)
+from formatter import team_info_for, fixture_lines, assemble_fixtures, format_match_results
+from journal import journal, RESULT, SENT, DONE
+import subscriptions
+
+SEND_URL = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
+EDIT_URL = f"https://api.telegram.org/bot{BOT_TOKEN}/editMessageText"
+
+BACKOFF_BASE = 1.0
+BACKOFF_CAP  = 60.0
+# How long send_message waits for room in a full queue before dropping
+ENQUEUE_TIMEOUT = 5.0
+
+
+class TokenBucket:
+    """Classic token bucket; reserve() returns how long to wait before sending."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+
+def _is_group(chat_id) -> bool:
+    chat = str(chat_id)
+    return chat.startswith("-") or chat.startswith("@")
+
+
+def _backoff(attempt: int) -> float:
+    """Exponential backoff with full jitter."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+
+def _retry_after(r) -> float:
+    try:
+        return float(r.json().get("parameters", {}).get("retry_after") or 0)
+    except Exception:
+        return 0.0
+
+
+@metrics.timed(metrics.TELEGRAM_SEND_SECONDS)
 def safe_send_request(url, payload, max_retries=5):
+    """
+    Blocking send with jittered exponential backoff that honors Telegram's retry_after.
+    Returns Telegram's "result" object (truthy) on success, False otherwise.
+    """
     for attempt in range(max_retries):
+        delay = _backoff(attempt)
         try:
-            r = requests.post(url, json=payload)
+            r = http_client.post(url, json=payload)
             if r.status_code == 200:
                 print("✅ Message sent successfully.")
-                return True
+                try:
+                    return r.json().get("result") or True
+                except ValueError:
+                    return True
+            print(f"❌ Telegram error: {r.text}")
+            if r.status_code == 429:
+                delay = max(delay, _retry_after(r))
+                reason = "rate_limited"
+            elif 400 <= r.status_code < 500:
+                # Bad request / forbidden will not fix itself by retrying
+                break
             else:
-                print(f"❌ Telegram error: {r.text}")
+                reason = "server_error"
         except Exception as e:
             print(f"❌ Failed to send Telegram message: {e}")
+            reason = "exception"
         if attempt < max_retries - 1:
-            print("⏳ Retrying...")
-            time.sleep(5)
+            metrics.TELEGRAM_RETRIES.inc(reason=reason)
+            print(f"⏳ Retrying in {delay:.1f}s...")
+            time.sleep(delay)
     print("❌ Max retries reached. Failed to send the message.")
+    metrics.TELEGRAM_FAILURES.inc()
     return False
 
-def send_message(text, chat_id=None, silent=False):
-    url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
+
+class _Lane:
+    """One chat's pending messages and the condition its worker waits on."""
+
+    __slots__ = ("items", "ready")
+
+    def __init__(self, lock):
+        self.items = deque()
+        self.ready = threading.Condition(lock)
+
+
+class OutboundQueue:
+    """
+    Bounded outbound queue, so callers never block on Telegram. Each chat gets its
+    own lane, drained by a worker thread started on demand, so rate-limit waits,
+    retry_after and backoff only hold up that chat while messages to one chat stay
+    in order. Sends are rate limited by a global bucket plus one bucket per chat.
+    """
+
+    # A lane with nothing to send for this long ends its worker
+    LANE_IDLE = 60.0
+
+    def __init__(self, maxsize: int = TG_QUEUE_SIZE):
+        self._maxsize = maxsize
+        self._global = TokenBucket(TG_GLOBAL_RATE, TG_GLOBAL_RATE)
+        self._chats = {}
+        self._lanes = {}            # chat_id -> lane
+        self._size = 0              # messages queued or being sent, across lanes
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+
+    def _chat_bucket(self, chat_id) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if _is_group(chat_id):
+                bucket = TokenBucket(TG_GROUP_PER_MINUTE / 60.0, 1)
+            else:
+                bucket = TokenBucket(TG_CHAT_RATE, 1)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    def _reserve(self, chat_id) -> float:
+        with self._lock:
+            return max(self._global.reserve(), self._chat_bucket(chat_id).reserve())
+
+    def _throttle(self, chat_id):
+        wait = self._reserve(chat_id)
+        if wait > 0:
+            time.sleep(wait)
+
+    def _finished(self):
+        with self._lock:
+            self._size -= 1
+            self._changed.notify_all()
+
+    @staticmethod
+    def _drop(future, on_result) -> Future:
+        # Report the drop like a failed send, so a journaled delivery is not marked done
+        print("❌ Outbound queue full; dropping message.")
+        if on_result is not None:
+            on_result([False])
+        future.set_result(False)
+        return future
+
+    def submit(self, url, payloads, on_result=None) -> Future:
+        """
+        Queue the parts of one message; the future resolves to True if all were sent.
+        on_result, if given, is called on the chat's worker with the per-part Telegram results.
+        """
+        future = Future()
+        chat_id = payloads[0]["chat_id"]
+        with self._lock:
+            full = not self._changed.wait_for(lambda: self._size < self._maxsize, ENQUEUE_TIMEOUT)
+            if not full:
+                self._size += 1
+                lane = self._lanes.get(chat_id)
+                if lane is None:
+                    lane = self._lanes[chat_id] = _Lane(self._lock)
+                    threading.Thread(target=self._drain, args=(chat_id, lane),
+                                     name=f"telegram-{chat_id}", daemon=True).start()
+                lane.items.append((url, payloads, future, on_result))
+                lane.ready.notify()
+        # Outside the lock: on_result may write to the journal
+        return self._drop(future, on_result) if full else future
+
+    def _drain(self, chat_id, lane):
+        while True:
+            with self._lock:
+                if not lane.items:
+                    lane.ready.wait(self.LANE_IDLE)
+                if not lane.items:
+                    del self._lanes[chat_id]
+                    return
+                url, payloads, future, on_result = lane.items.popleft()
+            ok = True
+            try:
+                results = []
+                for payload in payloads:
+                    self._throttle(chat_id)
+                    results.append(safe_send_request(url, payload))
+                ok = all(results)
+                if on_result is not None:
+                    on_result(results)
+            except Exception as e:
+                print(f"❌ Outbound worker error: {e}")
+                ok = False
+            finally:
+                if not future.done():
+                    future.set_result(ok)
+                self._finished()
+
+    def join(self):
+        """Block until every queued message has been processed."""
+        with self._lock:
+            while self._size:
+                self._changed.wait()
+
+    def qsize(self) -> int:
+        return self._size
+
+
+@metrics.timed(metrics.TELEGRAM_SEND_SECONDS)
+async def safe_send_request_async(url, payload, max_retries=5):
+    """Coroutine version of safe_send_request() over the shared async HTTP client."""
+    for attempt in range(max_retries):
+        delay = _backoff(attempt)
+        try:
+            r = await http_client.apost(url, json=payload)
+            if r.status_code == 200:
+                print("✅ Message sent successfully.")
+                try:
+                    return r.json().get("result") or True
+                except ValueError:
+                    return True
+            print(f"❌ Telegram error: {r.text}")
+            if r.status_code == 429:
+                delay = max(delay, _retry_after(r))
+                reason = "rate_limited"
+            elif 400 <= r.status_code < 500:
+                break
+            else:
+                reason = "server_error"
+        except Exception as e:
+            print(f"❌ Failed to send Telegram message: {e}")
+            reason = "exception"
+        if attempt < max_retries - 1:
+            metrics.TELEGRAM_RETRIES.inc(reason=reason)
+            print(f"⏳ Retrying in {delay:.1f}s...")
+            await asyncio.sleep(delay)
+    print("❌ Max retries reached. Failed to send the message.")
+    metrics.TELEGRAM_FAILURES.inc()
+    return False
+
+
+class AsyncOutboundQueue(OutboundQueue):
+    """
+    Outbound queue for the asyncio runtime. Lanes are tasks draining an asyncio.Queue
+    instead of threads; same rate limits and submit() contract, callable from any thread.
+    A full queue drops at once, since submit() may be running on the loop.
+    """
+
+    def __init__(self, loop, maxsize: int = TG_QUEUE_SIZE):
+        super().__init__(maxsize)
+        self._loop = loop
+
+    def submit(self, url, payloads, on_result=None) -> Future:
+        future = Future()
+        with self._lock:
+            full = self._size >= self._maxsize
+            if not full:
+                self._size += 1
+        if full:
+            return self._drop(future, on_result)
+        self._loop.call_soon_threadsafe(self._enqueue, (url, payloads, future, on_result))
+        return future
+
+    def _enqueue(self, item):
+        chat_id = item[1][0]["chat_id"]
+        lane = self._lanes.get(chat_id)
+        if lane is None:
+            lane = self._lanes[chat_id] = asyncio.Queue()
+            self._loop.create_task(self._drain(chat_id, lane))
+        lane.put_nowait(item)
+
+    async def _throttle_async(self, chat_id):
+        wait = self._reserve(chat_id)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def _drain(self, chat_id, lane):
+        while True:
+            try:
+                url, payloads, future, on_result = await asyncio.wait_for(lane.get(), self.LANE_IDLE)
+            except asyncio.TimeoutError:
+                if lane.empty():
+                    del self._lanes[chat_id]
+                    return
+                continue
+            ok = True
+            try:
+                results = []
+                for payload in payloads:
+                    await self._throttle_async(chat_id)
+                    results.append(await safe_send_request_async(url, payload))
+                ok = all(results)
+                if on_result is not None:
+                    on_result(results)
+            except Exception as e:
+                print(f"❌ Outbound worker error: {e}")
+                ok = False
+            finally:
+                if not future.done():
+                    future.set_result(ok)
+                self._finished()
+
+
+outbound = OutboundQueue()
+
+
+def use_asyncio(loop):
+    """Route every send through per-chat async lanes on `loop` (RUNTIME=asyncio)."""
+    global outbound
+    outbound = AsyncOutboundQueue(loop)
+
+
+@metrics.register_collector
+def _export_queue_depth():
+    metrics.OUTBOUND_QUEUE_DEPTH.set(outbound.qsize())
+
+
+def send_message(text, chat_id=None, silent=False, on_result=None) -> Future:
     max_length = 4096
     target_chat = chat_id or CHANNEL_ID
 
@@ -36,21 +341,81 @@ def send_message(text, chat_id=None, silent=False):
         text = text[idx:].strip()
     parts.append(text)
 
-    for part in parts:
-        payload = {
+    payloads = [
+        {
             "chat_id": target_chat,
             "text": part,
             "parse_mode": "Markdown",
             "disable_notification": silent
         }
-        safe_send_request(url, payload)
+        for part in parts
+    ]
+    return outbound.submit(SEND_URL, payloads, on_result)
+
+def edit_message(chat_id, message_id, text) -> Future:
+    """Queue an editMessageText for a message we posted earlier."""
+    return outbound.submit(EDIT_URL, [{
+        "chat_id": chat_id,
+        "message_id": message_id,
+        "text": text[:4096],
+        "parse_mode": "Markdown",
+    }])
 
 def send_fixtures(matches):
-    send_message(format_fixtures(matches))
+    """Render every fixture line once, then post one assembled list per subscribed channel."""
+    team_info = team_info_for(matches)
+    lines = fixture_lines(matches, team_info)
+    futures = []
+    for sub in subscriptions.active():
+        picked = [m for m in matches if sub.wants(m)]
+        if picked:
+            text = assemble_fixtures(picked, team_info, lines, sub.priority)
+            futures.append(send_message(text, chat_id=sub.chat_id))
+    return futures
+
+class _Delivery:
+    """Journals each channel that received a result, and the result once all have."""
+
+    def __init__(self, match_id, chats: int):
+        self.match_id = match_id
+        self.remaining = chats
+        self.failed = False
+        self._lock = threading.Lock()
+
+    def on_result(self, chat_id):
+        def record(results):
+            ok = all(results)
+            if ok:
+                journal.record(RESULT, self.match_id, SENT, chat_id=chat_id)
+            with self._lock:
+                self.failed |= not ok
+                self.remaining -= 1
+                finished = self.remaining == 0 and not self.failed
+            if finished:
+                journal.record(RESULT, self.match_id, DONE)
+        return record
 
 def send_results(matches):
+    """
+    Render each result once and fan it out to every channel following its league,
+    skipping channels the journal says already have it.
+    """
+    texts = format_match_results(matches)
+    subs = subscriptions.active()
+    futures = []
     for match in matches:
-        send_message(format_match_result(match))
+        match_id = match.match_id
+        already = journal.sent_to(RESULT, match_id)
+        chats = [sub.chat_id for sub in subs if sub.wants(match) and str(sub.chat_id) not in already]
+        if not chats:
+            journal.record(RESULT, match_id, DONE)
+            continue
+        delivery = _Delivery(match_id, len(chats))
+        futures.extend(
+            send_message(texts[match_id], chat_id=chat_id, on_result=delivery.on_result(chat_id))
+            for chat_id in chats
+        )
+    return futures
 
 def send_keepalive():
     try:
@@ -59,6 +424,10 @@ def send_keepalive():
             chat_id=PERSONAL_CHAT_ID,
             silent=True
         )
-        print("⏲️ Sent keepalive heartbeat")
+        print("⏲️ Queued keepalive heartbeat")
     except Exception as e:
         print(f"❌ Keepalive failed: {e}")
+
+async def send_keepalive_async():
+    # Queuing never blocks, so the coroutine just runs the same code on the loop
+    send_keepalive()